@@ -0,0 +1,164 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import torch
+
+from .model_registry import MODEL_VARIANT, get_model, model_device
+from .variable_length import bucket_for, cap_length, forward_masked, pad_batch
+
+
+# 동시에 들어온 추론 요청을 모아서 한 번의 forward로 처리하는 마이크로 배칭 스케줄러
+# 요청마다 (1, 4, 60, 54) 텐서를 넣으면 자기 몫의 (1, num_class) 출력만 돌려받음
+# variable_length=True 면 (1, 4, L, 54) 를 길이 버킷별로 묶어서 마스킹 forward (codes/variable_length.py)
+#   MAX_LENGTH 보다 긴 클립은 60프레임으로 뽑아서 (길면 마스킹 경로가 더 느림)
+# 출구 달린 모델(early_exit)은 forward_exits 로 -> 요청마다 (로짓, 출구 번호)
+
+MICRO_BATCHING = os.getenv('ECOLINK_MICRO_BATCHING', '1') == '1'
+MAX_BATCH_SIZE = int(os.getenv('ECOLINK_BATCH_MAX_SIZE', 16))
+MAX_WAIT_MS = float(os.getenv('ECOLINK_BATCH_MAX_WAIT_MS', 2))
+
+
+class MicroBatcher:
+    def __init__(self, model_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, variable_length=False):
+        # model_fn: 배치마다 호출해서 모델을 얻음 (레지스트리에서 내려간 모델을 붙잡고 있지 않도록)
+        self.model_fn = model_fn
+        self.variable_length = variable_length
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.max_seen_batch = 0
+
+        self._worker = threading.Thread(target=self._run, name='stgcn-micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, x):
+        future = Future()
+        self._queue.put((x, future))
+        return future
+
+    def infer(self, x):
+        return self.submit(x).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        # 이미 쌓여 있는 요청은 기다리지 않고 바로 가져감
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # 그래도 자리가 남으면 max_wait 까지만 더 기다림
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # 모양이 다른 입력(가변 길이면 다른 길이 버킷)은 따로 forward
+            groups = {}
+            for x, future in batch:
+                key = bucket_for(x.size(2)) if self.variable_length else tuple(x.shape[1:])
+                groups.setdefault(key, []).append((x, future))
+            for items in groups.values():
+                self._forward(items)
+
+    def _forward(self, items):
+        items = [(x, future) for x, future in items if future.set_running_or_notify_cancel()]
+        if not items:
+            return
+        try:
+            model = self.model_fn()
+            device = model_device(model)
+            with torch.no_grad():
+                if self.variable_length:
+                    x, lengths = pad_batch([x for x, _ in items])
+                    output = forward_masked(model, x.to(device), lengths)
+                else:
+                    x = torch.cat([x for x, _ in items], dim=0).to(device).contiguous()
+                    output = _forward(model, x)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for x, future in items:
+            n = x.shape[0]
+            if isinstance(output, dict):  # 멀티헤드 모델: {어휘: 로짓}
+                future.set_result({name: out[start:start + n] for name, out in output.items()})
+            elif isinstance(output, tuple):  # 출구 달린 모델: (로짓, 출구 번호)
+                future.set_result(tuple(out[start:start + n] for out in output))
+            else:
+                future.set_result(output[start:start + n])
+            start += n
+
+        with self._lock:
+            self.batches += 1
+            self.requests += len(items)
+            self.max_seen_batch = max(self.max_seen_batch, len(items))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'avg_batch_size': self.requests / self.batches if self.batches else 0.0,
+                'max_batch_size': self.max_seen_batch,
+                'pending': self._queue.qsize(),
+            }
+
+
+def _forward(model, x):
+    forward_exits = getattr(model, 'forward_exits', None)
+    return model(x) if forward_exits is None else forward_exits(x)
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model_path, label_list, variant=MODEL_VARIANT, variable_length=False):
+    key = (os.path.abspath(model_path), tuple(label_list), variant, variable_length)
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(lambda: get_model(model_path, label_list, variant),
+                                   variable_length=variable_length)
+            _batchers[key] = batcher
+        return batcher
+
+
+def run_model(model_path, label_list, x, variant=MODEL_VARIANT, variable_length=False, return_exits=False):
+    # return_exits=True 면 출구 달린 모델에서 (로짓, 출구 번호 (N,)), 아니면 로짓만
+    # 배칭을 끈 경우(단일 스레드 워커 등)에는 바로 forward
+    if variable_length:
+        x = cap_length(x)
+    if not MICRO_BATCHING:
+        model = get_model(model_path, label_list, variant)
+        x = x.to(model_device(model)).contiguous()
+        with torch.no_grad():
+            # 가변 길이는 배칭할 때와 같은 경로로 (model(x) 는 L≠60 이면 data_bn 통계가 엉뚱한 채널로 감)
+            if variable_length:
+                output = forward_masked(model, x, torch.tensor([x.size(2)]))
+            else:
+                output = _forward(model, x)
+    else:
+        output = get_batcher(model_path, label_list, variant, variable_length).infer(x)
+    if isinstance(output, tuple) and not return_exits:
+        return output[0]
+    return output
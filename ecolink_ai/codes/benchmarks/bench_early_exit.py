@@ -0,0 +1,75 @@
+import argparse
+import os
+import time
+
+import torch
+
+from codes.models.st_gcn_18_10words_54node import EarlyExitSTGCN, STGCNModel
+from codes.early_exit import exits_path, fit_exit_heads
+from codes.benchmarks.common import load_batches
+from codes.benchmarks.bench_inference_model import randomize_bn
+
+
+# 출구 임계값별 평균 지연 / 정확도 / 출구 분포 (배치 1, 클립 하나씩)
+# python -m codes.benchmarks.bench_early_exit --checkpoint datas/xxx.pth --labels 10emer --clip-dir datas/eval
+# 체크포인트/클립 없이 돌리면 랜덤 가중치로 지연만 봄
+
+LABELS = {
+    '10emer': 'codes.emedding_test_10emer_return_54node',
+    '8police': 'codes.emedding_test_8emer_return_54node',
+}
+
+
+def run(model, xs, targets, threshold):
+    model.thresholds = [threshold] * len(model.exits)
+    counts = [0] * (len(model.exits) + 1)
+    elapsed = 0.0
+    correct = 0
+    with torch.no_grad():
+        for x, y in zip(xs, targets):
+            start = time.perf_counter()
+            logits, exits = model.forward_exits(x)
+            elapsed += time.perf_counter() - start
+            correct += int(logits.argmax(1).item() == y)
+            counts[exits.item()] += 1
+    return elapsed / len(xs) * 1000, correct / len(xs), counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--labels', choices=sorted(LABELS), default='10emer')
+    parser.add_argument('--clip-dir', default=None, help='<라벨>/<클립>.json 폴더 또는 텐서 저장소')
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    label_list = __import__(LABELS[args.labels], fromlist=['label_list']).label_list
+    base = STGCNModel(in_channels=4, num_class=len(label_list))
+    if args.checkpoint:
+        base.load_state_dict(torch.load(args.checkpoint, map_location='cpu')['model_state_dict'])
+    else:
+        randomize_bn(base)
+    model = EarlyExitSTGCN(base.eval())
+
+    if args.clip_dir:
+        inputs, targets = load_batches(args.clip_dir, label_list)
+        xs = list(torch.cat(inputs).split(1))
+        targets = targets.tolist()
+    else:
+        xs = [torch.rand(1, 4, 60, 54) for _ in range(20)]
+        targets = torch.randint(0, len(label_list), (len(xs),)).tolist()
+
+    if args.checkpoint and os.path.exists(exits_path(args.checkpoint)):
+        model.exits.load_state_dict(torch.load(exits_path(args.checkpoint), map_location='cpu')['exits_state_dict'])
+    else:
+        # 저장된 출구 헤드가 없으면 같은 클립으로 학습 (정확도가 낙관적으로 나옴)
+        fit_exit_heads(model, [torch.cat(xs)], torch.tensor(targets))
+
+    exits = ['64ch', '128ch', 'full']
+    for threshold in (1.01, 0.99, 0.95, 0.9, 0.8, 0.0):
+        ms, acc, counts = run(model, xs, targets, threshold)
+        dist = ', '.join(f'{name} {c}' for name, c in zip(exits, counts))
+        print(f'threshold {threshold:4.2f}   avg {ms:8.2f} ms   acc {acc:.3f}   exits: {dist}')
@@ -0,0 +1,57 @@
+import argparse
+
+import torch
+
+from codes.models.st_gcn_18_10words_54node import STGCNModel, build_inference_model
+from codes.benchmarks.common import time_call, print_row
+
+
+# 학습 그대로의 STGCNModel vs 추론 전용 빌드 (BatchNorm 접기 + 그래프 conv 합치기)
+# python -m codes.benchmarks.bench_inference_model [--checkpoint datas/xxx.pth --num-class 10]
+
+
+def randomize_bn(model, seed=0):
+    # 체크포인트 없이 돌릴 때 BatchNorm 통계가 기본값(0/1)이면 접기 검증이 안 되므로 흔들어 둠
+    g = torch.Generator().manual_seed(seed)
+    for m in model.modules():
+        if isinstance(m, (torch.nn.BatchNorm1d, torch.nn.BatchNorm2d)):
+            n = m.num_features
+            m.running_mean.copy_(torch.randn(n, generator=g) * 0.1)
+            m.running_var.copy_(torch.rand(n, generator=g) + 0.5)
+            m.weight.data.copy_(torch.rand(n, generator=g) + 0.5)
+            m.bias.data.copy_(torch.randn(n, generator=g) * 0.1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--num-class', type=int, default=10)
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    model = STGCNModel(in_channels=4, num_class=args.num_class)
+    if args.checkpoint:
+        checkpoint = torch.load(args.checkpoint, map_location='cpu')
+        model.load_state_dict(checkpoint['model_state_dict'])
+    else:
+        randomize_bn(model)
+    model.eval()
+    fused = build_inference_model(model)
+
+    for batch in (1, 16):
+        x = torch.rand(batch, 4, 60, 54)
+        with torch.no_grad():
+            ref = model(x)
+            out = fused(x)
+            diff = (ref - out).abs().max().item()
+            assert torch.allclose(ref, out, rtol=1e-4, atol=1e-4), f'출력 차이 {diff}'
+            assert torch.equal(ref.argmax(1), out.argmax(1))
+
+            t_ref = time_call(lambda: model(x), repeat=30)
+            t_out = time_call(lambda: fused(x), repeat=30)
+        print(f'--- batch {batch}  (max abs diff {diff:.2e})')
+        print_row('STGCNModel', t_ref)
+        print_row('STGCNInferenceModel', t_out, f'x{t_ref[0] / t_out[0]:.2f}')
@@ -0,0 +1,150 @@
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from codes.keypoint_pipeline import HolisticLandmarker, KeypointPipeline
+from codes.motion_gate import RECOGNIZING, ENDED, MotionGate, MotionStateMachine, draw_state
+from codes.landmark_profiles import profile_options
+
+
+# 한 스레드 순차 처리(video_to_keypoints 와 같은 순서) vs 단계별 스레드 파이프라인
+# 1) drop=False 로 같은 영상을 돌려서 all_frames 가 같은지 확인
+# 2) 처리 시간 비교, 3) 카메라처럼 30fps 로 흘려보내서(drop=True) 단계별 지연 / 버린 프레임 수
+# python -m codes.benchmarks.bench_keypoint_pipeline [--video datas/sample.mp4] [--landmark-ms 40]
+# mediapipe 가 없으면 가짜 랜드마크 단계(--landmark-ms 만큼 걸림)로
+
+
+class FakeLandmarker:
+    # 프레임 픽셀에서 정해지는 가짜 랜드마크 (같은 프레임이면 같은 결과)
+    def __init__(self, delay_ms):
+        self.delay = delay_ms / 1000
+
+    def process(self, frame, frame_idx):
+        time.sleep(self.delay)
+        small = cv2.resize(frame, (9, 4)).reshape(-1, 3) / 255.0
+        pose = [{'x': float(b), 'y': float(g), 'z': float(r), 'visibility': 1.0} for b, g, r in small[:12]]
+        return {'frame': frame_idx, 'pose_landmarks': pose,
+                'left_hand_landmarks': None, 'right_hand_landmarks': None}, None
+
+    def draw(self, frame, results):
+        pass
+
+    def close(self):
+        pass
+
+
+class PacedCapture:
+    # 영상 파일을 카메라처럼 fps 에 맞춰 읽음
+    def __init__(self, path, fps=30):
+        self.cap = cv2.VideoCapture(path)
+        self.interval = 1 / fps
+        self.next_time = None
+
+    def read(self):
+        now = time.perf_counter()
+        if self.next_time is not None and now < self.next_time:
+            time.sleep(self.next_time - now)
+        self.next_time = max(now, self.next_time or now) + self.interval
+        return self.cap.read()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+def make_video(path, size=(640, 480)):
+    # 정지 1초 -> 손 크기 사각형이 2초 움직임 -> 정지 1초 (time_threshold 0.5초면 Recognizing -> Ended)
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, size)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8), (21, 21), 0)
+    for i in range(120):
+        frame = background.copy()
+        t = min(max(i - 30, 0), 60)
+        x = 100 + int(200 * abs(np.sin(t / 10)))
+        cv2.rectangle(frame, (x, 180), (x + 120, 320), (40, 160, 220), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def run_sequential(path, time_threshold, landmarker):
+    # video_to_keypoints 와 같은 순서 (화면 표시만 뺌), 타이머는 영상 시각
+    cap = cv2.VideoCapture(path)
+    ret, frame = cap.read()
+    gate = MotionGate()
+    gate.reset(frame)
+    state_machine = MotionStateMachine(time_threshold)
+    all_frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        moved = gate.update(frame)
+        if profile_options()['draw']:
+            gate.draw(frame)   # accurate 프로파일은 flow 를 그린 프레임을 Holistic 에 넘김
+        motion_state = state_machine.update(moved, cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+        draw_state(frame, motion_state)
+        if motion_state == RECOGNIZING:
+            result_dict, _ = landmarker.process(frame, len(all_frames))
+            all_frames.append(result_dict)
+        if motion_state == ENDED:
+            break
+    cap.release()
+    return all_frames
+
+
+def print_stats(stats):
+    for name, s in stats.items():
+        print(f'  {name:<9} frames {s["frames"]:4d}   mean {s["mean_ms"]:7.2f} ms   max {s["max_ms"]:7.2f} ms'
+              f'   dropped {s["dropped"]}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default=None)
+    parser.add_argument('--time-threshold', type=float, default=0.5)
+    parser.add_argument('--landmark-ms', type=float, default=40, help='가짜 랜드마크 단계 시간')
+    parser.add_argument('--fake', action='store_true', help='mediapipe 가 있어도 가짜 랜드마크 단계로')
+    args = parser.parse_args()
+
+    path = args.video
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'signing.avi')
+        make_video(path)
+
+    factory = HolisticLandmarker
+    try:
+        import mediapipe  # noqa: F401
+    except ImportError:
+        args.fake = True
+    if args.fake:
+        factory = lambda: FakeLandmarker(args.landmark_ms)
+    print(f'{path}, landmark: {"fake %.0f ms" % args.landmark_ms if args.fake else "Holistic"}')
+
+    start = time.perf_counter()
+    landmarker = factory()
+    reference = run_sequential(path, args.time_threshold, landmarker)
+    landmarker.close()
+    t_seq = time.perf_counter() - start
+
+    pipeline = KeypointPipeline(cv2.VideoCapture(path), args.time_threshold, display=False, drop=False,
+                                media_clock=True, landmarker_factory=factory)
+    start = time.perf_counter()
+    frames = pipeline.run()
+    t_pipe = time.perf_counter() - start
+    assert frames == reference, f'all_frames 가 다름 ({len(frames)} vs {len(reference)})'
+    print(f'all_frames 같음 ({len(frames)} frames)')
+    print(f'sequential {t_seq:6.2f} s   pipeline (drop=False) {t_pipe:6.2f} s   x{t_seq / t_pipe:.2f}')
+    print_stats(pipeline.stage_stats())
+
+    # 카메라처럼 30fps 로 들어올 때: 최신 프레임 우선으로 버리면서 따라감
+    pipeline = KeypointPipeline(PacedCapture(path), args.time_threshold, display=False, drop=True,
+                                media_clock=False, landmarker_factory=factory)
+    frames = pipeline.run()
+    print(f'paced 30 fps, drop=True: {len(frames)} frames recorded')
+    print_stats(pipeline.stage_stats())
@@ -0,0 +1,97 @@
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+from codes.landmark_profiles import PROFILES
+from codes.normalization_cam import normalization
+from codes.emedding_test_10emer_return_54node import process_keypoints
+
+
+# 랜드마크 추출 프로파일(accurate / tracking / lean)별 처리량과 분류 정확도
+# 녹화 영상 폴더: <라벨>/<영상> (영상 하나 = 수어 하나, 처음부터 끝까지 추출)
+# python -m codes.benchmarks.bench_landmark_profiles --video-dir datas/videos \
+#     [--checkpoint datas/xxx.pth --labels 10emer] [--profiles accurate,lean]
+# 프로파일별 모델 크기를 바꿔 보려면 ECOLINK_MODEL_COMPLEXITY=0|1|2
+# --cache: 추출 결과를 키포인트 캐시(codes/keypoint_cache.py)에서 -> 정확도만 다시 볼 때 (적중하면 fps 는 의미 없음)
+
+LABELS = {
+    '10emer': 'codes.emedding_test_10emer_return_54node',
+    '8police': 'codes.emedding_test_8emer_return_54node',
+}
+VIDEO_EXTS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+
+def list_videos(video_dir):
+    videos = []
+    for label in sorted(os.listdir(video_dir)):
+        label_dir = os.path.join(video_dir, label)
+        if os.path.isdir(label_dir):
+            videos += [(label, os.path.join(label_dir, f)) for f in sorted(os.listdir(label_dir))
+                       if f.lower().endswith(VIDEO_EXTS)]
+    return videos
+
+
+def extract(path, profile, cache=None):
+    # 헤드리스로 영상 전체 추출 -> (프레임 dict 리스트, 프레임 수, 걸린 시간 초, 디코딩 포함)
+    from codes.videoTest_mediapipe_cam_json import extract_keypoints
+    from codes.keypoint_cache import cached_extract_keypoints
+
+    start = time.perf_counter()
+    if cache is not None:
+        frames = cached_extract_keypoints(path, profile, cache=cache)
+    else:
+        frames = extract_keypoints(path, profile)
+    return frames, len(frames), time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video-dir', required=True)
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--labels', choices=sorted(LABELS), default='10emer')
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--cache', action='store_true')
+    args = parser.parse_args()
+
+    try:
+        import mediapipe  # noqa: F401
+    except ImportError:
+        sys.exit('mediapipe 가 필요함 (pip install mediapipe)')
+
+    label_list = __import__(LABELS[args.labels], fromlist=['label_list']).label_list
+    model = None
+    if args.checkpoint:
+        from codes.model_registry import load_stgcn
+        model = load_stgcn(args.checkpoint, len(label_list), torch.device('cpu'))
+
+    cache = None
+    if args.cache:
+        from codes.keypoint_cache import KeypointCache
+        cache = KeypointCache()
+
+    videos = list_videos(args.video_dir)
+    print(f'{len(videos)}개 영상')
+    for profile in args.profiles.split(','):
+        total_frames, total_time, correct, failed = 0, 0.0, 0, 0
+        for label, path in videos:
+            frames, n, elapsed = extract(path, profile, cache)
+            total_frames += n
+            total_time += elapsed
+            if model is None:
+                continue
+            try:
+                x = process_keypoints(normalization(frames))
+            except ValueError:
+                failed += 1   # 랜드마크가 하나도 안 잡힌 영상
+                continue
+            with torch.no_grad():
+                pred = model(x).argmax(1).item()
+            correct += int(label_list[pred] == label)
+
+        line = f'{profile:<9} {total_frames / total_time:7.1f} fps ({total_frames} frames)'
+        if model is not None:
+            line += f'   accuracy {correct / len(videos):.3f}   추출 실패 {failed}'
+        print(line)
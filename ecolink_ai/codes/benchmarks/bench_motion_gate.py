@@ -0,0 +1,94 @@
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from codes.motion_gate import MIN_MOVED, MotionGate
+
+
+# 움직임 게이트 FPS: 기존 (원본 해상도 flow + 16픽셀 이중 루프 + 칸마다 cv2.line) vs MotionGate
+# 녹화 영상의 모든 프레임을 미리 읽어 두고 게이트만 돌림 (mediapipe/화면 표시는 빼고)
+# python -m codes.benchmarks.bench_motion_gate [--video datas/sample.mp4] [--roi x,y,w,h]
+
+
+def legacy_gate(prev_gray, frame):
+    curr_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    flow = cv2.calcOpticalFlowFarneback(prev_gray, curr_gray, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+    moved = 0
+    for y in range(16 // 2, frame.shape[0], 16):
+        for x in range(16 // 2, frame.shape[1], 16):
+            dx, dy = flow[y, x].astype(int)
+            if (dx * dx + dy * dy) > 200:
+                cv2.line(frame, (x, y), (x + dx, y + dy), (0, 0, 255), 2)
+                moved += 1
+    return curr_gray, moved
+
+
+def make_video(path, num_frames=150, size=(640, 480)):
+    # 녹화 영상이 없을 때: 배경 잡음 위에서 손 크기 사각형이 움직였다 멈췄다 하는 영상
+    rng = np.random.default_rng(0)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, size)
+    background = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (21, 21), 0)
+    for i in range(num_frames):
+        frame = background.copy()
+        phase = (i // 30) % 2   # 30프레임씩 움직임 / 정지
+        x = 100 + (i % 30) * 12 if phase == 0 else 100 + 29 * 12
+        cv2.rectangle(frame, (x, 180), (x + 120, 320), (40, 160, 220), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def read_frames(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default=None)
+    parser.add_argument('--roi', default=None, help='x,y,w,h (원본 좌표)')
+    args = parser.parse_args()
+
+    path = args.video
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'synthetic.avi')
+        make_video(path)
+    frames = read_frames(path)
+    print(f'{path}: {len(frames)} frames, {frames[0].shape[1]}x{frames[0].shape[0]}')
+
+    work = [f.copy() for f in frames]
+    prev = cv2.cvtColor(work[0], cv2.COLOR_BGR2GRAY)
+    start = time.perf_counter()
+    legacy_moved = []
+    for frame in work[1:]:
+        prev, moved = legacy_gate(prev, frame)
+        legacy_moved.append(moved)
+    fps_legacy = (len(frames) - 1) / (time.perf_counter() - start)
+    legacy_still = np.array(legacy_moved) < MIN_MOVED
+    print(f'{"legacy (full res + loop)":<28} {fps_legacy:8.1f} fps')
+
+    roi = tuple(int(v) for v in args.roi.split(',')) if args.roi else None
+    for scale in (1.0, 0.5, 0.25):
+        gate = MotionGate(scale=scale, roi=roi)
+        work = [f.copy() for f in frames]
+        gate.reset(work[0])
+        start = time.perf_counter()
+        moved = []
+        for frame in work[1:]:
+            moved.append(gate.update(frame))
+            gate.draw(frame)
+        fps = (len(frames) - 1) / (time.perf_counter() - start)
+        # 정지/움직임 판정(moved < 5)이 기존과 같은 프레임 비율
+        agree = np.mean((np.array(moved) < MIN_MOVED) == legacy_still)
+        print(f'{f"MotionGate scale {scale}":<28} {fps:8.1f} fps   x{fps / fps_legacy:.1f}   정지 판정 일치 {agree:.3f}')
@@ -0,0 +1,183 @@
+import argparse
+import copy
+
+import numpy as np
+
+from codes.normalization_cam import StreamingNormalizer, normalization
+from codes.emedding_test_10emer_return_54node import process_keypoints
+from codes.benchmarks.common import load_clips, make_synthetic_clip, print_row, time_call
+
+
+# 기존 dict 기반 normalization vs 배열 기반 normalization vs StreamingNormalizer
+# 같은 클립에서 process_keypoints 입력이 비트 단위로 같은지 먼저 확인하고 시간 비교
+# (스트리밍은 클립이 끝난 뒤 close() 시간 = 수어 끝 -> 입력 준비까지 지연)
+# python -m codes.benchmarks.bench_normalization [--clip-dir datas/clips]
+
+
+# ---- 기존 구현 (dict 를 제자리에서 고침, 비교용으로 그대로 둠) ----
+
+def legacy_has_hand(frame):
+    left_hand = frame.get('left_hand_landmarks')
+    right_hand = frame.get('right_hand_landmarks')
+    has_left_hand = left_hand is not None and sum(kp.get('y', 0) >= 1 for kp in left_hand) == 0
+    has_right_hand = right_hand is not None and sum(kp.get('y', 0) >= 1 for kp in right_hand) == 0
+    return has_left_hand or has_right_hand
+
+
+def legacy_is_moving(prev_points, curr_points):
+    flow = curr_points - prev_points
+    moved = 0
+    for dx, dy in flow:
+        if (dx * dx + dy * dy) > 0.05:
+            moved += 1
+    return "moving" if moved > 5 else "stop"
+
+
+def legacy_get_points(frame):
+    points = []
+    for part, n in (('pose_landmarks', 33), ('left_hand_landmarks', 21), ('right_hand_landmarks', 21)):
+        landmarks = frame.get(part) or []
+        for i in range(n):
+            if i < len(landmarks):
+                points.append([landmarks[i]['x'], landmarks[i]['y']])
+            else:
+                points.append([0, 0])
+    return np.array(points)
+
+
+def legacy_normalization(data, target_frame_count=60):
+    start_idx = None
+    if not legacy_has_hand(data[0]):
+        for i in range(len(data)):
+            if legacy_has_hand(data[i]):
+                start_idx = i
+                break
+    else:
+        for i in range(len(data) - 1):
+            if legacy_is_moving(legacy_get_points(data[i]), legacy_get_points(data[i + 1])) == "moving":
+                start_idx = i
+                break
+    if start_idx is None:
+        start_idx = 0
+
+    end_idx = None
+    if not legacy_has_hand(data[-1]):
+        for i in range(len(data) - 1, -1, -1):
+            if legacy_has_hand(data[i]):
+                end_idx = i
+                break
+    else:
+        for i in range(len(data) - 1, -1, -1):
+            if legacy_is_moving(legacy_get_points(data[i - 1]), legacy_get_points(data[i])) == "moving":
+                end_idx = i
+                break
+    if end_idx is None:
+        end_idx = len(data) - 1
+
+    data = data[start_idx:end_idx + 1]
+    for new_idx, frame in enumerate(data):
+        frame['frame'] = new_idx
+
+    keypoints = []
+    for frame in data:
+        for part in ['pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks']:
+            landmarks = frame.get(part)
+            if isinstance(landmarks, list) and len(landmarks) > 0:
+                for landmark in landmarks:
+                    keypoints.append([landmark['x'], landmark['y'], landmark['z']])
+    keypoints = np.array(keypoints)
+
+    min_x, min_y = np.min(keypoints[:, 0]), np.min(keypoints[:, 1])
+    max_x, max_y = np.max(keypoints[:, 0]), np.max(keypoints[:, 1])
+    norm_x = (keypoints[:, 0] - min_x) / (max_x - min_x)
+    norm_y = (keypoints[:, 1] - min_y) / (max_y - min_y)
+    keypoints = np.stack([norm_x, norm_y, keypoints[:, 2]], axis=1)
+
+    idx = 0
+    for frame in data:
+        for part in ['pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks']:
+            if part in frame and frame[part] is not None:
+                for landmark in frame[part]:
+                    landmark['x'] = keypoints[idx, 0]
+                    landmark['y'] = keypoints[idx, 1]
+                    landmark['z'] = keypoints[idx, 2]
+                    idx += 1
+
+    if target_frame_count is None:
+        return data
+    indices = np.linspace(0, len(data) - 1, target_frame_count).astype(int)
+    return [data[i] for i in indices]
+
+
+# ---- 테스트 클립 ----
+
+def make_test_clips(count=24):
+    # 앞뒤 정지 구간 / 손이 화면 아래로 나간 프레임 / 손이 없는 프레임이 섞인 클립들
+    rng = np.random.default_rng(0)
+    clips = []
+    for seed in range(count):
+        n = int(rng.integers(20, 150))
+        frames = make_synthetic_clip(n, seed=seed, hand_drop=float(rng.choice([0.0, 0.1, 0.5])))
+        head, tail = int(rng.integers(0, n // 3)), int(rng.integers(0, n // 3))
+        for i in range(head):
+            frames[i] = dict(copy.deepcopy(frames[head]), frame=i)
+        for i in range(n - tail, n):
+            frames[i] = dict(copy.deepcopy(frames[n - tail - 1]), frame=i)
+        if seed % 3 == 0:
+            for frame in frames[:head] + frames[n - tail:]:
+                for key in ('left_hand_landmarks', 'right_hand_landmarks'):
+                    if frame[key] is not None:
+                        frame[key][0]['y'] = 1.2
+        if seed % 4 == 1:
+            frames[0]['left_hand_landmarks'] = frames[0]['right_hand_landmarks'] = None
+        clips.append(frames)
+    return clips
+
+
+def check_equal(clips):
+    for i, frames in enumerate(clips):
+        for target in (60, None):
+            fixed = None if target is None else 60
+            old = process_keypoints(legacy_normalization(copy.deepcopy(frames), target), fixed).numpy()
+            before = copy.deepcopy(frames)
+            new = process_keypoints(normalization(frames, target), fixed).numpy()
+            assert frames == before, f'clip {i}: 입력 dict 가 바뀜'
+            assert old.shape == new.shape, f'clip {i} target {target}: {old.shape} != {new.shape}'
+            assert np.array_equal(old, new), f'clip {i} target {target}: max diff {np.abs(old - new).max()}'
+
+            streaming = StreamingNormalizer(target)
+            for frame in frames:
+                streaming.push_frame(frame)
+            streamed = process_keypoints(streaming.close(), fixed).numpy()
+            assert np.array_equal(new, streamed), f'clip {i} target {target}: 스트리밍 결과가 다름'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clip-dir', default=None, help='<라벨>/<클립>.json 구조의 녹화 클립 폴더')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    clips = [frames for _, frames in load_clips(args.clip_dir)] if args.clip_dir else make_test_clips()
+    check_equal(clips)
+    print(f'{len(clips)}개 클립: 기존 구현 / 스트리밍과 process_keypoints 입력이 같음 (60프레임 / 가변 길이)')
+
+    for n in (60, 150, 300):
+        frames = make_synthetic_clip(n, seed=n)
+        # 기존 구현은 입력 dict 를 고치므로 매번 복사본으로 (복사 시간은 따로 빼서 보여줌)
+        t_copy = time_call(lambda: copy.deepcopy(frames), repeat=args.repeat)
+        t_old = time_call(lambda: process_keypoints(legacy_normalization(copy.deepcopy(frames))), repeat=args.repeat)
+        t_new = time_call(lambda: process_keypoints(normalization(frames)), repeat=args.repeat)
+        print(f'--- {n} frames')
+        print_row('deepcopy (legacy overhead)', t_copy)
+        print_row('legacy dict normalization', t_old)
+        print_row('array normalization', t_new, f'x{(t_old[0] - t_copy[0]) / t_new[0]:.1f}')
+
+        streaming = StreamingNormalizer()
+        t_push = time_call(lambda: streaming.push_frame(frames[0]), repeat=args.repeat)
+        streaming.reset()
+        for frame in frames:
+            streaming.push_frame(frame)
+        t_close = time_call(lambda: process_keypoints(streaming.close()), repeat=args.repeat)
+        print_row('streaming push (per frame)', t_push)
+        print_row('streaming close', t_close, f'x{t_new[0] / t_close[0]:.1f} vs array')
@@ -0,0 +1,70 @@
+import numpy as np
+import torch
+
+from codes.emedding_test_10emer_return_54node import process_keypoints
+from codes.benchmarks.common import make_synthetic_clip, time_call, print_row
+
+
+# 기존 관절별 루프 process_keypoints vs 배열 한 번에 채우는 버전
+# python -m codes.benchmarks.bench_process_keypoints
+
+
+def process_keypoints_loop(frames_json, fixed_length=60):
+    # 비교용: 이전 구현 그대로
+    num_pose = 12
+    num_hand = 21
+    num_nodes = num_pose + 2 * num_hand
+
+    keypoints_all = []
+    for frame in frames_json:
+        pose = frame.get('pose_landmarks') or []
+        lhand = frame.get('left_hand_landmarks') or []
+        rhand = frame.get('right_hand_landmarks') or []
+
+        frame_kps = []
+        for i in range(num_pose):
+            if i < len(pose):
+                kp = pose[i]
+                frame_kps.append([kp['x'], kp['y'], kp['z'], kp['visibility']])
+            else:
+                frame_kps.append([0, 0, 0, 0])
+        for i in range(num_hand):
+            if i < len(lhand):
+                kp = lhand[i]
+                frame_kps.append([kp['x'], kp['y'], kp['z'], kp['visibility']])
+            else:
+                frame_kps.append([0, 0, 0, 0])
+        for i in range(num_hand):
+            if i < len(rhand):
+                kp = rhand[i]
+                frame_kps.append([kp['x'], kp['y'], kp['z'], kp['visibility']])
+            else:
+                frame_kps.append([0, 0, 0, 0])
+        keypoints_all.append(frame_kps)
+
+    T = len(keypoints_all)
+    if T < fixed_length:
+        padding = [[0, 0, 0, 0]] * num_nodes
+        for _ in range(fixed_length - T):
+            keypoints_all.append(padding)
+    elif T > fixed_length:
+        keypoints_all = keypoints_all[:fixed_length]
+
+    arr = np.array(keypoints_all).transpose(2, 0, 1)
+    return torch.tensor(arr, dtype=torch.float32).unsqueeze(0)
+
+
+if __name__ == "__main__":
+    for num_frames in (60, 300):
+        frames = make_synthetic_clip(num_frames)
+        for fixed_length in sorted({60, num_frames}):
+            old = process_keypoints_loop(frames, fixed_length)
+            new = process_keypoints(frames, fixed_length)
+            assert torch.equal(old, new), '결과가 다름'
+            assert new.is_contiguous()
+
+            t_old = time_call(lambda: process_keypoints_loop(frames, fixed_length))
+            t_new = time_call(lambda: process_keypoints(frames, fixed_length))
+            print(f'--- {num_frames} frames -> fixed_length {fixed_length}')
+            print_row('loop', t_old)
+            print_row('columnar', t_new, f'x{t_old[0] / t_new[0]:.1f}')
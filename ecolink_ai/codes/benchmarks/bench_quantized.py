@@ -0,0 +1,74 @@
+import argparse
+
+import torch
+
+from codes.model_registry import load_stgcn
+from codes.quantization import default_engine, quantize_model
+from codes.benchmarks.common import load_batches, time_call, print_row
+from codes.benchmarks.bench_inference_model import randomize_bn
+
+
+# fp32 vs INT8 정확도/지연 비교 리포트
+# python -m codes.benchmarks.bench_quantized --checkpoint datas/xxx.pth --labels 10emer --clip-dir datas/eval --calib-dir datas/calib
+# 체크포인트/클립 없이 돌리면 랜덤 가중치 + 랜덤 입력으로 fp32 와의 top-1 일치율만 봄
+
+LABELS = {
+    '10emer': 'codes.emedding_test_10emer_return_54node',
+    '8police': 'codes.emedding_test_8emer_return_54node',
+}
+
+
+def predict(model, inputs):
+    with torch.no_grad():
+        return torch.cat([model(x).argmax(1) for x in inputs])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--labels', choices=sorted(LABELS), default='10emer')
+    parser.add_argument('--clip-dir', default=None, help='평가용 <라벨>/<클립>.json 또는 텐서 저장소')
+    parser.add_argument('--calib-dir', default=None, help='calibration 용 <라벨>/<클립>.json 또는 텐서 저장소')
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    label_list = __import__(LABELS[args.labels], fromlist=['label_list']).label_list
+    if args.checkpoint:
+        model = load_stgcn(args.checkpoint, len(label_list), torch.device('cpu'))
+    else:
+        from codes.models.st_gcn_18_10words_54node import STGCNModel
+        model = STGCNModel(in_channels=4, num_class=len(label_list))
+        randomize_bn(model)
+        model.eval()
+
+    if args.clip_dir:
+        inputs, targets = load_batches(args.clip_dir, label_list)
+    else:
+        inputs = [torch.rand(16, 4, 60, 54) for _ in range(4)]
+        targets = None
+
+    if args.calib_dir:
+        calib, _ = load_batches(args.calib_dir)
+    else:
+        calib = inputs
+
+    engine = default_engine()
+    qmodel = quantize_model(model, calib, engine)
+
+    fp32_pred = predict(model, inputs)
+    int8_pred = predict(qmodel, inputs)
+    agree = (fp32_pred == int8_pred).float().mean().item()
+    print(f'engine {engine}, {len(fp32_pred)} clips, fp32/int8 top-1 일치율 {agree:.3f}')
+    if targets is not None:
+        print(f'accuracy  fp32 {(fp32_pred == targets).float().mean().item():.3f}'
+              f'   int8 {(int8_pred == targets).float().mean().item():.3f}')
+
+    x = torch.rand(1, 4, 60, 54)
+    with torch.no_grad():
+        t_fp32 = time_call(lambda: model(x), repeat=30)
+        t_int8 = time_call(lambda: qmodel(x), repeat=30)
+    print_row('fp32 (batch 1)', t_fp32)
+    print_row('int8 (batch 1)', t_int8, f'x{t_fp32[0] / t_int8[0]:.2f}')
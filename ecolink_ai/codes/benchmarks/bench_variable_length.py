@@ -0,0 +1,151 @@
+import argparse
+import os
+import tempfile
+
+import torch
+
+import codes.batch_inference as batch_inference
+
+from codes.models.st_gcn_18_10words_54node import STGCNModel, build_inference_model
+from codes.multihead import backbone_from_stgcn
+from codes.variable_length import BUCKETS, MAX_LENGTH, bucket_for, cap_length, forward_masked, pad_batch
+from codes.benchmarks.common import load_clips, time_call, print_row
+from codes.benchmarks.bench_inference_model import randomize_bn
+
+
+# 길이 버킷별 지연 / 정확도: 60프레임 고정 vs 실제 길이 + 마스킹
+# python -m codes.benchmarks.bench_variable_length [--batch 8]
+# python -m codes.benchmarks.bench_variable_length --checkpoint datas/xxx.pth --labels 10emer --clip-dir datas/eval
+#   -> 버킷마다 같은 클립을 60프레임으로 뽑은 것 / 잘라낸 구간 그대로 넣은 것의 정확도 (가변 길이를 켜기 전에 확인)
+# clip-dir 은 <라벨>/<클립>.json 녹화 클립 (텐서 저장소는 이미 60프레임이라 안 됨)
+# 시간 비교는 MAX_LENGTH 보다 긴 버킷에서 자른 것(cap_length, run_model 이 쓰는 경로) / 안 자른 것 둘 다
+
+LABELS = {
+    '10emer': 'codes.emedding_test_10emer_return_54node',
+    '8police': 'codes.emedding_test_8emer_return_54node',
+}
+
+
+def make_batch(low, high, batch, seed):
+    g = torch.Generator().manual_seed(seed)
+    lengths = torch.randint(low, high + 1, (batch,), generator=g)
+    return [torch.rand(1, 4, int(L), 54, generator=g) for L in lengths]
+
+
+def check_run_model(model):
+    # run_model(variable_length=True): 마이크로 배칭을 켠 경로 / 끈 경로(ECOLINK_MICRO_BATCHING=0) 가 같은 로짓
+    # MAX_LENGTH 보다 긴 클립은 60프레임으로 뽑은 것을 model(x) 에 넣은 것과 같음
+    num_class = model.fcn.out_channels
+    label_list = [str(i) for i in range(num_class)]
+    micro_batching = batch_inference.MICRO_BATCHING
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.pth')
+        torch.save({'model_state_dict': model.state_dict()}, path)
+        try:
+            for L in (17, 45, 60, 150):
+                x = torch.rand(1, 4, L, 54)
+                batch_inference.MICRO_BATCHING = True
+                batched = batch_inference.run_model(path, label_list, x, variable_length=True)
+                batch_inference.MICRO_BATCHING = False
+                single = batch_inference.run_model(path, label_list, x, variable_length=True)
+                assert torch.allclose(batched, single, rtol=1e-4, atol=1e-4), (L, (batched - single).abs().max())
+                if L > MAX_LENGTH:
+                    with torch.no_grad():
+                        ref = model(cap_length(x))
+                    assert torch.allclose(ref, single, rtol=1e-4, atol=1e-4), (L, (ref - single).abs().max())
+        finally:
+            batch_inference.MICRO_BATCHING = micro_batching
+
+
+def check(model, fused):
+    # 1) L=60 이면 model(x) 와 같음  2) 배치/패딩과 무관 (샘플 하나씩 넣은 것과 같음)  3) 멀티헤드도 같은 경로
+    x = torch.rand(2, 4, 60, 54)
+    with torch.no_grad():
+        for m in (model, fused):
+            out = forward_masked(m, x, torch.tensor([60, 60]))
+            assert torch.allclose(model(x), out, rtol=1e-4, atol=1e-4), (model(x) - out).abs().max()
+
+        xs = make_batch(10, 90, 4, seed=0)
+        batch, lengths = pad_batch(xs)
+        ref = torch.cat([forward_masked(model, x, torch.tensor([x.size(2)])) for x in xs])
+        for m in (model, fused):
+            out = forward_masked(m, batch, lengths)
+            assert torch.allclose(ref, out, rtol=1e-4, atol=1e-4), (ref - out).abs().max()
+
+        multi = backbone_from_stgcn(model)
+        multi.add_head('base', [str(i) for i in range(model.fcn.out_channels)], model.fcn)
+        out = forward_masked(multi, batch, lengths)['base']
+        assert torch.allclose(ref, out, rtol=1e-4, atol=1e-4), (ref - out).abs().max()
+
+
+def accuracy_by_bucket(model, clips, label_list):
+    # {버킷: [클립 수, 60프레임 정답 수, 가변 길이 정답 수]}
+    from codes.normalization_cam import normalization
+    from codes.emedding_test_10emer_return_54node import process_keypoints
+
+    results = {}
+    with torch.no_grad():
+        for label, frames in clips:
+            target = label_list.index(label)
+            fixed = model(process_keypoints(normalization(frames)).contiguous()).argmax(1).item()
+            x = process_keypoints(normalization(frames, None), fixed_length=None)
+            row = results.setdefault(bucket_for(x.size(2)), [0, 0, 0])
+            x = cap_length(x)
+            var = forward_masked(model, x, torch.tensor([x.size(2)])).argmax(1).item()
+            row[0] += 1
+            row[1] += int(fixed == target)
+            row[2] += int(var == target)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--checkpoint', default=None)
+    parser.add_argument('--labels', choices=sorted(LABELS), default='10emer')
+    parser.add_argument('--clip-dir', default=None, help='<라벨>/<클립>.json 녹화 클립 폴더 (정확도 비교)')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    label_list = __import__(LABELS[args.labels], fromlist=['label_list']).label_list
+    model = STGCNModel(in_channels=4, num_class=len(label_list))
+    if args.checkpoint:
+        model.load_state_dict(torch.load(args.checkpoint, map_location='cpu')['model_state_dict'])
+    else:
+        randomize_bn(model)
+    model.eval()
+    fused = build_inference_model(model)
+    check(model, fused)
+    check_run_model(model)
+
+    if args.clip_dir:
+        results = accuracy_by_bucket(model, load_clips(args.clip_dir), label_list)
+        low = 1
+        for bound in BUCKETS:
+            n, fixed, var = results.get(bound, (0, 0, 0))
+            if n:
+                print(f'bucket ({low:3d}, {bound:3d}]  {n:4d} clips   60 frames acc {fixed / n:.3f}   '
+                      f'variable acc {var / n:.3f}')
+            low = bound + 1
+
+    low = 1
+    for bound in BUCKETS:
+        xs = make_batch(low, bound, args.batch, seed=bound)
+        batch, lengths = pad_batch(xs)
+        fixed = torch.rand(args.batch, 4, 60, 54)
+        capped, capped_lengths = pad_batch([cap_length(x) for x in xs])
+        with torch.no_grad():
+            t_fixed = time_call(lambda: fused(fixed), repeat=args.repeat, warmup=1)
+            t_var = time_call(lambda: forward_masked(fused, batch, lengths), repeat=args.repeat, warmup=1)
+            if bound > MAX_LENGTH:
+                t_cap = time_call(lambda: forward_masked(fused, capped, capped_lengths), repeat=args.repeat, warmup=1)
+        print(f'--- bucket ({low}, {bound}]  batch {args.batch}, padded to {batch.size(2)}')
+        print_row('fixed 60 frames', t_fixed)
+        print_row('variable + mask', t_var, f'x{t_fixed[0] / t_var[0]:.2f}')
+        if bound > MAX_LENGTH:
+            print_row(f'capped at {MAX_LENGTH}', t_cap, f'x{t_fixed[0] / t_cap[0]:.2f}')
+        low = bound + 1
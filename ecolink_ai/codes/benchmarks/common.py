@@ -0,0 +1,51 @@
+import statistics
+import time
+
+import numpy as np
+
+from codes.tensor_store import clips_to_batches, load_batches, load_clips
+
+
+# 벤치마크 공용 도구
+# 실행은 ecolink_ai 폴더에서: python -m codes.benchmarks.<스크립트>
+# 클립/배치 읽기(load_clips, load_batches)는 codes/tensor_store.py
+
+
+def make_synthetic_clip(num_frames, seed=0, hand_drop=0.1):
+    # video_to_keypoints 결과와 같은 모양의 가짜 클립 (pose 12 + 양손 21, 가끔 손이 빠짐)
+    rng = np.random.default_rng(seed)
+
+    def block(n):
+        return [
+            {'x': float(x), 'y': float(y), 'z': float(z), 'visibility': float(v)}
+            for x, y, z, v in rng.random((n, 4))
+        ]
+
+    frames = []
+    for i in range(num_frames):
+        frames.append({
+            'frame': i,
+            'pose_landmarks': block(12),
+            'left_hand_landmarks': block(21) if rng.random() > hand_drop else None,
+            'right_hand_landmarks': block(21) if rng.random() > hand_drop else None,
+        })
+    return frames
+
+
+def time_call(fn, repeat=50, warmup=3):
+    # 반환: (평균 ms, p50 ms, p99 ms)
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.mean(samples), statistics.median(samples), p99
+
+
+def print_row(name, timing, extra=''):
+    mean, p50, p99 = timing
+    print(f'{name:<32} mean {mean:8.3f} ms   p50 {p50:8.3f} ms   p99 {p99:8.3f} ms   {extra}')
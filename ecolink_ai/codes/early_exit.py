@@ -0,0 +1,89 @@
+import argparse
+import os
+
+import torch
+import torch.nn.functional as F
+
+from .models.st_gcn_18_10words_54node import EarlyExitSTGCN
+
+
+# 중간 출구(64/128채널 단계) 분류기 학습/저장/로드
+# 본 모델 가중치는 그대로 두고 출구 헤드만 녹화 클립으로 학습해서 <체크포인트>.exits.pth 로 저장
+#   python -m codes.early_exit --checkpoint datas/xxx.pth --labels 10emer --clip-dir datas/clips
+# ECOLINK_MODEL_VARIANT=early_exit 이면 classify/classify8 이 출구 달린 모델을 씀
+# 샘플마다 어느 출구에서 끝났는지는 run_model(..., return_exits=True) 로 (마이크로 배칭 켜져 있어도 샘플별)
+
+# 출구별 임계값 (64채널, 128채널), 하나만 주면 두 출구에 같이
+THRESHOLDS = tuple(float(t) for t in os.getenv('ECOLINK_EXIT_THRESHOLDS', '0.9,0.9').split(','))
+
+
+def exits_path(model_path):
+    base, _ = os.path.splitext(model_path)
+    return f'{base}.exits.pth'
+
+
+def fit_exit_heads(model, inputs, targets, epochs=200, lr=0.05):
+    # model: EarlyExitSTGCN, 본 모델은 고정하고 출구 특징을 한 번만 뽑아서 헤드만 학습
+    # 반환: 출구별 train 정확도
+    model.eval()
+    device = model.model.A.device
+    with torch.no_grad():
+        per_batch = [model.exit_features(x.to(device)) for x in inputs]
+    targets = targets.to(device)
+
+    accs = []
+    for k, head in enumerate(model.exits):
+        features = torch.cat([f[k] for f in per_batch])
+        optimizer = torch.optim.Adam(head.parameters(), lr=lr)
+        head.train()
+        for _ in range(epochs):
+            optimizer.zero_grad()
+            loss = F.cross_entropy(head(features).flatten(1), targets)
+            loss.backward()
+            optimizer.step()
+        head.eval()
+        with torch.no_grad():
+            accs.append((head(features).flatten(1).argmax(1) == targets).float().mean().item())
+    return accs
+
+
+def save_exit_heads(model, path):
+    torch.save({'exits_state_dict': model.exits.state_dict(), 'thresholds': model.thresholds}, path)
+
+
+def load_stgcn_early_exit(model_path, num_class, device):
+    # 레지스트리용 builder, 임계값은 ECOLINK_EXIT_THRESHOLDS 가 우선
+    from .model_registry import load_stgcn
+
+    path = exits_path(model_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'출구 헤드 없음: {path} (python -m codes.early_exit 으로 먼저 학습)')
+    model = EarlyExitSTGCN(load_stgcn(model_path, num_class, device), THRESHOLDS)
+    checkpoint = torch.load(path, map_location=device)
+    model.exits.load_state_dict(checkpoint['exits_state_dict'])
+    return model.to(device).eval()
+
+
+if __name__ == "__main__":
+    from .tensor_store import load_batches
+    from .model_registry import load_stgcn
+    from .emedding_test_10emer_return_54node import label_list as label_list_10emer
+    from .emedding_test_8emer_return_54node import label_list as label_list_8police
+
+    LABELS = {'10emer': label_list_10emer, '8police': label_list_8police}
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', required=True)
+    parser.add_argument('--labels', choices=sorted(LABELS), required=True)
+    parser.add_argument('--clip-dir', required=True, help='<라벨>/<클립>.json 구조의 녹화 클립 폴더 또는 텐서 저장소')
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    label_list = LABELS[args.labels]
+    model = EarlyExitSTGCN(load_stgcn(args.checkpoint, len(label_list), torch.device('cpu')), THRESHOLDS)
+    inputs, targets = load_batches(args.clip_dir, label_list)
+    accs = fit_exit_heads(model, inputs, targets)
+
+    output = args.output or exits_path(args.checkpoint)
+    save_exit_heads(model, output)
+    print(f'{len(targets)}개 클립, 출구별 train acc ' + ', '.join(f'{a:.3f}' for a in accs) + f', 저장: {output}')
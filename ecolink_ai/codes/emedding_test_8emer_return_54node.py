@@ -0,0 +1,20 @@
+import torch
+from .batch_inference import run_model
+from .emedding_test_10emer_return_54node import process_keypoints
+
+# 경찰 8단어 (UploadKeypointsAPIView의 label_list_Police와 순서 같아야 함)
+label_list=['경찰','교통사고','깔리다','병원','불나다','숨을안쉬다','쓰러지다','연락해주세요']
+
+
+
+def classify8(model_path, json_data, variable_length=False):
+    # 입력 데이터 준비 (variable_length=True 면 60프레임으로 맞추지 않음 -> normalization(data, None) 결과를 넘길 것)
+    x = process_keypoints(json_data, fixed_length=None if variable_length else 60)
+
+    # 추론 (레지스트리에 올라간 모델로, 동시에 들어온 요청과 묶어서 한 번에 forward)
+    output = run_model(model_path, label_list, x, variable_length=variable_length)
+    with torch.no_grad():
+        pred = torch.argmax(output, dim=1).item()
+
+    # 인덱스 반환 -> 라벨 매핑은 호출하는 쪽에서
+    return pred
@@ -0,0 +1,152 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from importlib import metadata
+
+from .landmark_profiles import LANDMARK_PROFILE, POSE_LANDMARKS, profile_options
+
+
+# 영상별 추출 키포인트 캐시 (내용 주소 방식)
+# 키 = sha1(영상 바이트) + 추출 설정 (프로파일 모델 옵션, pose 랜드마크 부분집합, 움직임 게이트, mediapipe 버전)
+#   -> 파일 이름/위치가 바뀌어도 적중, 설정이 하나라도 바뀌면 다른 키
+# 저장: <캐시 폴더>/<키 앞 2자리>/<키>.json.gz (프레임 dict 리스트), 쓸 때는 임시 파일 후 교체
+# 전체 크기가 ECOLINK_KEYPOINT_CACHE_MB 를 넘으면 오래 안 쓴 파일(mtime, 적중 때 갱신)부터 지움
+#
+#   frames = cached_extract_keypoints('datas/videos/교통사고/a.mp4', 'tracking')
+#   python -m codes.keypoint_cache [--clear]     (캐시 크기 확인 / 비우기)
+
+CACHE_DIR = os.getenv('ECOLINK_KEYPOINT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'ecolink', 'keypoints'))
+CACHE_MAX_MB = float(os.getenv('ECOLINK_KEYPOINT_CACHE_MB', 2048))
+CACHE_VERSION = 1   # 프레임 dict 모양이 바뀌면 올림
+HASH_BLOCK = 1 << 20
+
+
+def video_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def extraction_settings(profile=LANDMARK_PROFILE, time_threshold=None):
+    # 결과에 영향을 주는 설정만 (그리기 여부는 빼고)
+    options = profile_options(profile)
+    settings = {
+        'version': CACHE_VERSION,
+        'holistic': options['holistic'],
+        'static_image_mode': options['static_image_mode'],
+        'model_complexity': options['model_complexity'],
+        'pose_landmarks': POSE_LANDMARKS,
+        'time_threshold': time_threshold,
+    }
+    try:
+        settings['mediapipe'] = metadata.version('mediapipe')
+    except metadata.PackageNotFoundError:
+        settings['mediapipe'] = None
+    if time_threshold is not None:
+        from .motion_gate import MOTION_SCALE, GRID_STEP, MOVE_THRESHOLD, MIN_MOVED
+        settings['motion'] = [MOTION_SCALE, GRID_STEP, MOVE_THRESHOLD, MIN_MOVED]
+    return settings
+
+
+def cache_key(video_hash, profile=LANDMARK_PROFILE, time_threshold=None):
+    settings = json.dumps(extraction_settings(profile, time_threshold), sort_keys=True)
+    return hashlib.sha1(f'{video_hash}:{settings}'.encode('utf-8')).hexdigest()
+
+
+class KeypointCache:
+    def __init__(self, path=CACHE_DIR, max_mb=CACHE_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + '.json.gz')
+
+    def get(self, key):
+        # 없으면 None (다른 프로세스가 지우는 중이어도 None)
+        path = self._file(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                frames = json.load(f)
+            os.utime(path)   # LRU: 적중하면 최근 사용으로
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+        return frames
+
+    def put(self, key, frames):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(frames, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def files(self):
+        # [(mtime, 크기, 경로)], 오래된 순
+        entries = []
+        for root, _, files in os.walk(self.path):
+            for file in files:
+                if not file.endswith('.json.gz'):
+                    continue
+                path = os.path.join(root, file)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.files())
+
+    def evict(self, max_bytes=None):
+        # 전체 크기가 max_bytes 이하가 될 때까지 오래된 것부터, 지운 파일 수 반환
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.files()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        return self.evict(0)
+
+
+def cached_extract_keypoints(path, profile=LANDMARK_PROFILE, time_threshold=None, cache=None):
+    # extract_keypoints 와 같은 프레임 dict 리스트, 같은 영상 + 같은 설정이면 MediaPipe 를 안 돌림
+    # path: 로컬 영상 파일 (바이트로 키를 만들어야 해서 카메라 / URL 은 안 됨)
+    from .videoTest_mediapipe_cam_json import extract_keypoints
+
+    cache = cache or KeypointCache()
+    key = cache_key(video_sha1(path), profile, time_threshold)
+    frames = cache.get(key)
+    if frames is None:
+        frames = extract_keypoints(path, profile, time_threshold)
+        cache.put(key, frames)
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', default=CACHE_DIR)
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+
+    cache = KeypointCache(args.dir)
+    if args.clear:
+        print(f'{cache.clear()}개 삭제')
+    entries = cache.files()
+    print(f'{args.dir}: {len(entries)}개 영상, {sum(size for _, size, _ in entries) / 1024 / 1024:.1f} MB '
+          f'(최대 {cache.max_bytes / 1024 / 1024:.0f} MB)')
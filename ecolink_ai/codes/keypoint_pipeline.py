@@ -0,0 +1,235 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from .motion_gate import RECOGNIZING, ENDED, MotionGate, MotionStateMachine, draw_state
+from .landmark_profiles import LANDMARK_PROFILE, profile_options
+
+
+# video_to_keypoints 를 단계별 스레드로 나눈 버전
+#   capture -> motion(optical flow 게이트 + 상태 머신) -> landmark(Holistic) -> display(메인 스레드)
+# 단계 사이 큐는 크기 제한, drop=True 면 큐가 차 있을 때 오래된 프레임을 버리고 새 프레임을 넣음 (최신 프레임 우선)
+# drop=False 면 막히면 기다림 -> 영상 파일에서는 한 스레드로 돈 것과 같은 all_frames
+#
+# 카메라: run_pipeline(0), 영상 파일: run_pipeline('datas/sample.mp4') (파일은 기본 drop=False, 영상 시각 기준 타이머)
+
+QUEUE_SIZE = 2
+
+
+class HolisticLandmarker:
+    # 기본 랜드마크 단계 (프로파일별 모델), mediapipe 는 landmark 스레드 안에서만 올림
+    def __init__(self, profile=LANDMARK_PROFILE):
+        from .videoTest_mediapipe_cam_json import make_holistic
+        self.holistic = make_holistic(profile)
+
+    def process(self, frame, frame_idx):
+        # 반환: (프레임 dict, 그리기용 결과)
+        from .videoTest_mediapipe_cam_json import results_to_frame_dict
+        results = self.holistic.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        return results_to_frame_dict(results, frame_idx), results
+
+    def draw(self, frame, results):
+        from .videoTest_mediapipe_cam_json import draw_results
+        draw_results(frame, results)
+
+    def close(self):
+        self.holistic.close()
+
+
+class StageStats:
+    def __init__(self):
+        self.frames = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.dropped = 0   # 이 단계 입력 큐에서 버려진 프레임
+
+    def add(self, start):
+        ms = (time.perf_counter() - start) * 1000
+        self.frames += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self):
+        mean = self.total_ms / self.frames if self.frames else 0.0
+        return {'frames': self.frames, 'mean_ms': mean, 'max_ms': self.max_ms, 'dropped': self.dropped}
+
+
+class KeypointPipeline:
+    STAGES = ('capture', 'motion', 'landmark', 'display')
+
+    def __init__(self, cap, time_threshold=3, on_frame=None, display=True, drop=True,
+                 media_clock=False, landmarker_factory=None, queue_size=QUEUE_SIZE, profile=LANDMARK_PROFILE):
+        # media_clock: 영상 파일이면 True -> 상태 머신 타이머를 영상 시각(CAP_PROP_POS_MSEC)으로
+        # profile: 랜드마크 추출 프로파일, 그리기 여부도 프로파일을 따름 (video_to_keypoints 와 같게)
+        self.cap = cap
+        self.time_threshold = time_threshold
+        self.on_frame = on_frame
+        self.display = display
+        self.drop = drop
+        self.media_clock = media_clock
+        self.landmarker_factory = landmarker_factory or (lambda: HolisticLandmarker(profile))
+        self.draw = profile_options(profile)['draw']
+
+        self.motion_queue = queue.Queue(queue_size)
+        self.landmark_queue = queue.Queue(queue_size)
+        self.display_queue = queue.Queue(queue_size)
+        self.stats = {name: StageStats() for name in self.STAGES}
+        self.stop_event = threading.Event()
+        self.all_frames = []
+        self.error = None
+
+    def _put(self, q, item, stats):
+        if self.drop:
+            while True:
+                try:
+                    q.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                        stats.dropped += 1
+                    except queue.Empty:
+                        pass
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _items(self, q):
+        # None(끝) 이 오거나, 멈춤 요청 뒤 큐가 빌 때까지
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            yield item
+
+    def _run_stage(self, target):
+        try:
+            target()
+        except Exception as e:
+            self.error = e
+            self.stop_event.set()
+
+    def _capture(self):
+        stats = self.stats['capture']
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            now = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 if self.media_clock else time.time()
+            stats.add(start)
+            self._put(self.motion_queue, (frame, now), self.stats['motion'])
+        self._put(self.motion_queue, None, self.stats['motion'])
+
+    def _motion(self):
+        stats = self.stats['motion']
+        gate = MotionGate()
+        state_machine = MotionStateMachine(self.time_threshold)
+        first = True
+        for frame, now in self._items(self.motion_queue):
+            start = time.perf_counter()
+            if first:
+                gate.reset(frame)   # 첫 프레임은 이전 프레임으로만 씀
+                first = False
+                continue
+            moved = gate.update(frame)
+            if self.draw:
+                gate.draw(frame)
+            motion_state = state_machine.update(moved, now)
+            draw_state(frame, motion_state)
+            stats.add(start)
+
+            if motion_state == RECOGNIZING:
+                self._put(self.landmark_queue, (frame, now), self.stats['landmark'])
+            elif self.display:
+                self._put(self.display_queue, frame, self.stats['display'])
+            if motion_state == ENDED:
+                break
+        # 끝 표시를 넘긴 뒤 capture 를 멈춤 (landmark 는 남은 프레임을 다 처리)
+        self._put(self.landmark_queue, None, self.stats['landmark'])
+        self.stop_event.set()
+
+    def _landmark(self):
+        stats = self.stats['landmark']
+        landmarker = self.landmarker_factory()
+        prev_time = None
+        try:
+            for frame, now in self._items(self.landmark_queue):
+                start = time.perf_counter()
+                result_dict, results = landmarker.process(frame, len(self.all_frames))
+                self.all_frames.append(result_dict)
+                if self.on_frame is not None:
+                    self.on_frame(result_dict)
+                stats.add(start)
+
+                if self.display:
+                    if self.draw:
+                        landmarker.draw(frame, results)
+                    if prev_time is not None and now > prev_time:
+                        cv2.putText(frame, "FPS : %0.1f" % (1 / (now - prev_time)), (0, 100),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0))
+                    self._put(self.display_queue, frame, self.stats['display'])
+                prev_time = now
+        finally:
+            landmarker.close()
+
+    def run(self):
+        # 반환: all_frames (video_to_keypoints 와 같은 프레임 dict 리스트)
+        threads = [
+            threading.Thread(target=self._run_stage, args=(target,), name=f'keypoints-{name}', daemon=True)
+            for name, target in (('capture', self._capture), ('motion', self._motion), ('landmark', self._landmark))
+        ]
+        for thread in threads:
+            thread.start()
+
+        # imshow/waitKey 는 메인 스레드에서
+        stats = self.stats['display']
+        while any(thread.is_alive() for thread in threads):
+            if not self.display:
+                threads[-1].join(0.1)
+                continue
+            try:
+                frame = self.display_queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            cv2.imshow('Optical flow', frame)
+            stats.add(start)
+            if cv2.waitKey(1) == ord('q'):
+                self.stop_event.set()
+
+        self.stop_event.set()
+        for thread in threads:
+            thread.join()
+        self.cap.release()
+        if self.display:
+            cv2.destroyAllWindows()
+        if self.error is not None:
+            raise self.error
+        return self.all_frames
+
+    def stage_stats(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+
+def run_pipeline(source, time_threshold=3, on_frame=None, display=True, drop=None, **kwargs):
+    # source: 카메라 번호 또는 영상 파일 경로, drop 기본값은 카메라 True / 파일 False
+    # 반환: (all_frames, 단계별 통계)
+    is_file = isinstance(source, str)
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f'영상 열기 실패: {source}')
+    pipeline = KeypointPipeline(cap, time_threshold, on_frame, display,
+                                drop=not is_file if drop is None else drop, media_clock=is_file, **kwargs)
+    all_frames = pipeline.run()
+    return all_frames, pipeline.stage_stats()
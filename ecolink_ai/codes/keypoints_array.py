@@ -0,0 +1,80 @@
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+
+# 프레임 dict 리스트 <-> (4, 프레임수, 54) 배열 변환
+# 관절 순서: pose 12 (11~22번) + 왼손 21 + 오른손 21, 채널 순서: x, y, z, visibility
+
+NUM_POSE = 12
+NUM_HAND = 21
+NUM_NODES = NUM_POSE + 2 * NUM_HAND
+NUM_CHANNELS = 4
+
+# (프레임 dict 키, 시작 관절, 관절 수)
+BLOCKS = (
+    ('pose_landmarks', 0, NUM_POSE),
+    ('left_hand_landmarks', NUM_POSE, NUM_HAND),
+    ('right_hand_landmarks', NUM_POSE + NUM_HAND, NUM_HAND),
+)
+
+_get_xyzv = itemgetter('x', 'y', 'z', 'visibility')
+
+
+def _landmark_values(landmarks, dtype, count):
+    # map + chain 이라 관절마다 파이썬 바이트코드가 돌지 않음
+    values = np.fromiter(chain.from_iterable(map(_get_xyzv, landmarks)), dtype=dtype, count=count)
+    # 손 visibility가 null 로 오는 클라이언트가 있음 (fromiter에서 nan이 됨) -> 0으로
+    if np.isnan(values).any():
+        np.nan_to_num(values, copy=False)
+    return values
+
+
+def frames_to_array(frames_json, fixed_length=None, dtype=np.float32):
+    # 반환: arr (4, L, 54), mask (L, 54) - mask는 실제 랜드마크가 있던 관절
+    # fixed_length가 있으면 뒤를 0으로 채우거나 잘라서 L=fixed_length, 없으면 L=프레임수
+    T = len(frames_json)
+    L = T if fixed_length is None else fixed_length
+    n = min(T, L)
+    frames = frames_json[:n]
+
+    arr = np.zeros((NUM_CHANNELS, L, NUM_NODES), dtype=dtype)
+    mask = np.zeros((L, NUM_NODES), dtype=bool)
+
+    for key, start, count in BLOCKS:
+        blocks = [frame.get(key) or () for frame in frames]
+        lengths = np.fromiter(map(len, blocks), dtype=np.intp, count=n)
+        end = start + count
+
+        # 관절이 다 있는 프레임은 한 번에 채움
+        full = np.flatnonzero(lengths >= count)
+        if len(full):
+            landmarks = list(chain.from_iterable(blocks[i][:count] for i in full))
+            values = _landmark_values(landmarks, dtype, len(full) * count * NUM_CHANNELS)
+            values = values.reshape(len(full), count, NUM_CHANNELS).transpose(2, 0, 1)
+            if len(full) == n:
+                arr[:, :n, start:end] = values
+                mask[:n, start:end] = True
+            else:
+                arr[:, full, start:end] = values
+                mask[full, start:end] = True
+
+        # 일부 관절만 있는 프레임 (드묾)
+        for i in np.flatnonzero((lengths > 0) & (lengths < count)):
+            k = lengths[i]
+            values = _landmark_values(blocks[i], dtype, k * NUM_CHANNELS)
+            arr[:, i, start:start + k] = values.reshape(k, NUM_CHANNELS).T
+            mask[i, start:start + k] = True
+
+    return arr, mask
+
+
+def fit_length(arr, length):
+    # (C, T, V) -> (C, length, V), 뒤를 0으로 채우거나 자름 (length=None 이면 그대로)
+    if length is None or arr.shape[1] == length:
+        return arr
+    out = np.zeros((arr.shape[0], length, arr.shape[2]), dtype=arr.dtype)
+    n = min(length, arr.shape[1])
+    out[:, :n] = arr[:, :n]
+    return out
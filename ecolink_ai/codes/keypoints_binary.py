@@ -0,0 +1,70 @@
+import struct
+
+import numpy as np
+
+from .keypoints_array import NUM_CHANNELS, NUM_NODES
+
+
+# 키포인트 바이너리 업로드 포맷 (JSON의 랜드마크 dict 대신 배열을 그대로 보냄)
+#
+# 헤더 12바이트, little-endian
+#   magic      4s  b'EKPT'
+#   version    B   1
+#   dtype      B   1=float32, 2=float16
+#   layout     B   1=pose12 + 왼손21 + 오른손21 (54관절)
+#   channels   B   4 (x, y, z, visibility)
+#   frames     I   프레임 수 T
+# 본문: (channels, T, 54) 순서로 채운 배열 -> decode 결과 (arr, mask) 를 normalization() 에 그대로 넘김
+#       없는 랜드마크(손이 안 잡힌 프레임 등)는 NaN
+
+MEDIA_TYPE = 'application/x-ecolink-keypoints'
+MAGIC = b'EKPT'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBI')
+
+DTYPES = {1: np.dtype('<f4'), 2: np.dtype('<f2')}
+LAYOUTS = {1: NUM_NODES}
+
+
+def encode_keypoints(arr, mask=None, dtype=np.float32):
+    # arr: (4, T, 54), mask: (T, 54) - 테스트/도구용 인코더 (프론트는 keypointService.js)
+    code = {np.dtype(np.float32): 1, np.dtype(np.float16): 2}[np.dtype(dtype)]
+    values = np.asarray(arr, dtype=DTYPES[code])
+    if mask is not None:
+        values = np.where(mask[None], values, np.nan).astype(DTYPES[code])
+    header = HEADER.pack(MAGIC, VERSION, code, 1, values.shape[0], values.shape[1])
+    return header + np.ascontiguousarray(values).tobytes()
+
+
+def decode_keypoints(buf):
+    # 반환: arr (4, T, 54) float32, mask (T, 54)
+    # float32이고 빠진 랜드마크가 없으면 buf를 복사 없이 그대로 보는 읽기 전용 배열
+    if len(buf) < HEADER.size:
+        raise ValueError('header too short')
+    magic, version, dtype_code, layout, channels, frames = HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError('bad magic')
+    if version != VERSION:
+        raise ValueError(f'unsupported version {version}')
+    if dtype_code not in DTYPES:
+        raise ValueError(f'unsupported dtype {dtype_code}')
+    if layout not in LAYOUTS:
+        raise ValueError(f'unsupported layout {layout}')
+    if channels != NUM_CHANNELS:
+        raise ValueError(f'expected {NUM_CHANNELS} channels, got {channels}')
+
+    dtype = DTYPES[dtype_code]
+    count = channels * frames * LAYOUTS[layout]
+    if len(buf) != HEADER.size + count * dtype.itemsize:
+        raise ValueError('payload size does not match header')
+
+    arr = np.frombuffer(buf, dtype=dtype, count=count, offset=HEADER.size)
+    arr = arr.reshape(channels, frames, LAYOUTS[layout])
+
+    missing = np.isnan(arr[0])
+    if dtype != np.float32:
+        arr = arr.astype(np.float32)
+    if missing.any():
+        arr = np.nan_to_num(arr)
+    return arr, ~missing
+
@@ -0,0 +1,101 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+
+# 랜드마크 추출 프로파일 (ECOLINK_LANDMARK_PROFILE, 모델 크기는 ECOLINK_MODEL_COMPLEXITY 로 덮어씀)
+#   accurate  기존 설정: Holistic 매 프레임 전체 검출(static_image_mode), complexity 2, 얼굴 메쉬까지 그림
+#   tracking  Holistic 추적 모드, 그리기 없음 (얼굴 메쉬는 Holistic 그래프 안에서 계산은 됨, 끌 옵션이 없음)
+#   lean      Pose + Hands 만 추적 모드로, 얼굴 메쉬 계산 자체를 안 함, 그리기 없음
+# 쓰는 건 pose 12개(11~22번) + 양손뿐이라 세 프로파일 모두 같은 프레임 dict 를 만듦
+# mediapipe 는 make_landmarker 안에서만 import
+
+PROFILES = {
+    'accurate': {'holistic': True, 'static_image_mode': True, 'model_complexity': 2, 'draw': True},
+    'tracking': {'holistic': True, 'static_image_mode': False, 'model_complexity': 1, 'draw': False},
+    'lean': {'holistic': False, 'static_image_mode': False, 'model_complexity': 1, 'draw': False},
+}
+LANDMARK_PROFILE = os.getenv('ECOLINK_LANDMARK_PROFILE', 'accurate')
+MODEL_COMPLEXITY = os.getenv('ECOLINK_MODEL_COMPLEXITY')  # 비우면 프로파일 기본값
+
+POSE_LANDMARKS = list(range(11, 23))   # 프레임 dict 에 넣는 pose 랜드마크 (어깨 ~ 손가락)
+POSE_LEFT_WRIST = 15
+POSE_RIGHT_WRIST = 16
+
+
+def profile_options(profile=LANDMARK_PROFILE):
+    if profile not in PROFILES:
+        raise ValueError(f'알 수 없는 랜드마크 프로파일: {profile} ({", ".join(PROFILES)})')
+    options = dict(PROFILES[profile])
+    if MODEL_COMPLEXITY:
+        options['model_complexity'] = int(MODEL_COMPLEXITY)
+    return options
+
+
+class PoseHandsLandmarker:
+    # Pose + Hands 두 그래프로 Holistic 과 같은 모양의 결과 (face_landmarks 는 항상 None)
+    # 손의 좌/우는 손목이 pose 의 어느 손목(15 왼쪽, 16 오른쪽)에 가까운지로 정함 -> Holistic 과 같은 기준
+    def __init__(self, static_image_mode=False, model_complexity=1, min_detection_confidence=0.5):
+        import mediapipe as mp
+
+        self.pose = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode, model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence)
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode, max_num_hands=2, model_complexity=min(model_complexity, 1),
+            min_detection_confidence=min_detection_confidence)
+
+    def process(self, image):
+        pose = self.pose.process(image).pose_landmarks
+        hands = self.hands.process(image)
+        left, right = self._assign_hands(pose, hands)
+        return SimpleNamespace(pose_landmarks=pose, left_hand_landmarks=left,
+                               right_hand_landmarks=right, face_landmarks=None)
+
+    def _assign_hands(self, pose, hands):
+        detected = hands.multi_hand_landmarks or []
+        if not detected:
+            return None, None
+
+        if pose is None:
+            # pose 가 없으면 Hands 의 손 라벨로 (카메라 영상은 좌우 반전이 아니라서 라벨이 반대)
+            left = right = None
+            for landmarks, handedness in zip(detected, hands.multi_handedness):
+                if handedness.classification[0].label == 'Right':
+                    left = left or landmarks
+                else:
+                    right = right or landmarks
+            return left, right
+
+        wrists = np.array([[pose.landmark[i].x, pose.landmark[i].y] for i in (POSE_LEFT_WRIST, POSE_RIGHT_WRIST)])
+        hand_wrists = np.array([[h.landmark[0].x, h.landmark[0].y] for h in detected])
+        dist = np.linalg.norm(hand_wrists[:, None] - wrists[None], axis=2)  # (손, 좌/우)
+        if len(detected) == 1:
+            return (detected[0], None) if dist[0, 0] <= dist[0, 1] else (None, detected[0])
+        # 두 손: 거리 합이 작은 쪽으로 짝지음
+        if dist[0, 0] + dist[1, 1] <= dist[0, 1] + dist[1, 0]:
+            return detected[0], detected[1]
+        return detected[1], detected[0]
+
+    def close(self):
+        self.pose.close()
+        self.hands.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_landmarker(profile=LANDMARK_PROFILE):
+    # process(RGB) -> .pose_landmarks / .left_hand_landmarks / .right_hand_landmarks / .face_landmarks
+    options = profile_options(profile)
+    if not options['holistic']:
+        return PoseHandsLandmarker(options['static_image_mode'], options['model_complexity'])
+
+    import mediapipe as mp
+    return mp.solutions.holistic.Holistic(
+        static_image_mode=options['static_image_mode'], min_detection_confidence=0.5,
+        model_complexity=options['model_complexity'])
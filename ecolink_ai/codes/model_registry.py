@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import torch
+
+from .models.st_gcn_18_10words_54node import STGCNModel, build_inference_model
+from .quantization import load_stgcn_int8
+from .multihead import load_multihead
+from .early_exit import load_stgcn_early_exit
+
+
+# 프로세스 전역 모델 레지스트리
+# (체크포인트 경로, 라벨셋, 변형) 단위로 가중치를 한 번만 올려두고 재사용
+# 메모리 예산을 넘으면 가장 오래 안 쓴 모델부터 내림 (LRU)
+
+MEMORY_BUDGET_MB = float(os.getenv('ECOLINK_MODEL_MEMORY_BUDGET_MB', 512))
+WARMUP_SHAPE = (1, 4, 60, 54)  # (배치, 채널, 프레임, 관절)
+# classify/classify8 가 쓸 모델 변형
+# eager(학습 그대로) | fused(BatchNorm 접기 + 그래프 conv 합치기) | int8(CPU 양자화, codes/quantization.py)
+# | early_exit(중간 출구, codes/early_exit.py)
+MODEL_VARIANT = os.getenv('ECOLINK_MODEL_VARIANT', 'eager')
+
+
+def model_nbytes(model):
+    # state_dict 기준으로 계산해야 양자화된 packed 파라미터까지 잡힘
+    total = 0
+    for value in model.state_dict().values():
+        tensors = value if isinstance(value, (tuple, list)) else (value,)
+        for t in tensors:
+            if torch.is_tensor(t):
+                total += t.numel() * t.element_size()
+    return total
+
+
+def model_device(model):
+    for t in model.parameters():
+        return t.device
+    for t in model.buffers():
+        return t.device
+    return torch.device('cpu')
+
+
+def load_stgcn(model_path, num_class, device):
+    model = STGCNModel(in_channels=4, num_class=num_class)
+    checkpoint = torch.load(model_path, map_location=device) #체크포인트 불러와서
+    model.load_state_dict(checkpoint['model_state_dict']) #가중치 부분 적용
+    model.to(device)
+    model.eval()
+    return model
+
+
+def load_stgcn_fused(model_path, num_class, device):
+    return build_inference_model(load_stgcn(model_path, num_class, device))
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_mb=MEMORY_BUDGET_MB, device=None):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.device = device or torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.builders = {
+            'eager': load_stgcn,
+            'fused': load_stgcn_fused,
+            'int8': load_stgcn_int8,
+            'multihead': load_multihead,  # 공유 백본 + 어휘별 헤드, codes/multihead.py
+            'early_exit': load_stgcn_early_exit,  # 64/128채널 중간 출구, codes/early_exit.py
+        }
+
+        self._models = OrderedDict()  # key -> (model, nbytes), 앞쪽이 가장 오래 안 쓴 것
+        self._loading = {}            # key -> Lock, 같은 체크포인트를 동시에 두 번 올리지 않도록
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_time_total = 0.0
+        self.last_load_time = 0.0
+
+    def register_variant(self, name, builder):
+        # builder(model_path, num_class, device) -> eval 모드 모델
+        self.builders[name] = builder
+
+    def get(self, model_path, label_list, variant='eager'):
+        if variant not in self.builders:
+            raise ValueError(f'알 수 없는 모델 변형: {variant}')
+        key = (os.path.abspath(model_path), tuple(label_list), variant)
+
+        model = self._lookup(key, count=True)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            # 기다리는 동안 다른 스레드가 이미 올렸을 수 있음
+            model = self._lookup(key, count=False)
+            if model is not None:
+                return model
+
+            start = time.perf_counter()
+            model = self.builders[variant](model_path, len(label_list), self.device)
+            self.warmup(model)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._models[key] = (model, model_nbytes(model))
+                self.loads += 1
+                self.load_time_total += elapsed
+                self.last_load_time = elapsed
+                self._evict(keep=key)
+                self._loading.pop(key, None)
+        return model
+
+    def _lookup(self, key, count):
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry[0]
+            if count:
+                self.misses += 1
+            return None
+
+    def warmup(self, model):
+        # 첫 요청에서 커널 선택/메모리 할당 비용을 치르지 않도록 더미 forward 한 번
+        x = torch.zeros(WARMUP_SHAPE, device=model_device(model))
+        with torch.no_grad():
+            model(x)
+
+    def _evict(self, keep):
+        while self.memory_bytes() > self.memory_budget and len(self._models) > 1:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            del self._models[oldest]
+            self.evictions += 1
+
+    def memory_bytes(self):
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'models': len(self._models),
+                'memory_mb': self.memory_bytes() / (1024 * 1024),
+                'memory_budget_mb': self.memory_budget / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'load_time_total': self.load_time_total,
+                'last_load_time': self.last_load_time,
+            }
+
+
+registry = ModelRegistry()
+
+
+def get_model(model_path, label_list, variant=MODEL_VARIANT):
+    return registry.get(model_path, label_list, variant)
@@ -105,7 +105,8 @@ class STGCNModel(nn.Module):
         ])
         self.fcn = nn.Conv2d(256, num_class, kernel_size=1)
 
-    def forward(self, x):
+    def features(self, x):
+        # fcn 직전의 풀링된 특징 (N, 256)
         N, C, T, V = x.size()
         x = x.view(N, C * V, T)
         x = self.data_bn(x)
@@ -115,7 +116,225 @@ class STGCNModel(nn.Module):
             x, _ = gcn(x, self.A)
 
         x = F.avg_pool2d(x, x.size()[2:])
-        x = x.view(N, -1)
+        return x.view(N, -1)
+
+    def head(self, x):
+        # 풀링된 특징 (N, 256) -> 로짓 (N, num_class)
+        N = x.size(0)
         x = self.fcn(x.unsqueeze(-1).unsqueeze(-1))
-        x = x.view(N, -1)
-        return x
+        return x.view(N, -1)
+
+    def forward(self, x):
+        return self.head(self.features(x))
+
+
+class MultiHeadSTGCN(STGCNModel):
+    # 백본(data_bn + st_gcn_networks) 하나에 어휘별 분류 헤드 여러 개
+    # forward 한 번으로 {어휘 이름: (N, 단어 수) 로짓}
+    def __init__(self, in_channels=4):
+        super().__init__(in_channels=in_channels, num_class=1)
+        del self.fcn
+        self.heads = nn.ModuleDict()
+        self.labels = {}
+
+    def add_head(self, name, label_list, fcn=None):
+        head = nn.Conv2d(256, len(label_list), kernel_size=1)
+        if fcn is not None:
+            head.load_state_dict(fcn.state_dict())
+        self.heads[name] = head.to(self.A.device)
+        self.labels[name] = list(label_list)
+        return head
+
+    def head(self, x):
+        N = x.size(0)
+        x = x.unsqueeze(-1).unsqueeze(-1)
+        return {name: head(x).view(N, -1) for name, head in self.heads.items()}
+
+    def forward(self, x):
+        return self.head(self.features(x))
+
+
+
+# 추론 전용 빌드 (학습된 STGCNModel 가중치로 만듦, 출력은 허용 오차 안에서 같음)
+# - BatchNorm을 앞쪽 conv에 접어넣음
+# - 세 파티션이 같은 A는 하나로 합쳐서 (V x V) matmul 한 번
+# - dropout, lambda residual 제거
+
+def _bn_scale_shift(bn):
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    shift = bn.bias - bn.running_mean * scale
+    return scale, shift
+
+
+def _fold_conv_bn(conv, bn):
+    # conv 다음 BatchNorm -> 가중치/바이어스가 조정된 conv 하나
+    scale, shift = _bn_scale_shift(bn)
+    bias = conv.bias if conv.bias is not None else torch.zeros_like(scale)
+    fused = nn.Conv2d(conv.in_channels, conv.out_channels, conv.kernel_size,
+                      stride=conv.stride, padding=conv.padding)
+    fused.weight.copy_(conv.weight * scale.view(-1, 1, 1, 1))
+    fused.bias.copy_(bias * scale + shift)
+    return fused
+
+
+class FusedGraphConv(nn.Module):
+    # 1x1 conv -> 그래프 conv(A) -> BatchNorm 을 conv + matmul + (C, V) 바이어스로
+    def __init__(self, conv, bn, A):
+        super().__init__()
+        K = A.size(0)
+        c_out = conv.out_channels // K
+        weight = conv.weight.view(K, c_out, conv.in_channels)
+        bias = conv.bias.view(K, c_out)
+        scale, shift = _bn_scale_shift(bn)
+
+        if all(torch.equal(A[0], A[k]) for k in range(1, K)):
+            # 파티션이 모두 같으면 sum_k (W_k x) A = (sum_k W_k) x A
+            weight = weight.sum(0, keepdim=True)
+            bias = bias.sum(0, keepdim=True)
+            A = A[:1]
+            K = 1
+
+        # sum_k (b_k 상수) A_k -> 관절마다 b_k * (A_k 열 합)
+        col_sum = A.sum(1)  # (K, V)
+        graph_bias = torch.einsum('kc,kw->cw', bias, col_sum)
+
+        self.kernel_size = K
+        self.register_buffer('weight', (weight * scale.view(1, -1, 1)).reshape(K * c_out, -1, 1, 1).contiguous())
+        self.register_buffer('bias', (graph_bias * scale.view(-1, 1) + shift.view(-1, 1)).view(1, c_out, 1, -1).contiguous())
+        self.register_buffer('A', A[0].contiguous() if K == 1 else A.contiguous())
+
+    def forward(self, x):
+        x = F.conv2d(x, self.weight)
+        if self.kernel_size == 1:
+            x = torch.matmul(x, self.A)
+        else:
+            n, kc, t, v = x.size()
+            x = x.view(n, self.kernel_size, kc // self.kernel_size, t, v)
+            x = torch.einsum('nkctv,kvw->nctw', (x, self.A))
+        return x + self.bias
+
+
+class FusedSTGCNBlock(nn.Module):
+    def __init__(self, block, A):
+        super().__init__()
+        self.gcn = FusedGraphConv(block.gcn.conv, block.tcn[0], A)
+        self.tcn = _fold_conv_bn(block.tcn[2], block.tcn[3])
+
+        if isinstance(block.residual, nn.Sequential):
+            self.residual_mode = 'conv'
+            self.residual = _fold_conv_bn(block.residual[0], block.residual[1])
+        else:
+            self.residual_mode = 'identity' if block.residual(1) == 1 else 'none'
+            self.residual = nn.Identity()
+
+    def forward(self, x):
+        if self.residual_mode == 'none':
+            res = None
+        else:
+            res = self.residual(x)
+        x = F.relu(self.gcn(x))
+        x = self.tcn(x)
+        if res is not None:
+            x = x + res
+        return F.relu(x)
+
+
+class STGCNInferenceModel(nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        # data_bn은 (N, C, T, V)를 permute 없이 (N, C*V, T)로 view 해서 적용됨 -> 같은 view 위에서 affine
+        scale, shift = _bn_scale_shift(model.data_bn)
+        self.register_buffer('data_scale', scale.view(-1, 1).clone())
+        self.register_buffer('data_shift', shift.view(-1, 1).clone())
+
+        self.st_gcn_networks = nn.ModuleList([FusedSTGCNBlock(block, model.A) for block in model.st_gcn_networks])
+
+        fcn = model.fcn
+        self.fc = nn.Linear(fcn.in_channels, fcn.out_channels)
+        self.fc.weight.copy_(fcn.weight.view(fcn.out_channels, fcn.in_channels))
+        self.fc.bias.copy_(fcn.bias)
+
+    def head(self, x):
+        return self.fc(x)
+
+    def forward(self, x):
+        N, C, T, V = x.size()
+        x = (x.reshape(N, C * V, T) * self.data_scale + self.data_shift).view(N, C, T, V)
+        for block in self.st_gcn_networks:
+            x = block(x)
+        return self.head(x.mean(dim=(2, 3)))
+
+
+def build_inference_model(model):
+    # 학습된 STGCNModel -> 추론 전용 모델 (eval 모드, 같은 디바이스)
+    model.eval()
+    with torch.no_grad():
+        fused = STGCNInferenceModel(model)
+    device = model.A.device
+    return fused.to(device).eval()
+
+
+class EarlyExitSTGCN(nn.Module):
+    # 64채널 / 128채널 단계 끝에 중간 분류기를 달아서, softmax 최대값이 임계값 이상이면 거기서 멈춤
+    # 샘플마다 따로 판단: 넘은 샘플은 그 출구 로짓으로 빠지고 나머지만 다음 블록으로
+    # -> 마이크로 배치에 섞여 들어와도 샘플별 결과/출구가 혼자 돌린 것과 같음
+    # 모델에 상태를 남기지 않음 (레지스트리에서 여러 스레드가 같이 씀), 출구는 forward_exits 가 돌려줌
+    EXIT_BLOCKS = (3, 6)  # st_gcn_networks 인덱스 (64채널 마지막, 128채널 마지막)
+
+    def __init__(self, model, thresholds=(0.9, 0.9)):
+        super().__init__()
+        self.model = model
+        num_class = model.fcn.out_channels
+        self.exits = nn.ModuleList([
+            nn.Conv2d(model.st_gcn_networks[i].tcn[2].out_channels, num_class, kernel_size=1)
+            for i in self.EXIT_BLOCKS
+        ])
+        thresholds = list(thresholds)
+        if len(thresholds) == 1:
+            thresholds = thresholds * len(self.EXIT_BLOCKS)
+        if len(thresholds) != len(self.EXIT_BLOCKS):
+            raise ValueError(f'출구 임계값은 1개 또는 {len(self.EXIT_BLOCKS)}개: {thresholds}')
+        self.thresholds = thresholds
+
+    def _head(self, head, x):
+        x = F.avg_pool2d(x, x.size()[2:])
+        return head(x).view(x.size(0), -1)
+
+    def exit_features(self, x):
+        # 학습용: 각 출구 위치의 풀링된 특징 리스트 (+ 마지막 특징)
+        N, C, T, V = x.size()
+        x = self.model.data_bn(x.view(N, C * V, T)).view(N, C, T, V)
+        features = []
+        for i, gcn in enumerate(self.model.st_gcn_networks):
+            x, _ = gcn(x, self.model.A)
+            if i in self.EXIT_BLOCKS:
+                features.append(F.avg_pool2d(x, x.size()[2:]))
+        features.append(F.avg_pool2d(x, x.size()[2:]))
+        return features
+
+    def forward(self, x, early_exit=True):
+        return self.forward_exits(x, early_exit)[0]
+
+    def forward_exits(self, x, early_exit=True):
+        # -> (로짓 (N, num_class), 출구 번호 (N,)), 출구 번호 len(EXIT_BLOCKS) 는 끝까지 간 경우
+        N, C, T, V = x.size()
+        x = self.model.data_bn(x.view(N, C * V, T)).view(N, C, T, V)
+        logits = x.new_zeros(N, self.model.fcn.out_channels)
+        exits = torch.full((N,), len(self.EXIT_BLOCKS), dtype=torch.long, device=x.device)
+        active = torch.arange(N, device=x.device)  # 아직 안 빠진 샘플의 원래 위치
+
+        for i, gcn in enumerate(self.model.st_gcn_networks):
+            x, _ = gcn(x, self.model.A)
+            if early_exit and i in self.EXIT_BLOCKS:
+                k = self.EXIT_BLOCKS.index(i)
+                out = self._head(self.exits[k], x)
+                done = torch.softmax(out, dim=1).max(dim=1).values >= self.thresholds[k]
+                if done.any():
+                    logits[active[done]] = out[done]
+                    exits[active[done]] = k
+                    if done.all():
+                        return logits, exits
+                    x, active = x[~done], active[~done]
+
+        logits[active] = self._head(self.model.fcn, x)
+        return logits, exits
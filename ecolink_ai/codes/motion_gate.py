@@ -0,0 +1,105 @@
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+# 카메라 프레임의 움직임으로 Waiting -> Recognizing -> Recognition Ended 를 정하는 게이트
+# optical flow 를 축소한 흑백 프레임(또는 ROI)에서만 계산하고, 16픽셀 격자 샘플링/카운트는 NumPy 한 번으로
+# 축소해서 계산한 flow 는 원본 픽셀 단위로 되돌려서 기존 임계값(dx*dx+dy*dy > 200, moved < 5)을 그대로 씀
+
+MOTION_SCALE = float(os.getenv('ECOLINK_MOTION_SCALE', 0.5))   # flow 계산 해상도 (1 = 원본)
+GRID_STEP = 16           # 원본 기준 샘플 간격 (픽셀)
+MOVE_THRESHOLD = 200     # 원본 픽셀 기준 이동량 제곱
+MIN_MOVED = 5            # 움직인 칸이 이보다 적으면 정지
+
+WAITING = "Waiting"
+RECOGNIZING = "Recognizing"
+ENDED = "Recognition Ended"
+STATE_COLORS = {WAITING: (255, 255, 255), RECOGNIZING: (0, 255, 0), ENDED: (0, 0, 255)}
+
+
+def count_moving_cells(flow, step=GRID_STEP, threshold=MOVE_THRESHOLD, gain=1.0):
+    # flow: (H, W, 2), gain: flow 를 원본 픽셀 단위로 바꾸는 배율
+    # 반환: (움직인 칸 수, 격자 샘플 (h, w, 2) int, 움직임 마스크 (h, w))
+    # 기존 루프처럼 flow[y, x].astype(int) 로 0 방향 버림 후 비교
+    cells = (flow[step // 2::step, step // 2::step] * gain).astype(np.int32)
+    moving = (cells[..., 0] * cells[..., 0] + cells[..., 1] * cells[..., 1]) > threshold
+    return int(np.count_nonzero(moving)), cells, moving
+
+
+class MotionGate:
+    def __init__(self, scale=MOTION_SCALE, roi=None, step=GRID_STEP, threshold=MOVE_THRESHOLD):
+        # roi: (x, y, w, h) 원본 좌표, 수어하는 사람 주변만 볼 때
+        self.scale = scale
+        self.roi = roi
+        self.threshold = threshold
+        self.step = max(1, round(step * scale))   # 축소 프레임에서의 샘플 간격
+        self.prev_gray = None
+        self.cells = None
+        self.moving = None
+
+    def _gray(self, frame):
+        if self.roi is not None:
+            x, y, w, h = self.roi
+            frame = frame[y:y + h, x:x + w]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def reset(self, frame):
+        self.prev_gray = self._gray(frame)
+
+    def update(self, frame):
+        # frame: BGR 원본 -> 움직인 칸 수
+        curr_gray = self._gray(frame)
+        if self.prev_gray is None:
+            self.prev_gray = curr_gray
+            return 0
+        flow = cv2.calcOpticalFlowFarneback(self.prev_gray, curr_gray, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+        self.prev_gray = curr_gray
+        moved, self.cells, self.moving = count_moving_cells(flow, self.step, self.threshold, 1 / self.scale)
+        return moved
+
+    def draw(self, frame, color=(0, 0, 255)):
+        # 마지막 update 에서 움직인 칸만 원본 좌표로 선 그리기 (화면 표시할 때만)
+        if self.moving is None:
+            return
+        ox, oy = (self.roi[0], self.roi[1]) if self.roi is not None else (0, 0)
+        for i, j in zip(*np.nonzero(self.moving)):
+            x = ox + int((j * self.step + self.step // 2) / self.scale)
+            y = oy + int((i * self.step + self.step // 2) / self.scale)
+            dx, dy = self.cells[i, j]
+            cv2.line(frame, (x, y), (x + int(dx), y + int(dy)), color, 2)
+
+
+class MotionStateMachine:
+    # moved < MIN_MOVED 가 time_threshold 초 이어지면 Waiting -> Recognizing -> Recognition Ended
+    # 움직임이 있으면 정지 타이머만 초기화
+    def __init__(self, time_threshold=3, min_moved=MIN_MOVED):
+        self.time_threshold = time_threshold
+        self.min_moved = min_moved
+        self.state = WAITING
+        self.stop_start_time = None
+
+    def update(self, moved, now=None):
+        now = time.time() if now is None else now
+        if moved >= self.min_moved:
+            self.stop_start_time = None
+            return self.state
+        if self.state == ENDED:
+            return self.state
+
+        if self.stop_start_time is None:
+            self.stop_start_time = now
+        if now - self.stop_start_time >= self.time_threshold:
+            self.state = RECOGNIZING if self.state == WAITING else ENDED
+            self.stop_start_time = None
+        return self.state
+
+
+def draw_state(frame, motion_state):
+    cv2.putText(frame, motion_state, (20, 50), cv2.FONT_HERSHEY_SIMPLEX,
+                1, STATE_COLORS[motion_state], 2)
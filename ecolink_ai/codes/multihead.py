@@ -0,0 +1,139 @@
+import argparse
+import functools
+
+import torch
+import torch.nn.functional as F
+
+from .models.st_gcn_18_10words_54node import MultiHeadSTGCN
+
+
+# 10단어(응급) / 8단어(경찰) 를 백본 하나로 한 번에 분류
+# 체크포인트 형식: {'backbone_state_dict': ..., 'heads': {이름: {'labels': [...], 'state_dict': ...}}}
+#
+# 헤드는 학습된 STGCNModel 체크포인트의 fcn 을 그대로 씀 (--head 어휘=체크포인트)
+# 체크포인트 백본이 공유 백본과 다르면 그 fcn 을 그대로 쓸 수 없어서 에러 -> 예측이 몰래 바뀌지 않게
+# 공유 백본 위에서 헤드를 다시 맞추는 건 --fit 어휘=<클립 폴더> 로 따로 (따로 학습한 모델과 예측이 달라짐)
+#   python -m codes.multihead --backbone datas/10emer.pth --backbone-head 10emer \
+#       --head 8police=datas/8police.pth --output datas/multihead.pth
+
+
+def backbone_from_stgcn(model):
+    # 학습된 STGCNModel 에서 백본만 가져온 MultiHeadSTGCN (헤드 없음)
+    multi = MultiHeadSTGCN(in_channels=model.data_bn.num_features // model.graph.num_node)
+    state = {k: v for k, v in model.state_dict().items() if not k.startswith('fcn.')}
+    multi.load_state_dict(state)
+    return multi.to(model.A.device).eval()
+
+
+def save_multihead(model, path):
+    torch.save({
+        'backbone_state_dict': {k: v for k, v in model.state_dict().items() if not k.startswith('heads.')},
+        'heads': {
+            name: {'labels': model.labels[name], 'state_dict': head.state_dict()}
+            for name, head in model.heads.items()
+        },
+    }, path)
+
+
+def load_multihead(model_path, num_class, device):
+    # 레지스트리용 builder (num_class 는 안 씀, 헤드마다 체크포인트에 있음)
+    checkpoint = torch.load(model_path, map_location=device)
+    model = MultiHeadSTGCN(in_channels=4)
+    model.load_state_dict(checkpoint['backbone_state_dict'])
+    model.to(device)
+    for name, head in checkpoint['heads'].items():
+        model.add_head(name, head['labels']).load_state_dict(head['state_dict'])
+    return model.eval()
+
+
+def head_from_stgcn(model, name, label_list, stgcn):
+    # 학습된 STGCNModel 의 fcn 을 헤드로, 백본이 공유 백본과 다르면 ValueError
+    shared = model.state_dict()
+    for key, value in stgcn.state_dict().items():
+        if not key.startswith('fcn.') and not torch.equal(value.to(shared[key].device), shared[key]):
+            raise ValueError(f'{name}: 체크포인트 백본이 공유 백본과 다름 ({key}) -> fcn 을 그대로 쓰면 예측이 바뀜')
+    return model.add_head(name, label_list, stgcn.fcn)
+
+
+@functools.lru_cache(maxsize=None)
+def head_labels(model_path):
+    # 레지스트리/배처 키용 라벨: ((어휘, 단어), ...) 헤드 순서대로
+    checkpoint = torch.load(model_path, map_location='cpu')
+    return tuple((name, label) for name, head in checkpoint['heads'].items() for label in head['labels'])
+
+
+def fit_head(model, name, label_list, inputs, targets, epochs=200, lr=0.05):
+    # 백본은 고정, 풀링된 특징을 한 번만 뽑아서 헤드(1x1 conv = 선형층)만 학습
+    # inputs: (B, 4, T, 54) 배치들, targets: (N,) 라벨 인덱스
+    model.eval()
+    with torch.no_grad():
+        features = torch.cat([model.features(x.to(model.A.device)) for x in inputs])
+    targets = targets.to(features.device)
+
+    head = model.add_head(name, label_list)
+    optimizer = torch.optim.Adam(head.parameters(), lr=lr)
+    for _ in range(epochs):
+        optimizer.zero_grad()
+        logits = head(features[..., None, None]).flatten(1)
+        loss = F.cross_entropy(logits, targets)
+        loss.backward()
+        optimizer.step()
+    head.eval()
+    with torch.no_grad():
+        acc = (head(features[..., None, None]).flatten(1).argmax(1) == targets).float().mean().item()
+    return acc
+
+
+def classify_all(model_path, json_data):
+    # 등록된 모든 어휘에 대해 한 번의 forward -> {어휘 이름: 단어}
+    from .batch_inference import run_model
+    from .model_registry import get_model
+    from .emedding_test_10emer_return_54node import process_keypoints
+
+    x = process_keypoints(json_data)
+    label_key = head_labels(model_path)
+    outputs = run_model(model_path, label_key, x, variant='multihead')
+    labels = get_model(model_path, label_key, 'multihead').labels
+    return {name: labels[name][int(out.argmax(1))] for name, out in outputs.items()}
+
+
+if __name__ == "__main__":
+    from .tensor_store import load_batches
+    from .model_registry import load_stgcn
+    from .emedding_test_10emer_return_54node import label_list as label_list_10emer
+    from .emedding_test_8emer_return_54node import label_list as label_list_8police
+
+    LABELS = {'10emer': label_list_10emer, '8police': label_list_8police}
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backbone', required=True, help='백본으로 쓸 STGCNModel 체크포인트')
+    parser.add_argument('--backbone-head', choices=sorted(LABELS), required=True,
+                        help='백본 체크포인트의 fcn 이 분류하는 어휘')
+    parser.add_argument('--head', action='append', default=[], help='어휘=학습된 STGCNModel 체크포인트 (같은 백본)')
+    parser.add_argument('--fit', action='append', default=[],
+                        help='어휘=<라벨>/<클립>.json 폴더 또는 텐서 저장소, 공유 백본 위에서 헤드를 새로 학습')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    device = torch.device('cpu')
+    base_labels = LABELS[args.backbone_head]
+    base = load_stgcn(args.backbone, len(base_labels), device)
+    model = backbone_from_stgcn(base)
+    model.add_head(args.backbone_head, base_labels, base.fcn)
+
+    for spec in args.head:
+        name, checkpoint = spec.split('=', 1)
+        try:
+            head_from_stgcn(model, name, LABELS[name], load_stgcn(checkpoint, len(LABELS[name]), device))
+        except ValueError as e:
+            parser.error(f'{e} (헤드를 새로 맞추려면 --fit {name}=<클립 폴더>)')
+        print(f'{name}: {checkpoint} 의 fcn 그대로')
+
+    for spec in args.fit:
+        name, clip_dir = spec.split('=', 1)
+        inputs, targets = load_batches(clip_dir, LABELS[name])
+        acc = fit_head(model, name, LABELS[name], inputs, targets)
+        print(f'{name}: {len(targets)}개 클립으로 헤드 새로 학습, train acc {acc:.3f} (따로 학습한 모델과 예측이 다를 수 있음)')
+
+    save_multihead(model, args.output)
+    print(f'저장: {args.output} ({", ".join(model.heads)})')
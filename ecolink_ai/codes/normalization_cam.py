@@ -2,6 +2,8 @@ import json
 import os
 import numpy as np
 
+from .keypoints_array import BLOCKS, NUM_CHANNELS, NUM_NODES, frames_to_array
+
 
 # 캠으로 얻은 json 정규화 -> return, json 저장
 
@@ -19,221 +21,196 @@ import numpy as np
 
 
 
-def has_hand(frame):
-    left_hand = frame.get('left_hand_landmarks')
-    right_hand = frame.get('right_hand_landmarks')
-    has_left_hand = False
-    has_right_hand = False
-
-    if left_hand is None:
-        has_left_hand = False
-    else:
-        y_over_left = sum(kp.get('y', 0) >= 1 for kp in left_hand)
-        has_left_hand = y_over_left ==0
+MOVE_THRESHOLD = 0.05   # 프레임 간 x,y 이동량 제곱
+MOVE_MIN_POINTS = 5     # 이보다 많은 관절이 움직이면 moving
 
-    if right_hand is None:
-        has_right_hand = False
-    else:
-        y_over_right = sum(kp.get('y', 0) >= 1 for kp in right_hand)
-        has_right_hand = y_over_right ==0
 
-    # print(has_left_hand,has_right_hand,has_left_hand or has_right_hand)
-    return has_left_hand or has_right_hand
+def has_hand(arr, mask):
+    # 프레임별: 왼손/오른손 중 하나라도 있고 그 손의 y가 전부 1 미만 (화면 아래로 안 나감)
+    result = np.zeros(arr.shape[1], dtype=bool)
+    for _, start, count in BLOCKS[1:]:
+        present = mask[:, start:start + count]
+        below = (arr[1, :, start:start + count] >= 1) & present
+        result |= present.any(axis=1) & ~below.any(axis=1)
+    return result
 
 
+def count_moved(prev, curr):
+    # prev, curr: (2, ..., 54) x,y -> 이동량 제곱이 임계값 넘는 관절 수
+    flow = curr - prev
+    return ((flow[0] * flow[0] + flow[1] * flow[1]) > MOVE_THRESHOLD).sum(axis=-1)
 
 
-def is_moving(prev_points, curr_points):
-    flow = curr_points - prev_points  # shape: (N, 2)
-    magnitude = np.linalg.norm(flow, axis=1)  # shape: (N,)
-    threshold=0.05
-    moved=0
-    for i, (dx, dy) in enumerate(flow):
-        # print(dx*dx+dy*dy)
-        if (dx*dx+dy*dy) > threshold :
-            moved+=1
-    
-    if moved>5:
-        state="moving"
-    else:
-        state="stop"
+def is_moving(arr):
+    # moving[i]: 프레임 i -> i+1 사이에 움직임, (T-1,)
+    xy = arr[:2]
+    return count_moved(xy[:, :-1], xy[:, 1:]) > MOVE_MIN_POINTS
 
-    return state
 
+def trim_bounds(arr, mask):
+    # 앞뒤로 움직이지 않는 프레임을 뺀 구간 [start, end]
+    # 첫/마지막 프레임에 손이 없으면 손이 처음/마지막으로 보이는 프레임, 있으면 처음/마지막으로 움직인 프레임
+    T = arr.shape[1]
+    hand = has_hand(arr, mask)
+    moving = is_moving(arr)
 
-def get_points(frame):
-    points = []
+    found = np.flatnonzero(moving if hand[0] else hand)
+    start = int(found[0]) if len(found) else 0
 
-    pose = frame.get('pose_landmarks') or []
-    for i in range(33):
-        if i < len(pose):
-            kp = pose[i]
-            points.append([kp['x'], kp['y']])
-        else:
-            points.append([0, 0])
-    # 왼손 21개
-    lhand = frame.get('left_hand_landmarks') or []
-    for i in range(21):
-        if i < len(lhand):
-            kp = lhand[i]
-            points.append([kp['x'], kp['y']])
-        else:
-            points.append([0, 0])
-    # 오른손 21개
-    rhand = frame.get('right_hand_landmarks') or []
-    for i in range(21):
-        if i < len(rhand):
-            kp = rhand[i]
-            points.append([kp['x'], kp['y']])
+    if not hand[-1]:
+        found = np.flatnonzero(hand)
+        end = int(found[-1]) if len(found) else T - 1
+    else:
+        found = np.flatnonzero(moving)
+        if len(found):
+            end = int(found[-1]) + 1
+        elif count_moved(arr[:2, -1], arr[:2, 0]) > MOVE_MIN_POINTS:
+            # 기존 구현은 i=0 에서 data[-1] 과 data[0] 을 비교함
+            end = 0
         else:
-            points.append([0, 0])
-    return np.array(points)  # shape: (54, 2)
-
-
-
+            end = T - 1
+    return start, end
 
 
-def normalization(data):
-    # 1. 파일 오픈
-    # with open(input_file, 'r') as f:
-    #     data = json.load(f)
+def _finish(arr, mask, start, end, bounds, target_frame_count):
+    # 잘라낸 구간 [start, end] 에서 프레임을 뽑고 직사각형(bounds) 기준으로 옮김
+    min_x, max_x, min_y, max_y = bounds
 
-
-
-    # 2. 정규화
-
-
-    # 2.1. 잡음 - 앞뒤로 프레임 제거
-    # 시작
-    if not has_hand(data[0]):
-        # print("has hand로 찾기")
-        start_idx = None
-        for i in range(len(data)):
-            if has_hand(data[i]):
-                start_idx = i
-                break
+    # 2.3. 동작 수행 속도에 대해 - 인덱스로 target_frame_count 프레임 뽑기
+    if target_frame_count is not None:
+        indices = start + np.linspace(0, end - start, target_frame_count).astype(int)
+        arr, mask = arr[:, indices], mask[indices]
     else:
-        # print("is_moving로 찾기")
-        start_idx = None
-        for i in range(len(data) - 1):
-            prev_points = get_points(data[i])
-            curr_points = get_points(data[i+1])
-            state = is_moving(prev_points, curr_points)
-            if state == "moving":
-                start_idx = i
-                break
-    if start_idx is None:
-        # print("못찾음,디폴트")
-        start_idx = 0
-
-    # 끝
-    if not has_hand(data[-1]):
-        # print("has hand로 찾기")
-        end_idx = None
-        for i in range(len(data)-1, -1, -1):
-            if has_hand(data[i]):
-                end_idx = i
-                break
+        arr, mask = arr[:, start:end + 1].copy(), mask[start:end + 1]
+
+    # 뽑힌 프레임만 한 번에 옮김 (없는 관절은 0 유지), z / visibility 는 그대로
+    arr[0] = np.where(mask, (arr[0] - min_x) / (max_x - min_x), 0)
+    arr[1] = np.where(mask, (arr[1] - min_y) / (max_y - min_y), 0)
+    return arr.astype(np.float32), mask
+
+
+def normalization(data, target_frame_count=60):
+    # data: 프레임 dict 리스트(JSON 업로드) 또는 (arr (4, T, 54), mask (T, 54)) (바이너리 업로드)
+    # 반환: (arr (4, L, 54) float32, mask (L, 54)) -> process_keypoints 에 그대로 넘김
+    # target_frame_count=None 이면 프레임 수를 맞추지 않고 잘라낸 구간 그대로 (가변 길이 추론용)
+    # 입력 dict 는 건드리지 않음, 계산은 기존 구현과 같게 float64 로
+    if isinstance(data, tuple):
+        arr, mask = data
+        arr = arr.astype(np.float64)
     else:
-        # print("is_moving로 찾기")
-        end_idx = None
-        for i in range(len(data)-1, -1, -1):
-            prev_points = get_points(data[i-1])
-            curr_points = get_points(data[i])
-            state = is_moving(prev_points, curr_points)
-            if state == "moving":
-                end_idx = i
-                break
-    if end_idx is None:
-        # print("못찾음,디폴트")
-        end_idx = len(data) - 1
-
-
-
-
-    # 필터링
-    data = data[start_idx:end_idx + 1]
-
-    for new_idx, frame in enumerate(data):
-        frame['frame'] = new_idx
-
-
-
-
-
-
-    # 2.2. 신체조건에대해 - 직사각형 잘라서 landmark들 이동
-    keypoints = []
-    for frame in data:
-        for part in ['pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks']:
-            landmarks = frame.get(part)
-            if isinstance(landmarks, list) and len(landmarks) > 0:
-                for landmark in landmarks:
-                    keypoints.append([landmark['x'], landmark['y'], landmark['z']])
-    keypoints = np.array(keypoints) #minmax 처리를위해 numpy 배열로 바꿈
-
-    min_x, min_y = np.min(keypoints[:, 0]), np.min(keypoints[:, 1])
-    max_x, max_y = np.max(keypoints[:, 0]), np.max(keypoints[:, 1])
-    norm_x = (keypoints[:, 0] - min_x) / (max_x - min_x)
-    norm_y = (keypoints[:, 1] - min_y) / (max_y - min_y)
-    norm_z = keypoints[:, 2]
-
-    keypoints = np.stack([norm_x, norm_y, norm_z], axis=1) 
-
-    # 처리한 결과 다시 data에 넣음
-    idx = 0
-    for frame in data:
-        for part in ['pose_landmarks', 'left_hand_landmarks', 'right_hand_landmarks']:
-            if part in frame and frame[part] is not None:
-                for landmark in frame[part]:
-                    landmark['x'] = keypoints[idx, 0]
-                    landmark['y'] = keypoints[idx, 1]
-                    landmark['z'] = keypoints[idx, 2]
-                    idx += 1
-
-
-    
-    # 2.3. 동작 수행 속도에 대해 - 60프레임으로 늘리기
-
-    original_frame_count = len(data)
-    target_frame_count = 60  # 원하는 프레임 개수
-
-    indices = np.linspace(0, original_frame_count-1, target_frame_count).astype(int)
-    new_data = [data[i] for i in indices]
-
-
-
-
-    # 3. 결과 저장
-    # with open(output_file, 'w') as f:
-    #     json.dump(new_data, f, indent=2)
-                
-
-
-    return new_data
-
+        arr, mask = frames_to_array(data, dtype=np.float64)
 
+    # 2.1. 잡음 - 앞뒤로 프레임 제거
+    start, end = trim_bounds(arr, mask)
+
+    # 2.2. 신체조건에대해 - 남은 구간에 있는 관절 전체의 x,y 최소/최대로 직사각형 잡기
+    xs = arr[0, start:end + 1][mask[start:end + 1]]
+    ys = arr[1, start:end + 1][mask[start:end + 1]]
+    bounds = (np.min(xs), np.max(xs), np.min(ys), np.max(ys))
+    return _finish(arr, mask, start, end, bounds, target_frame_count)
+
+
+class StreamingNormalizer:
+    # 프레임이 들어올 때마다 손/움직임 상태와 누적 직사각형 범위를 갱신해 두고
+    # close() 에서는 끝 프레임만 정해서 바로 뽑음 -> normalization(전체 프레임) 과 같은 결과
+    # 누적 범위는 (min_x, -max_x, min_y, -max_y) 로 들고 있어서 np.minimum 하나로 합침
+
+    def __init__(self, target_frame_count=60, capacity=128):
+        self.target_frame_count = target_frame_count
+        self.capacity = capacity
+        self.reset()
+
+    def reset(self):
+        self.arr = np.zeros((NUM_CHANNELS, self.capacity, NUM_NODES))
+        self.mask = np.zeros((self.capacity, NUM_NODES), dtype=bool)
+        self.frame_bounds = np.empty((self.capacity, 4))
+        self.bounds = np.empty((2, self.capacity, 4))  # [0]: 0번 프레임부터 누적, [1]: start 부터 누적
+        self.length = 0
+        self.first_hand = False      # 0번 프레임에 손이 있었는지 (시작 찾는 규칙이 갈림)
+        self.last_hand = False       # 지금까지 마지막 프레임에 손이 있는지
+        self.last_hand_idx = None
+        self.last_move = None        # 마지막으로 움직인 프레임 쌍 (i -> i+1) 의 i
+        self.start = None
+
+    def __len__(self):
+        return self.length
+
+    def _grow(self):
+        self.capacity *= 2
+        self.arr = np.concatenate([self.arr, np.zeros_like(self.arr)], axis=1)
+        self.mask = np.concatenate([self.mask, np.zeros_like(self.mask)])
+        self.frame_bounds = np.concatenate([self.frame_bounds, np.empty_like(self.frame_bounds)])
+        self.bounds = np.concatenate([self.bounds, np.empty_like(self.bounds)], axis=1)
+
+    def push_frame(self, frame):
+        # frame: video_to_keypoints / 프론트가 만드는 프레임 dict 하나
+        arr, mask = frames_to_array([frame], dtype=np.float64)
+        self.push_array(arr[:, 0], mask[0])
+
+    def push_arrays(self, arr, mask):
+        # 바이너리 조각: arr (4, n, 54), mask (n, 54)
+        for t in range(arr.shape[1]):
+            self.push_array(arr[:, t], mask[t])
+
+    def push_array(self, values, present):
+        # values: (4, 54), present: (54,)
+        t = self.length
+        if t == self.capacity:
+            self._grow()
+        self.arr[:, t] = values
+        self.mask[t] = present
+        self.length += 1
+
+        x, y = self.arr[0, t][present], self.arr[1, t][present]
+        if len(x):
+            self.frame_bounds[t] = (x.min(), -x.max(), y.min(), -y.max())
+        else:
+            self.frame_bounds[t] = np.inf
+        self.bounds[0, t] = np.minimum(self.bounds[0, t - 1], self.frame_bounds[t]) if t else self.frame_bounds[t]
+
+        hand = has_hand(self.arr[:, t:t + 1], self.mask[t:t + 1])[0]
+        if t == 0:
+            self.first_hand = hand
+        self.last_hand = hand
+        if hand:
+            self.last_hand_idx = t
+        moved = t > 0 and count_moved(self.arr[:2, t - 1], self.arr[:2, t]) > MOVE_MIN_POINTS
+        if moved:
+            self.last_move = t - 1
+
+        if self.start is not None:
+            self.bounds[1, t] = np.minimum(self.bounds[1, t - 1], self.frame_bounds[t])
+        elif (moved if self.first_hand else hand):
+            # 시작 프레임을 찾음, 그 뒤로 들어온 프레임(많아야 2개)까지 누적
+            self.start = t - 1 if self.first_hand else t
+            self.bounds[1, self.start] = self.frame_bounds[self.start]
+            for i in range(self.start + 1, t + 1):
+                self.bounds[1, i] = np.minimum(self.bounds[1, i - 1], self.frame_bounds[i])
+
+    def close(self):
+        # 클립 끝: normalization(지금까지 받은 프레임) 과 같은 (arr, mask)
+        T = self.length
+        if T == 0:
+            raise ValueError('받은 프레임이 없음')
+        arr, mask = self.arr[:, :T], self.mask[:T]
+
+        start = 0 if self.start is None else self.start
+        if not self.last_hand:
+            end = T - 1 if self.last_hand_idx is None else self.last_hand_idx
+        elif self.last_move is not None:
+            end = self.last_move + 1
+        elif count_moved(arr[:2, -1], arr[:2, 0]) > MOVE_MIN_POINTS:
+            end = 0
+        else:
+            end = T - 1
 
-# if __name__ == "__main__":
-#     # 폴더 내 모든 파일 처리
-#     input_dir = 'C:/Users/DS/Downloads/aug1_me'
-#     output_dir = 'C:/Users/DS/Downloads/aug2_nor'
+        bounds = self.bounds[0 if self.start is None else 1, end] if end >= start else None
+        if bounds is None or np.isinf(bounds).any():
+            # 구간이 비었거나 관절이 하나도 없음 -> 전체 경로로 (같은 에러가 남)
+            return normalization((arr, mask), self.target_frame_count)
+        min_x, neg_max_x, min_y, neg_max_y = bounds
+        return _finish(arr, mask, start, end, (min_x, -neg_max_x, min_y, -neg_max_y), self.target_frame_count)
 
-#     for root, dirs, files in os.walk(input_dir):
-#         for file in files:
-#             if not file.endswith('.json'):
-#                 continue
-#             input_file = os.path.join(root, file).replace('\\', '/')
-#             rel_path = os.path.relpath(input_file, input_dir).replace('\\', '/')
-#             base_name, ext = os.path.splitext(os.path.basename(rel_path))  # 파일명만 분리
-#             output_folder = os.path.join(output_dir, os.path.dirname(rel_path)).replace('\\', '/')
-#             output_file = os.path.join(output_folder, f"{base_name}{ext}").replace('\\', '/')
 
-#             # 상위 디렉터리 생성 (output_file의 상위 폴더)
-#             os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-#             # 정규화 및 저장
-#             try:
-#                 new_data=normalization(input_file, output_file)
-#             except Exception as e:
-#                 print(f"Error processing {input_file}: {e}")
+# 폴더 전체 정규화 (예전 여기 있던 JSON -> JSON 스크립트) 는 codes/tensor_store.py
@@ -0,0 +1,162 @@
+import argparse
+import os
+import warnings
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.ao import quantization as tq
+
+from .models.st_gcn_18_10words_54node import STGCNModel, build_inference_model
+
+
+# CPU 전용 INT8 추론 (eager 모드 static quantization)
+# 추론 전용 빌드(build_inference_model) 위에서 1x1 conv, temporal conv, 잔차 conv, fcn 을 INT8로
+# 그래프 matmul(A)과 잔차 덧셈은 float 그대로 (양자화 커널이 없음)
+#
+# 1) 녹화 클립으로 calibration 해서 <체크포인트>.int8.pth 저장
+#    python -m codes.quantization --checkpoint datas/xxx.pth --num-class 10 --calib-dir datas/calib
+# 2) ECOLINK_MODEL_VARIANT=int8 이면 classify/classify8 이 그 파일을 올림
+
+
+def quantized_path(model_path):
+    base, _ = os.path.splitext(model_path)
+    return f'{base}.int8.pth'
+
+
+def default_engine():
+    engines = torch.backends.quantized.supported_engines
+    for engine in ('x86', 'fbgemm', 'qnnpack'):
+        if engine in engines:
+            return engine
+    raise RuntimeError('사용 가능한 양자화 엔진이 없음')
+
+
+class QuantSTGCNBlock(nn.Module):
+    def __init__(self, block):
+        super().__init__()
+        gcn = block.gcn
+        self.kernel_size = gcn.kernel_size
+        self.residual_mode = block.residual_mode
+
+        # 블록 입력은 한 번만 양자화해서 gcn conv / 잔차 conv 에 같이 씀
+        self.quant = tq.QuantStub()
+        self.gcn_conv = nn.Conv2d(gcn.weight.size(1), gcn.weight.size(0), kernel_size=1, bias=False)
+        self.gcn_conv.weight.data.copy_(gcn.weight)
+        self.gcn_dequant = tq.DeQuantStub()
+        self.register_buffer('A', gcn.A.clone())
+        self.register_buffer('bias', gcn.bias.clone())
+
+        self.tcn_quant = tq.QuantStub()
+        self.tcn = block.tcn
+        self.tcn_dequant = tq.DeQuantStub()
+
+        if self.residual_mode == 'conv':
+            self.residual = block.residual
+            self.res_dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        qx = self.quant(x)
+        if self.residual_mode == 'conv':
+            res = self.res_dequant(self.residual(qx))
+        elif self.residual_mode == 'identity':
+            res = x
+        else:
+            res = None
+
+        y = self.gcn_dequant(self.gcn_conv(qx))
+        if self.kernel_size == 1:
+            y = torch.matmul(y, self.A)
+        else:
+            n, kc, t, v = y.size()
+            y = y.view(n, self.kernel_size, kc // self.kernel_size, t, v)
+            y = torch.einsum('nkctv,kvw->nctw', (y, self.A))
+        y = F.relu(y + self.bias)
+
+        y = self.tcn_dequant(self.tcn(self.tcn_quant(y)))
+        if res is not None:
+            y = y + res
+        return F.relu(y)
+
+
+class QuantSTGCN(nn.Module):
+    # STGCNInferenceModel 과 같은 계산, conv/linear 앞뒤에 Quant/DeQuant 스텁
+    def __init__(self, fused):
+        super().__init__()
+        self.register_buffer('data_scale', fused.data_scale.clone())
+        self.register_buffer('data_shift', fused.data_shift.clone())
+        self.st_gcn_networks = nn.ModuleList([QuantSTGCNBlock(block) for block in fused.st_gcn_networks])
+        self.fc_quant = tq.QuantStub()
+        self.fc = fused.fc
+        self.fc_dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        N, C, T, V = x.size()
+        x = (x.reshape(N, C * V, T) * self.data_scale + self.data_shift).view(N, C, T, V)
+        for block in self.st_gcn_networks:
+            x = block(x)
+        return self.head(x.mean(dim=(2, 3)))
+
+    def head(self, x):
+        return self.fc_dequant(self.fc(self.fc_quant(x)))
+
+
+def _prepare(model, engine):
+    torch.backends.quantized.engine = engine
+    qmodel = QuantSTGCN(build_inference_model(model.cpu())).eval()
+    qmodel.qconfig = tq.get_default_qconfig(engine)
+    return tq.prepare(qmodel)
+
+
+def quantize_model(model, calibration_inputs, engine=None):
+    # model: 학습된 STGCNModel, calibration_inputs: (N, 4, T, 54) 텐서들
+    engine = engine or default_engine()
+    prepared = _prepare(model, engine)
+    with torch.no_grad():
+        for x in calibration_inputs:
+            prepared(x.cpu())
+    return tq.convert(prepared).eval()
+
+
+def save_quantized(qmodel, path, num_class, engine):
+    torch.save({'model_state_dict': qmodel.state_dict(), 'num_class': num_class, 'engine': engine}, path)
+
+
+def load_quantized(path, num_class):
+    checkpoint = torch.load(path, map_location='cpu', weights_only=False)
+    # 같은 구조를 만든 뒤 (가중치는 state_dict 로 덮어씀) 바로 convert, observer 비어 있다는 경고는 무시
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        qmodel = tq.convert(_prepare(STGCNModel(in_channels=4, num_class=num_class).eval(), checkpoint['engine']))
+    qmodel.load_state_dict(checkpoint['model_state_dict'])
+    return qmodel.eval()
+
+
+def load_stgcn_int8(model_path, num_class, device):
+    # 레지스트리용 builder, 양자화 모델은 항상 CPU
+    path = quantized_path(model_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'INT8 체크포인트 없음: {path} (python -m codes.quantization 으로 먼저 생성)')
+    return load_quantized(path, num_class)
+
+
+if __name__ == "__main__":
+    from .tensor_store import load_batches
+    from .model_registry import load_stgcn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', required=True)
+    parser.add_argument('--num-class', type=int, required=True)
+    parser.add_argument('--calib-dir', required=True, help='<라벨>/<클립>.json 구조의 녹화 클립 폴더 또는 텐서 저장소')
+    parser.add_argument('--engine', default=None)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    engine = args.engine or default_engine()
+    model = load_stgcn(args.checkpoint, args.num_class, torch.device('cpu'))
+    calib, _ = load_batches(args.calib_dir)
+    qmodel = quantize_model(model, calib, engine)
+
+    output = args.output or quantized_path(args.checkpoint)
+    save_quantized(qmodel, output, args.num_class, engine)
+    print(f'{sum(len(x) for x in calib)}개 클립으로 calibration, 저장: {output} ({engine})')
@@ -0,0 +1,276 @@
+import argparse
+import os
+from collections import deque
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .keypoints_array import frames_to_array
+
+
+# 프레임을 하나씩 받아서 롤링 top-k 를 내는 스트리밍 인식기
+# STGCNModel 가중치를 그대로 쓰고, 블록마다 9탭 temporal conv 입력 버퍼만 들고 있음
+# -> 새 프레임마다 블록별로 gcn 1프레임 + temporal conv 1출력만 계산 (전체 윈도우 재계산 없음)
+#
+# reset() 후 클립 프레임을 다 넣고 flush() 하면 오프라인 model(x) 와 같은 결과
+# partial=False(기본): 마지막 블록 출력이 나올 때만 예측 (입력 4프레임당 1번, 첫 출력은 ~80프레임 뒤)
+#   프레임당 블록별 1프레임만 계산 -> 1~10ms/프레임 (1스레드 CPU)
+# partial=True (ECOLINK_STREAM_PARTIAL=1): 첫 블록 temporal conv 의 9프레임이 차면 partial_every 프레임마다 부분 예측
+#   = 지금 클립이 끝났다고 치고 flush 한 결과 (peek, 상태는 건드리지 않음), 블록 지연(~90프레임)을 기다리지 않음
+#   peek 는 블록마다 남은 출력을 한 번에 계산해서 60프레임 오프라인 forward 한 번 정도 (40~100ms)
+#   -> 프레임당 평균 비용은 (peek 비용) / partial_every, 기본 간격은 블록 stride 곱(4)이라 ~15~30ms/프레임
+#      간격 1 이면 프레임마다 창 전체를 다시 계산하는 것과 같음
+# data_bn 은 (N, C*V, T) view 때문에 프레임 위치마다 affine 이 달라서, 60프레임 기준 위치를 순환해서 씀
+
+REFERENCE_LENGTH = 60
+STREAM_PARTIAL = os.getenv('ECOLINK_STREAM_PARTIAL', '0') == '1'
+PARTIAL_EVERY = int(os.getenv('ECOLINK_STREAM_PARTIAL_EVERY', 0))   # 부분 예측 간격 (프레임), 0 이면 블록 stride 곱
+
+
+class _StreamingBlock:
+    def __init__(self, block, A):
+        self.block = block
+        self.A = A
+        conv = block.tcn[2]
+        self.conv = conv
+        self.kernel = conv.kernel_size[0]
+        self.stride = conv.stride[0]
+        self.pad = conv.padding[0]
+        self.channels = conv.in_channels
+        if isinstance(block.residual, torch.nn.Sequential):
+            self.residual_mode = 'conv'
+        else:
+            self.residual_mode = 'identity' if block.residual(1) == 1 else 'none'
+        self.reset()
+
+    def reset(self):
+        self.count = 0  # 받은 프레임 수 (flush 패딩 포함)
+        self.window = deque(maxlen=self.kernel)    # temporal conv 입력 (BN+ReLU 뒤)
+        self.inputs = deque(maxlen=self.pad + 1)   # 잔차용 블록 입력, [0] 이 지금 출력할 중심 프레임
+        self.zero = None
+
+    def push(self, x):
+        # x: (1, C_in, 1, V) 블록 입력 한 프레임, None 이면 끝 패딩(0)
+        # 반환: 이번에 나온 출력 프레임 (1, C_out, 1, V) 또는 None
+        if x is not None:
+            if self.zero is None:
+                self.zero = x.new_zeros(1, self.channels, 1, x.size(3))
+                self.window.extend([self.zero] * self.pad)  # 앞쪽 zero padding
+            h, _ = self.block.gcn(x, self.A)
+            h = self.block.tcn[1](self.block.tcn[0](h))
+        else:
+            h = self.zero
+        self.window.append(h)
+        self.inputs.append(x)
+        self.count += 1
+
+        center = self.count - 1 - self.pad
+        if center < 0 or center % self.stride != 0:
+            return None
+        y = F.conv2d(torch.cat(tuple(self.window), dim=2), self.conv.weight, self.conv.bias)
+        y = self.block.tcn[3](y)
+        y = y + self.block.residual(self.inputs[0])
+        return F.relu(y)
+
+    def tail(self, xs):
+        # 상태는 그대로 두고, xs (1, C_in, T, V) 를 push 한 뒤 flush 했을 때 나올 출력들을 한 번에 (1, C_out, T_out, V)
+        # 프레임마다 push 하는 것과 같은 값, gcn / temporal conv 는 한 번씩만 부름
+        window = list(self.window)
+        zero = self.zero
+        new = 0 if xs is None else xs.size(2)
+        if new:
+            if zero is None:
+                zero = xs.new_zeros(1, self.channels, 1, xs.size(3))
+                window = [zero] * self.pad
+            h, _ = self.block.gcn(xs, self.A)
+            window.append(self.block.tcn[1](self.block.tcn[0](h)))
+        if zero is None:
+            return None
+        window.append(zero.expand(-1, -1, self.pad, -1))
+        seq = torch.cat(window, dim=2)
+
+        # 전역 위치: 앞 zero padding 포함, 중심 프레임 c 의 창은 [c, c + kernel)
+        count = self.count + new
+        base = self.pad + count + self.pad - seq.size(2)
+        first = max(0, self.count - self.pad)
+        first += -first % self.stride
+        last = count - 1
+        if first > last:
+            return None
+        y = F.conv2d(seq[:, :, first - base:], self.conv.weight, self.conv.bias, stride=(self.stride, 1))
+        y = self.block.tcn[3](y)
+
+        if self.residual_mode != 'none':
+            stored = list(self.inputs)
+            inputs = torch.cat(stored + ([xs] if new else []), dim=2)
+            offset = self.count - len(stored)
+            res = inputs[:, :, first - offset:last - offset + 1:self.stride]
+            if self.residual_mode == 'conv':
+                res = self.block.residual[1](F.conv2d(res, self.block.residual[0].weight, self.block.residual[0].bias))
+            y = y + res
+        return F.relu(y)
+
+
+class StreamingRecognizer:
+    def __init__(self, model, label_list, top_k=3, window=REFERENCE_LENGTH // 4, partial=STREAM_PARTIAL,
+                 partial_every=PARTIAL_EVERY):
+        # window: 평균낼 마지막 블록 출력 개수 (stride 2 블록이 둘이라 입력 4프레임당 1개)
+        model.eval()
+        self.model = model
+        self.label_list = label_list
+        self.top_k = top_k
+        self.partial = partial
+        self.blocks = [_StreamingBlock(block, model.A) for block in model.st_gcn_networks]
+        self.partial_after = self.blocks[0].kernel   # 첫 블록 receptive field
+        # 기본 간격: 마지막 블록 출력 하나가 나오는 입력 프레임 수
+        self.partial_every = partial_every if partial_every > 0 else int(np.prod([b.stride for b in self.blocks]))
+
+        C = model.data_bn.num_features // model.graph.num_node
+        V = model.graph.num_node
+        # 위치 t 에서 data_bn 이 (c, v) 에 쓰는 채널: (c*T*V + t*V + v) // T
+        t = np.arange(REFERENCE_LENGTH)[:, None, None]
+        c = np.arange(C)[None, :, None]
+        v = np.arange(V)[None, None, :]
+        self.bn_channel = torch.from_numpy((c * REFERENCE_LENGTH * V + t * V + v) // REFERENCE_LENGTH)
+
+        self.features = deque(maxlen=window)
+        self.feature_sum = None
+        self.position = 0
+
+    def reset(self):
+        for block in self.blocks:
+            block.reset()
+        self.features.clear()
+        self.feature_sum = None
+        self.position = 0
+
+    def _data_bn(self, x):
+        bn = self.model.data_bn
+        idx = self.bn_channel[self.position % REFERENCE_LENGTH].to(x.device)  # (C, V)
+        scale = bn.weight[idx] / torch.sqrt(bn.running_var[idx] + bn.eps)
+        return (x - bn.running_mean[idx]) * scale + bn.bias[idx]
+
+    def _cascade(self, start, x):
+        # start 블록부터 출력이 나오는 데까지 흘려보냄, 마지막 블록 출력이 나오면 True
+        for block in self.blocks[start:]:
+            x = block.push(x)
+            if x is None:
+                return False
+        self._add_feature(x.mean(dim=(2, 3)).squeeze(0))
+        return True
+
+    def _add_feature(self, feature):
+        if len(self.features) == self.features.maxlen:
+            self.feature_sum = self.feature_sum - self.features[0]
+        self.features.append(feature)
+        self.feature_sum = feature if self.feature_sum is None else self.feature_sum + feature
+
+    def push_array(self, frame):
+        # frame: (4, 54) 정규화된 한 프레임, 새 예측이 나오면 [(라벨, 확률)], 아니면 None
+        device = self.model.A.device
+        with torch.no_grad():
+            x = torch.as_tensor(frame, dtype=torch.float32, device=device)
+            x = self._data_bn(x).view(1, x.size(0), 1, x.size(1))
+            self.position += 1
+            emitted = self._cascade(0, x)
+        if self.partial:
+            due = self.position >= self.partial_after and (self.position - self.partial_after) % self.partial_every == 0
+            return self.peek() if due else None
+        return self.predictions() if emitted else None
+
+    def push_frame(self, frame):
+        arr, _ = frames_to_array([frame])
+        return self.push_array(arr[:, 0])
+
+    def flush(self):
+        # 클립 끝: 블록마다 뒤쪽 zero padding 을 넣어서 남은 출력을 다 뽑음
+        with torch.no_grad():
+            for i, block in enumerate(self.blocks):
+                if block.zero is None:
+                    continue
+                for _ in range(block.pad):
+                    out = block.push(None)
+                    if out is not None:
+                        if i + 1 == len(self.blocks):
+                            self._add_feature(out.mean(dim=(2, 3)).squeeze(0))
+                        else:
+                            self._cascade(i + 1, out)
+        return self.predictions()
+
+    def peek(self):
+        # 지금 클립이 끝났다고 치고 flush 한 예측 (상태는 그대로), 블록마다 남은 출력을 한 번에 계산
+        with torch.no_grad():
+            x = None
+            for block in self.blocks:
+                x = block.tail(x)
+            features = list(self.features)
+            if x is not None:
+                features.extend(x.mean(dim=3).squeeze(0).t())
+            features = features[-self.features.maxlen:]
+            if not features:
+                return None
+            return self._top_k(self._classify(torch.stack(features).mean(dim=0)))
+
+    def logits(self):
+        if not self.features:
+            return None
+        return self._classify(self.feature_sum / len(self.features))
+
+    def _classify(self, feature):
+        fcn = self.model.fcn
+        return F.linear(feature, fcn.weight.view(fcn.out_channels, -1), fcn.bias)
+
+    def predictions(self):
+        return self._top_k(self.logits())
+
+    def _top_k(self, logits):
+        if logits is None:
+            return None
+        probs = torch.softmax(logits, dim=0)
+        values, indices = probs.topk(min(self.top_k, probs.numel()))
+        return [(self.label_list[i], p) for i, p in zip(indices.tolist(), values.tolist())]
+
+
+def stream_clip(recognizer, frames):
+    # 녹화 JSON 클립을 정규화해서 한 프레임씩 흘림 -> (롤링 예측 리스트, 최종 예측)
+    from .normalization_cam import normalization
+
+    arr, _ = normalization(frames)
+    recognizer.reset()
+    rolling = []
+    for t in range(arr.shape[1]):
+        preds = recognizer.push_array(arr[:, t])
+        if preds is not None:
+            rolling.append((t, preds))
+    return rolling, recognizer.flush()
+
+
+if __name__ == "__main__":
+    import json
+    from .model_registry import load_stgcn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint', required=True)
+    parser.add_argument('--labels', choices=['10emer', '8police'], default='10emer')
+    parser.add_argument('--partial', action='store_true', help='첫 9프레임 뒤부터 부분 예측 (peek)')
+    parser.add_argument('--partial-every', type=int, default=PARTIAL_EVERY)
+    parser.add_argument('clips', nargs='+', help='녹화 JSON 클립')
+    args = parser.parse_args()
+
+    if args.labels == '10emer':
+        from .emedding_test_10emer_return_54node import label_list
+    else:
+        from .emedding_test_8emer_return_54node import label_list
+
+    model = load_stgcn(args.checkpoint, len(label_list), torch.device('cpu'))
+    recognizer = StreamingRecognizer(model, label_list, partial=args.partial or STREAM_PARTIAL,
+                                     partial_every=args.partial_every)
+    for path in args.clips:
+        with open(path, 'r') as f:
+            frames = json.load(f)
+        rolling, final = stream_clip(recognizer, frames)
+        print(f'== {path}')
+        for t, preds in rolling:
+            print(f'  frame {t:3d}: ' + ', '.join(f'{label} {p:.2f}' for label, p in preds))
+        print('  final    : ' + ', '.join(f'{label} {p:.2f}' for label, p in final))
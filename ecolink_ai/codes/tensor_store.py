@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .keypoints_array import NUM_CHANNELS, NUM_NODES
+from .normalization_cam import normalization
+
+
+# 녹화 JSON 클립 폴더를 프로세스 풀로 정규화해서 (N, 4, 60, 54) float32 memmap 저장소로
+#   python -m codes.tensor_store --input datas/clips --output datas/store [--workers 8]
+# 라벨은 입력 폴더 아래 첫 번째 폴더 이름 (<라벨>/.../<클립>.json)
+#
+# 저장소 폴더
+#   data.f32     (capacity, 4, 60, 54) float32 raw memmap, 필요할 때 파일 크기만 늘림
+#   index.json   {'shape', 'capacity', 'rows', 'clips': {상대경로: {'label', 'sha1', 'row'}}}
+# 다시 돌리면 내용 해시가 같은 클립은 건너뛰고, 바뀐 클립은 같은 행에 덮어씀
+# 인덱스는 SAVE_EVERY 클립마다 저장 -> 중간에 끊겨도 저장 안 된 클립만 다시 함
+#
+# 평가/학습: TensorStore(path).batches(label_list) 로 JSON 파싱 없이 배치를 읽음
+#   load_batches(path) 는 저장소든 <라벨>/<클립>.json 폴더든 같은 모양으로 (quantization / early_exit / multihead CLI, 벤치마크)
+
+FRAMES = 60
+DATA_FILE = 'data.f32'
+INDEX_FILE = 'index.json'
+SAVE_EVERY = 256
+
+
+def is_store(path):
+    return os.path.exists(os.path.join(path, INDEX_FILE))
+
+
+class TensorStore:
+    def __init__(self, path, mode='r'):
+        # mode: 'r' 읽기 전용, 'r+' 쓰기 (없으면 새로 만듦)
+        self.path = path
+        self.mode = mode
+        if is_store(path):
+            with open(os.path.join(path, INDEX_FILE), 'r') as f:
+                self.index = json.load(f)
+        elif mode == 'r':
+            raise FileNotFoundError(f'텐서 저장소 없음: {path} (python -m codes.tensor_store 로 먼저 생성)')
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.index = {'shape': [NUM_CHANNELS, FRAMES, NUM_NODES], 'capacity': 0, 'rows': 0, 'clips': {}}
+        self.shape = tuple(self.index['shape'])
+        self.data = self._open()
+
+    @property
+    def clips(self):
+        return self.index['clips']
+
+    def __len__(self):
+        return len(self.clips)
+
+    def _open(self):
+        if not self.index['capacity']:
+            return None
+        return np.memmap(os.path.join(self.path, DATA_FILE), dtype=np.float32, mode=self.mode,
+                         shape=(self.index['capacity'],) + self.shape)
+
+    def _reserve(self, rows):
+        # 행이 모자라면 용량을 두 배로 (파일 끝만 늘리고 다시 매핑)
+        if rows <= self.index['capacity']:
+            return
+        capacity = max(rows, 2 * self.index['capacity'], 64)
+        if self.data is not None:
+            self.data.flush()
+            self.data = None
+        with open(os.path.join(self.path, DATA_FILE), 'a+b') as f:
+            f.truncate(capacity * int(np.prod(self.shape)) * 4)
+        self.index['capacity'] = capacity
+        self.data = self._open()
+
+    def write(self, rel_path, label, sha1, arr):
+        entry = self.clips.get(rel_path)
+        if entry is None:
+            row = self.index['rows']
+            self._reserve(row + 1)
+            self.index['rows'] = row + 1
+        else:
+            row = entry['row']
+        self.data[row] = arr
+        self.clips[rel_path] = {'label': label, 'sha1': sha1, 'row': row}
+
+    def save(self):
+        # 데이터 먼저 디스크로, 인덱스는 임시 파일에 쓰고 교체
+        if self.data is not None:
+            self.data.flush()
+        tmp = os.path.join(self.path, INDEX_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+    def entries(self):
+        # [(상대경로, 라벨, 행)], 행 순서
+        items = sorted(self.clips.items(), key=lambda item: item[1]['row'])
+        return [(rel_path, entry['label'], entry['row']) for rel_path, entry in items]
+
+    def batches(self, label_list=None, batch_size=16, shuffle=False, seed=0):
+        # (x (B, 4, 60, 54) 텐서, 라벨 인덱스 (B,) 또는 None) 를 차례로
+        # label_list 가 없으면 라벨 없이 (calibration 등)
+        import torch
+
+        entries = self.entries()
+        rows = np.array([row for _, _, row in entries], dtype=np.intp)
+        targets = None
+        if label_list is not None:
+            targets = np.array([label_list.index(label) for _, label, _ in entries], dtype=np.int64)
+        order = np.random.default_rng(seed).permutation(len(rows)) if shuffle else np.arange(len(rows))
+
+        for i in range(0, len(order), batch_size):
+            chunk = order[i:i + batch_size]
+            # memmap 에서 필요한 행만 복사
+            x = torch.from_numpy(np.ascontiguousarray(self.data[rows[chunk]]))
+            yield x, None if targets is None else torch.from_numpy(targets[chunk])
+
+
+def list_clips(input_dir, log=print):
+    # [(상대경로, 라벨)], 라벨은 첫 번째 폴더 이름
+    # 폴더 밖(input_dir 바로 아래) 파일은 라벨이 없으므로 건너뜀 (라벨 '' 로 학습 데이터에 섞이지 않게)
+    clips = []
+    for root, _, files in os.walk(input_dir):
+        for file in files:
+            if file.endswith('.json'):
+                rel_path = os.path.relpath(os.path.join(root, file), input_dir).replace('\\', '/')
+                if '/' not in rel_path:
+                    log(f'라벨 폴더 밖 파일 건너뜀: {rel_path}')
+                    continue
+                clips.append((rel_path, rel_path.split('/')[0]))
+    return sorted(clips)
+
+
+def load_clips(clip_dir):
+    # clip_dir/<라벨>/<클립>.json 구조의 녹화 클립 -> [(라벨, 프레임 리스트)]
+    clips = []
+    for label in sorted(os.listdir(clip_dir)):
+        label_dir = os.path.join(clip_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for file in sorted(os.listdir(label_dir)):
+            if file.endswith('.json'):
+                with open(os.path.join(label_dir, file), 'r') as f:
+                    clips.append((label, json.load(f)))
+    return clips
+
+
+def clips_to_batches(clips, batch_size=16):
+    # 녹화 클립(프레임 dict 리스트)들 -> 정규화 -> (B, 4, 60, 54) 배치 리스트
+    import torch
+
+    xs = [torch.from_numpy(normalization(frames, FRAMES)[0]).unsqueeze(0) for frames in clips]
+    return [torch.cat(xs[i:i + batch_size]) for i in range(0, len(xs), batch_size)]
+
+
+def load_batches(path, label_list=None, batch_size=16):
+    # 텐서 저장소 또는 <라벨>/<클립>.json 폴더 -> (배치 리스트, 라벨 인덱스 (N,) 또는 None)
+    import torch
+
+    if is_store(path):
+        batches = list(TensorStore(path).batches(label_list, batch_size))
+        inputs = [x for x, _ in batches]
+        targets = torch.cat([y for _, y in batches]) if label_list is not None and batches else None
+        return inputs, targets
+
+    clips = load_clips(path)
+    inputs = clips_to_batches([frames for _, frames in clips], batch_size)
+    targets = None
+    if label_list is not None:
+        targets = torch.tensor([label_list.index(label) for label, _ in clips])
+    return inputs, targets
+
+
+def file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _normalize_file(path):
+    # 워커: JSON 클립 하나 -> (arr (4, 60, 54) float32, None) 또는 (None, 에러 메시지)
+    try:
+        with open(path, 'r') as f:
+            arr, _ = normalization(json.load(f), FRAMES)
+        return arr, None
+    except Exception as e:
+        return None, f'{type(e).__name__}: {e}'
+
+
+def build_store(input_dir, output_dir, workers=None, chunksize=8, log=print):
+    store = TensorStore(output_dir, mode='r+')
+    clips = list_clips(input_dir, log=log)
+
+    # 내용 해시로 바뀐 클립만 (해시는 파일 읽기뿐이라 메인 프로세스에서)
+    todo = []
+    for rel_path, label in clips:
+        sha1 = file_sha1(os.path.join(input_dir, rel_path))
+        entry = store.clips.get(rel_path)
+        if entry is None or entry['sha1'] != sha1 or entry['label'] != label:
+            todo.append((rel_path, label, sha1))
+
+    # 입력에서 사라진 클립은 인덱스에서만 뺌 (행은 재사용하지 않음)
+    current = {rel_path for rel_path, _ in clips}
+    removed = [rel_path for rel_path in store.clips if rel_path not in current]
+    for rel_path in removed:
+        del store.clips[rel_path]
+
+    stats = {'total': len(clips), 'skipped': len(clips) - len(todo), 'written': 0, 'failed': 0, 'removed': len(removed)}
+    start = time.perf_counter()
+    paths = [os.path.join(input_dir, rel_path) for rel_path, _, _ in todo]
+    with ProcessPoolExecutor(workers) as pool:
+        for (rel_path, label, sha1), (arr, error) in zip(todo, pool.map(_normalize_file, paths, chunksize=chunksize)):
+            if error is not None:
+                stats['failed'] += 1
+                log(f'실패 {rel_path}: {error}')
+                continue
+            store.write(rel_path, label, sha1, arr)
+            stats['written'] += 1
+            if stats['written'] % SAVE_EVERY == 0:
+                store.save()
+                log(f'{stats["written"]}/{len(todo)} ({stats["written"] / (time.perf_counter() - start):.1f} clips/s)')
+    store.save()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['clips_per_sec'] = stats['written'] / stats['seconds'] if stats['written'] else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', required=True, help='<라벨>/<클립>.json 구조의 녹화 클립 폴더')
+    parser.add_argument('--output', required=True, help='저장소 폴더')
+    parser.add_argument('--workers', type=int, default=None, help='기본: CPU 수')
+    parser.add_argument('--chunksize', type=int, default=8)
+    args = parser.parse_args()
+
+    stats = build_store(args.input, args.output, args.workers, args.chunksize)
+    print(f'{stats["total"]}개 클립: 새로/다시 {stats["written"]}, 그대로 {stats["skipped"]}, '
+          f'실패 {stats["failed"]}, 삭제 {stats["removed"]} '
+          f'({stats["seconds"]:.1f}s, {stats["clips_per_sec"]:.1f} clips/s)')
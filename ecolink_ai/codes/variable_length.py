@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .models.st_gcn_18_10words_54node import EarlyExitSTGCN, FusedSTGCNBlock, st_gcn
+
+
+# 60프레임으로 자르거나 늘리지 않고 실제 길이 그대로 추론
+# 길이가 비슷한 요청끼리 버킷으로 묶어서 배치의 최대 길이까지만 패딩하고,
+# 패딩 프레임은 temporal conv 입력에서 0으로 가리고 평균 풀링에서도 뺌 -> 결과는 배치 구성/패딩과 무관
+#
+# data_bn 은 (N, C*V, T) view 위에서 학습돼서 프레임 위치마다 쓰는 채널 통계가 다름 (T=60 기준)
+# 길이 L 클립의 프레임 t 는 normalization 이 60프레임을 뽑을 때의 위치 t*59/(L-1) 로 보고 그 위치의 통계를 씀
+# (model(x[:, :, :L]) 를 그대로 부르면 T 에 따라 통계가 엉뚱한 채널로 감), L=60 이면 model(x) 와 같음
+# 학습은 60프레임만 봤으므로 정확도는 버킷별로 확인하고 쓸 것 (benchmarks/bench_variable_length.py --clip-dir)
+#
+# 빨라지는 건 60프레임보다 짧은 클립뿐: 계산량이 길이에 비례해서 128/256 버킷은 60프레임 고정보다 2~4배 느림
+# (1스레드 batch 2 기준 <=32: x2.5, 33~64: x1.5, 65~128: x0.6, 129~256: x0.3)
+# -> MAX_LENGTH(기본 60) 보다 긴 클립은 cap_length 로 60프레임을 뽑아서 넣음 (normalization(data, 60) 과 같은 프레임)
+
+BUCKETS = tuple(int(b) for b in os.getenv('ECOLINK_LENGTH_BUCKETS', '32,64,128,256').split(','))
+REFERENCE_LENGTH = 60
+MAX_LENGTH = int(os.getenv('ECOLINK_VARIABLE_MAX_LENGTH', REFERENCE_LENGTH))
+
+
+def bucket_for(length, buckets=BUCKETS):
+    for bound in buckets:
+        if length <= bound:
+            return bound
+    return buckets[-1]
+
+
+def cap_length(x, max_length=MAX_LENGTH):
+    # x (N, C, L, V), L 이 max_length 보다 길면 60프레임으로 뽑음
+    # 인덱스는 normalization 이 잘라낸 구간에서 60프레임을 뽑을 때와 같음 -> 60프레임 고정 경로와 같은 입력
+    L = x.size(2)
+    if L <= max_length:
+        return x
+    indices = torch.from_numpy(np.linspace(0, L - 1, REFERENCE_LENGTH).astype(int)).to(x.device)
+    return x.index_select(2, indices)
+
+
+def pad_batch(xs):
+    # xs: (1, C, L_i, V) 리스트 -> (N, C, max L, V), lengths (N,)
+    lengths = torch.tensor([x.size(2) for x in xs])
+    T = int(lengths.max())
+    batch = xs[0].new_zeros(len(xs), xs[0].size(1), T, xs[0].size(3))
+    for i, x in enumerate(xs):
+        batch[i, :, :x.size(2)] = x[0]
+    return batch, lengths
+
+
+def _out_lengths(lengths, conv):
+    k, s, p = conv.kernel_size[0], conv.stride[0], conv.padding[0]
+    return (lengths + 2 * p - k) // s + 1
+
+
+def _time_mask(lengths, T, device):
+    # (N, 1, T, 1), 유효 프레임 1
+    return (torch.arange(T, device=device)[None, :] < lengths.to(device)[:, None]).view(-1, 1, T, 1)
+
+
+def reference_channels(C, V, L, reference=REFERENCE_LENGTH):
+    # 길이 L 의 (c, t, v) 가 60프레임 기준 위치에서 data_bn 이 쓰는 채널 (C, L, V)
+    # T=60 에서 (c, t, v) 의 채널 = (c*T*V + t*V + v) // T
+    t = torch.arange(L)
+    if L > 1:
+        t = torch.round(t * (reference - 1) / (L - 1)).long()
+    c = torch.arange(C).view(-1, 1, 1)
+    v = torch.arange(V).view(1, 1, -1)
+    return (c * reference * V + t.view(1, -1, 1) * V + v) // reference
+
+
+def _data_bn(model, x, lengths):
+    N, C, T, V = x.size()
+    out = torch.zeros_like(x)
+    if hasattr(model, 'data_bn'):
+        bn = model.data_bn
+        scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+        shift = bn.bias - bn.running_mean * scale
+    else:
+        scale, shift = model.data_scale.view(-1), model.data_shift.view(-1)
+    for i, L in enumerate(lengths.tolist()):
+        idx = reference_channels(C, V, L).to(x.device)
+        out[i, :, :L] = x[i, :, :L] * scale[idx] + shift[idx]
+    return out
+
+
+def _block_forward(block, x, A, mask):
+    if isinstance(block, FusedSTGCNBlock):
+        res = None if block.residual_mode == 'none' else block.residual(x)
+        h = F.relu(block.gcn(x)) * mask
+        y = block.tcn(h)
+        if res is not None:
+            y = y + res
+        return F.relu(y)
+
+    res = block.residual(x)
+    h, _ = block.gcn(x, A)
+    h = block.tcn[1](block.tcn[0](h)) * mask
+    y = block.tcn[4](block.tcn[3](block.tcn[2](h)))
+    return F.relu(y + res)
+
+
+def features_masked(model, x, lengths):
+    # model.features() 의 가변 길이판: x (N, 4, T, 54) 뒤쪽 패딩, lengths (N,) -> 풀링된 특징 (N, C)
+    lengths = lengths.cpu()
+    x = _data_bn(model, x, lengths)
+    blocks = model.st_gcn_networks
+
+    if not all(isinstance(block, (st_gcn, FusedSTGCNBlock)) for block in blocks):
+        # 마스킹을 못 넣는 블록(int8 등)은 샘플마다 자기 길이로
+        pooled = []
+        for i, L in enumerate(lengths.tolist()):
+            xi = x[i:i + 1, :, :L]
+            for block in blocks:
+                xi = block(xi)
+            pooled.append(xi.mean(dim=(2, 3)))
+        return torch.cat(pooled)
+
+    A = getattr(model, 'A', None)
+    for block in blocks:
+        conv = block.tcn if isinstance(block, FusedSTGCNBlock) else block.tcn[2]
+        mask = _time_mask(lengths, x.size(2), x.device)
+        x = _block_forward(block, x, A, mask)
+        lengths = _out_lengths(lengths, conv)
+
+    # 유효 프레임만 평균
+    mask = _time_mask(lengths, x.size(2), x.device)
+    return (x * mask).sum(dim=(2, 3)) / (lengths.to(x.device)[:, None] * x.size(3))
+
+
+def forward_masked(model, x, lengths):
+    # model: STGCNModel / STGCNInferenceModel / QuantSTGCN / MultiHeadSTGCN (head 가 있는 모델)
+    # 반환은 model(x) 와 같은 모양 (멀티헤드면 {어휘: 로짓})
+    if isinstance(model, EarlyExitSTGCN):
+        model = model.model   # 가변 길이는 출구 없이 끝까지
+    return model.head(features_masked(model, x, lengths))
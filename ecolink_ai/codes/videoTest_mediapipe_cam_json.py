@@ -5,6 +5,9 @@ import time
 import mediapipe as mp
 import json
 
+from .motion_gate import MotionGate, MotionStateMachine, draw_state
+from .landmark_profiles import LANDMARK_PROFILE, POSE_LANDMARKS, make_landmarker, profile_options
+
 
 
 # 카메라에 접근
@@ -44,15 +47,102 @@ def landmarks_to_dict(landmarks, indices=None):
 
 
 
-def video_to_keypoints(cap, time_threshold=3):    
+def make_holistic(profile=LANDMARK_PROFILE):
+    # 프로파일별 랜드마크 모델 (codes/landmark_profiles.py), 기본 accurate 는 기존 Holistic 설정
+    return make_landmarker(profile)
+
+
+def results_to_frame_dict(results, frame_idx):
+    return {
+        'frame': frame_idx,
+        'pose_landmarks': landmarks_to_dict(results.pose_landmarks, POSE_LANDMARKS),
+        'left_hand_landmarks': landmarks_to_dict(results.left_hand_landmarks),
+        'right_hand_landmarks': landmarks_to_dict(results.right_hand_landmarks)
+    }
+
+
+def draw_results(frame, results):
+    mp_drawing.draw_landmarks(frame, results.left_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
+    mp_drawing.draw_landmarks(frame, results.right_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
+    if results.face_landmarks is not None:
+        mp_drawing.draw_landmarks(
+            frame,
+            results.face_landmarks,
+            mp_holistic.FACEMESH_TESSELATION,
+            landmark_drawing_spec=None,
+            connection_drawing_spec=mp_drawing_styles
+            .get_default_face_mesh_tesselation_style())
+    mp_drawing.draw_landmarks(
+        frame,
+        results.pose_landmarks,
+        mp_holistic.POSE_CONNECTIONS,
+        landmark_drawing_spec=mp_drawing_styles.
+        get_default_pose_landmarks_style())
+
+
+def iter_keypoints(source, profile=LANDMARK_PROFILE, time_threshold=None):
+    # 헤드리스 추출: 그리기 / 창 / waitKey 없이 스트림 끝까지 읽으면서 프레임 dict 를 하나씩 yield
+    # source: 영상 파일 경로, 카메라 번호 또는 열려 있는 cv2.VideoCapture
+    # time_threshold 를 주면 video_to_keypoints 처럼 움직임 게이트로 Recognizing 구간만 내보내고 Ended 에서 멈춤
+    #   (파일은 영상 시각, 카메라는 실제 시각 기준)
+    cap = source if isinstance(source, cv2.VideoCapture) else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f'영상 열기 실패: {source}')
+    media_clock = isinstance(source, str) or cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0   # 파일이면 프레임 수가 있음
+
+    gate = state_machine = None
+    frame_idx = 0
+    try:
+        with make_holistic(profile) as holistic:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    return
+
+                if time_threshold is not None:
+                    if gate is None:
+                        gate = MotionGate()
+                        gate.reset(frame)
+                        state_machine = MotionStateMachine(time_threshold)
+                        continue
+                    now = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000 if media_clock else time.time()
+                    motion_state = state_machine.update(gate.update(frame), now)
+                    if motion_state == "Recognition Ended":
+                        return
+                    if motion_state != "Recognizing":
+                        continue
+
+                results = holistic.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                yield results_to_frame_dict(results, frame_idx)
+                frame_idx += 1
+    finally:
+        cap.release()
+
+
+def extract_keypoints(source, profile=LANDMARK_PROFILE, time_threshold=None, on_frame=None):
+    # iter_keypoints 결과를 리스트로 (워커 / CI 용)
+    all_frames = []
+    for result_dict in iter_keypoints(source, profile, time_threshold):
+        all_frames.append(result_dict)
+        if on_frame is not None:
+            on_frame(result_dict)
+    return all_frames
+
+
+def video_to_keypoints(cap, time_threshold=3, on_frame=None, profile=LANDMARK_PROFILE, headless=False):
+    # on_frame: 프레임 dict 가 만들어질 때마다 호출 (예: StreamingNormalizer.push_frame)
+    # profile: 랜드마크 추출 프로파일, accurate 가 아니면 flow / 랜드마크 그리기 없음 (상태 글자만)
+    # headless=True 면 화면 없이 extract_keypoints 로 (읽기 실패 = 스트림 끝, 종료하지 않음)
+    if headless:
+        return extract_keypoints(cap, profile, time_threshold, on_frame)
+    draw = profile_options(profile)['draw']
     ret, prev_frame=cap.read()		# 첫 프레임
-    prev_gray=cv2.cvtColor(prev_frame,cv2.COLOR_BGR2GRAY)
 
-    #state 준비
-    moved=0
-    motion_state = "Waiting"  
-    stop_start_time_waiting = None
-    stop_start_time_recognizing = None
+    # 움직임 게이트 (축소 프레임 optical flow) + 상태 머신, codes/motion_gate.py
+    gate = MotionGate()
+    gate.reset(prev_frame)
+    state_machine = MotionStateMachine(time_threshold)
+    motion_state = state_machine.state
 
     #list 준비
     prev_time=0
@@ -60,60 +150,23 @@ def video_to_keypoints(cap, time_threshold=3):
     frame_idx = 0
 
 
-    with mp_holistic.Holistic(
-        static_image_mode=True, min_detection_confidence=0.5, model_complexity=2) as holistic:
+    # 단계별 스레드로 나눈 버전은 codes/keypoint_pipeline.py
+    with make_holistic(profile) as holistic:
 
         while(1):
             ret,frame=cap.read()	# 비디오를 구성하는 프레임 획득
             if not ret:
                 sys.exit('프레임 획득에 실패하여 루프를 나갑니다.')
 
-            curr_gray=cv2.cvtColor(frame,cv2.COLOR_BGR2GRAY)
-            flow=cv2.calcOpticalFlowFarneback(prev_gray,curr_gray,None,0.5,3,15,3,5,1.2,0)    # optical flow 계산
-
-            moved=0
-            for y in range(16//2,frame.shape[0],16):
-                for x in range(16//2,frame.shape[1],16):
-                    dx,dy = flow[y,x].astype(int)
-                    if (dx*dx+dy*dy) > 200 :
-                        cv2.line(frame,(x,y),(x+dx,y+dy),(0,0,255),2) # 큰 모션 있는 곳은 빨간색
-                        moved+=1
-                    else :
-                        # cv2.line(frame,(x,y),(x+dx,y+dy),(0,255,0),2)
-                        pass
+            moved = gate.update(frame)
+            if draw:
+                gate.draw(frame)   # 큰 모션 있는 곳은 빨간색
 
             curr_time = time.time()
-
-            if moved < 5:
-                # 정지 상태
-                if motion_state == "Waiting":
-                    if stop_start_time_waiting is None:
-                        stop_start_time_waiting = curr_time
-                    stop_duration = curr_time - stop_start_time_waiting
-                    if stop_duration >= time_threshold:
-                        motion_state = "Recognizing"
-                        stop_start_time_waiting = None
-                        stop_start_time_recognizing = None
-                elif motion_state == "Recognizing":
-                    if stop_start_time_recognizing is None:
-                        stop_start_time_recognizing = curr_time
-                    stop_duration = curr_time - stop_start_time_recognizing
-                    if stop_duration >= time_threshold:
-                        motion_state = "Recognition Ended"
-                        stop_start_time_recognizing = None
-            else:
-                # 움직임 있음
-                stop_start_time_waiting = None
-                stop_start_time_recognizing = None
+            motion_state = state_machine.update(moved, curr_time)
 
             # 매 프레임 현재 상태 출력
-            color_map = {
-                "Waiting": (255, 255, 255),
-                "Recognizing": (0, 255, 0),
-                "Recognition Ended": (0, 0, 255)
-            }
-            cv2.putText(frame, motion_state, (20, 50), cv2.FONT_HERSHEY_SIMPLEX,
-                        1, color_map[motion_state], 2)
+            draw_state(frame, motion_state)
             
 
 
@@ -124,46 +177,27 @@ def video_to_keypoints(cap, time_threshold=3):
                 # 예측 수행 (cvtColor는 전처리)
                 results = holistic.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
 
-                # 프레임에 그리기
-                # frame = frame.copy()
-                mp_drawing.draw_landmarks(frame, results.left_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-                mp_drawing.draw_landmarks(frame, results.right_hand_landmarks, mp_holistic.HAND_CONNECTIONS)
-                mp_drawing.draw_landmarks(
-                    frame,
-                    results.face_landmarks,
-                    mp_holistic.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=mp_drawing_styles
-                    .get_default_face_mesh_tesselation_style())
-                mp_drawing.draw_landmarks(
-                    frame,
-                    results.pose_landmarks,
-                    mp_holistic.POSE_CONNECTIONS,
-                    landmark_drawing_spec=mp_drawing_styles.
-                    get_default_pose_landmarks_style())
-
-                # FPS 계산해서 프레임에 출력 
-                sec = curr_time - prev_time
-                prev_time = curr_time
-                fps = 1/(sec)
-                fps_str = "FPS : %0.1f" % fps
-                cv2.putText(frame, fps_str, (0, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0))
+                if draw:
+                    # 프레임에 그리기
+                    draw_results(frame, results)
+
+                    # FPS 계산해서 프레임에 출력 
+                    sec = curr_time - prev_time
+                    prev_time = curr_time
+                    fps = 1/(sec)
+                    fps_str = "FPS : %0.1f" % fps
+                    cv2.putText(frame, fps_str, (0, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0))
 
                 # 결과 저장, 표시
-                result_dict = {
-                    'frame': frame_idx,
-                    'pose_landmarks': landmarks_to_dict(results.pose_landmarks, list(range(11, 23))),
-                    'left_hand_landmarks': landmarks_to_dict(results.left_hand_landmarks),
-                    'right_hand_landmarks': landmarks_to_dict(results.right_hand_landmarks)
-                }
+                result_dict = results_to_frame_dict(results, frame_idx)
                 all_frames.append(result_dict)
+                if on_frame is not None:
+                    on_frame(result_dict)
                 frame_idx += 1
 
 
             cv2.imshow('Optical flow',frame)
 
-            prev_gray=curr_gray   # 현재 프레임을 이전 프레임으로
-
             key=cv2.waitKey(30)	# 30밀리초 동안 키보드 입력 기다림
             if key==ord('q'):	
                 break
@@ -1,19 +1,26 @@
-import cv2
 import sys
 
-from codes.videoTest_mediapipe_cam_json import video_to_keypoints
-from codes.normalization_cam import normalization
+from codes.keypoint_pipeline import run_pipeline
+from codes.normalization_cam import StreamingNormalizer
 from codes.emedding_test_10emer_return_54node import classify
 
 
 checkpoint_path='datas/54node10emer_tryNor_gaussimirrorcamAugmen2.pth'
 
+# python main.py            -> 카메라
+# python main.py 영상.mp4    -> 영상 파일 (카메라 없는 환경에서 테스트)
+source=sys.argv[1] if len(sys.argv) > 1 else 0
 
-cap=cv2.VideoCapture(0)
-if not cap.isOpened():
+# 인식 중에 프레임마다 정규화 상태를 갱신해 두고, 끝나면 바로 60프레임 입력을 뽑음
+# 캡처 / 움직임 게이트 / Holistic / 화면 표시는 단계별 스레드 (codes/keypoint_pipeline.py)
+normalizer=StreamingNormalizer()
+try:
+    all_frames, stats=run_pipeline(source, 2, on_frame=normalizer.push_frame)
+except RuntimeError:
     sys.exit('카메라 연결 실패')
-    
-all_frames=video_to_keypoints(cap, 2)
-normalized_data=normalization(all_frames)
+for stage, s in stats.items():
+    print(f'{stage}: {s["frames"]} frames, 평균 {s["mean_ms"]:.1f} ms, 버림 {s["dropped"]}')
+
+normalized_data=normalizer.close()
 result=classify(checkpoint_path,normalized_data)
-print(f'결과: {result}')
\ No newline at end of file
+print(f'결과: {result}')
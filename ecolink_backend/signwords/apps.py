@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class SignwordsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "signwords"
+
+    def ready(self):
+        # SignWord 가 바뀌면 검색 캐시에서 그 keyword 를 지움
+        from .models import SignWord
+        from .search_cache import invalidate_signword
+        post_save.connect(invalidate_signword, sender=SignWord, dispatch_uid='signword_search_cache_save')
+        post_delete.connect(invalidate_signword, sender=SignWord, dispatch_uid='signword_search_cache_delete')
@@ -0,0 +1,123 @@
+import hashlib
+import json
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from . import kcisa
+from .models import SignCatalogEntry
+
+
+# 로컬 KCISA 사전 사본 (SignCatalogEntry) 동기화 / 검색
+# 검색: 3글자 이상은 FTS5 trigram 인덱스(sign_catalog_fts, 마이그레이션 0004), 그보다 짧으면 title LIKE
+#   (trigram 은 3글자 단위라 2글자 단어는 인덱스로 못 찾음, 사전이 수천 건이라 LIKE 도 충분히 빠름)
+# 정렬: 제목 일치 -> 접두 일치 -> 짧은 제목 순
+
+SEARCH_LIMIT = 50
+FTS_TABLE = 'sign_catalog_fts'
+SYNC_FIELDS = ('title', 'subDescription', 'signDescription')
+
+_fts_available = None
+
+
+def fts_available():
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+    return _fts_available
+
+
+def fts_phrase(query):
+    # 따옴표로 묶어서 한 덩어리 부분 문자열로 (FTS 문법 문자 무시)
+    return '"' + query.replace('"', '""') + '"'
+
+
+def search_catalog(query, limit=SEARCH_LIMIT):
+    # -> [{'title', 'subDescription', 'signDescription'}]
+    query = query.strip()
+    if not query:
+        return []
+    entries = SignCatalogEntry.objects.all()
+    if len(query) >= 3 and fts_available():
+        entries = entries.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (fts_phrase(query),)))
+    else:
+        entries = entries.filter(title__contains=query)
+    entries = entries.annotate(
+        exact=ExpressionWrapper(Q(title=query), output_field=BooleanField()),
+        prefix=ExpressionWrapper(Q(title__startswith=query), output_field=BooleanField()),
+    ).order_by('-exact', '-prefix', Length('title'), 'title')
+    return list(entries.values(*SYNC_FIELDS)[:limit])
+
+
+def catalog_ready():
+    # 한 번이라도 동기화됐으면 True -> 그 뒤로 Open API 는 fallback 으로만
+    return SignCatalogEntry.objects.exists()
+
+
+def entry_key(item):
+    return (item.get('url') or item.get('title') or '')[:255]
+
+
+def entry_fields(item):
+    return {
+        'title': (item.get('title') or '제목없음')[:200],
+        'subDescription': item.get('subDescription') or None,
+        'signDescription': item.get('signDescription') or None,
+    }
+
+
+def content_hash(fields):
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def sync_catalog(service_key, page_size=kcisa.KCISA_PAGE_SIZE, prune=False, log=print):
+    # 사전 전체를 페이지 단위로 받아서 새 항목은 bulk_create, 내용 해시가 바뀐 항목만 bulk_update
+    # prune: 끝까지 받은 뒤 이번에 안 보인 항목 삭제
+    #   중간에 실패하면(예외) 지우지 않고, 받은 항목 수가 totalCount 보다 적어도 지우지 않음 (일부만 받은 걸로 전체를 지우지 않게)
+    # 반환: {'pages', 'fetched', 'created', 'updated', 'unchanged', 'deleted'}
+    existing = {key: (pk, digest) for key, pk, digest in
+                SignCatalogEntry.objects.values_list('entry_key', 'id', 'content_hash')}
+    seen = set()
+    stats = {'pages': 0, 'fetched': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    total = 0
+
+    for page, items, total in kcisa.iter_catalog(service_key, page_size):
+        created, updated = [], []
+        now = timezone.now()   # bulk_update 는 auto_now 를 안 채움
+        for item in items:
+            key = entry_key(item)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            fields = entry_fields(item)
+            digest = content_hash(fields)
+            if key not in existing:
+                created.append(SignCatalogEntry(entry_key=key, content_hash=digest, **fields))
+            elif existing[key][1] != digest:
+                updated.append(SignCatalogEntry(id=existing[key][0], entry_key=key, content_hash=digest,
+                                                synced_at=now, **fields))
+            else:
+                stats['unchanged'] += 1
+
+        # 페이지마다 커밋 -> 중간에 끊겨도 받은 페이지까지는 반영
+        with transaction.atomic():
+            SignCatalogEntry.objects.bulk_create(created)
+            SignCatalogEntry.objects.bulk_update(updated, SYNC_FIELDS + ('content_hash', 'synced_at'))
+        stats['pages'] += 1
+        stats['fetched'] += len(items)
+        stats['created'] += len(created)
+        stats['updated'] += len(updated)
+        log(f'{page} 페이지: {stats["fetched"]}/{total} (새로 {len(created)}, 바뀜 {len(updated)})')
+
+    if prune and (stats['fetched'] == 0 or stats['fetched'] < total):
+        log(f'받은 항목 {stats["fetched"]}/{total}건, 삭제하지 않음')
+    elif prune:
+        stale = [pk for key, (pk, _) in existing.items() if key not in seen]
+        for i in range(0, len(stale), 500):
+            SignCatalogEntry.objects.filter(id__in=stale[i:i + 500]).delete()
+        stats['deleted'] = len(stale)
+    return stats
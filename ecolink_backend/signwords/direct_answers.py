@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+import threading
+import time
+
+
+# ChatAIProxy 고정 답변 표 매칭 (Aho-Corasick)
+# 모든 항목의 patterns 를 한 번에 오토마톤으로 만들어 두고, 메시지를 한 번만 훑어서 걸린 항목 중
+# 표에서 가장 앞 항목의 answer 를 돌려줌 -> 예전 이중 루프(항목 순서대로 pattern in message)와 같은 결과
+# 표 파일: ECOLINK_DIRECT_ANSWERS_FILE ([{'patterns': [...], 'answer': ...}] JSON)
+#   RELOAD_CHECK 초마다 수정 시각을 보고 바뀌었으면 다시 만듦 (재시작 없이), 잘못된 파일이면 이전 표 유지
+#   파일이 없으면 ChatAIProxy.DIRECT_ANSWERS
+
+logger = logging.getLogger(__name__)
+
+DIRECT_ANSWERS_FILE = os.getenv('ECOLINK_DIRECT_ANSWERS_FILE')
+RELOAD_CHECK = float(os.getenv('ECOLINK_DIRECT_ANSWERS_RELOAD', 2))
+
+
+class PatternMatcher:
+    # patterns: [(pattern, 항목 번호)] -> first_match(text) = 걸린 항목 번호 중 가장 작은 것 (없으면 None)
+    def __init__(self, patterns):
+        self.goto = [{}]     # 상태 -> {글자: 다음 상태}
+        self.fail = [0]
+        self.best = [None]   # 상태(와 fail 로 이어지는 접미사)에서 끝나는 pattern 의 가장 앞 항목 번호
+        self.always = None   # 빈 pattern ('' in message 는 항상 True)
+
+        for pattern, index in patterns:
+            if not pattern:
+                self.always = index if self.always is None else min(self.always, index)
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                state = next_state
+            self.best[state] = index if self.best[state] is None else min(self.best[state], index)
+
+        # BFS 로 fail 링크, best 는 fail 쪽 값과 합침 (더 얕은 상태가 먼저 끝나 있음)
+        # 루트 바로 아래 상태의 fail 은 루트(0) 그대로
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                inherited = self.best[self.fail[next_state]]
+                if inherited is not None and (self.best[next_state] is None or inherited < self.best[next_state]):
+                    self.best[next_state] = inherited
+                queue.append(next_state)
+
+    def first_match(self, text):
+        goto, fail, best = self.goto, self.fail, self.best
+        found = self.always
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            index = best[state]
+            if index is not None and (found is None or index < found):
+                found = index
+                if found == 0:
+                    break
+        return found
+
+
+class DirectAnswers:
+    def __init__(self, default_entries, path=DIRECT_ANSWERS_FILE, reload_check=RELOAD_CHECK):
+        self.default_entries = default_entries
+        self.path = path
+        self.reload_check = reload_check
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._table = self._build(default_entries)   # (entries, matcher) 를 한 번에 바꿈
+        if path:
+            self._checked_at = time.monotonic()
+            self._reload()
+
+    @staticmethod
+    def _build(entries):
+        for entry in entries:
+            if "answer" not in entry:
+                raise KeyError(f'answer 없는 항목: {entry.get("patterns")}')
+        patterns = [(pattern, index) for index, entry in enumerate(entries) for pattern in entry["patterns"]]
+        return entries, PatternMatcher(patterns)
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            if self._mtime is not None:
+                logger.warning(f"고정 답변 파일 없음: {self.path}, 기본 표로")
+                self._mtime = None
+                self._table = self._build(self.default_entries)
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            table = self._build(entries)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"고정 답변 파일 읽기 실패 ({self.path}): {str(e)}, 이전 표 유지")
+            self._mtime = mtime   # 같은 파일로 계속 다시 시도하지 않음
+            return
+        self._table = table
+        self._mtime = mtime
+        logger.info(f"고정 답변 표 다시 읽음: {len(entries)}개 항목")
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < self.reload_check:
+            return
+        with self._lock:
+            if now - self._checked_at < self.reload_check:
+                return
+            self._checked_at = now
+            self._reload()
+
+    def find(self, message):
+        self._maybe_reload()
+        entries, matcher = self._table
+        index = matcher.first_match(message)
+        return None if index is None else entries[index]["answer"]
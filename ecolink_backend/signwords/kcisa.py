@@ -0,0 +1,81 @@
+import os
+
+from .upstreams import get_upstream
+
+
+# KCISA 수어 사전 Open API (getCTE01701) 클라이언트
+# 테스트/개발은 KCISA_API_URL 을 로컬 가짜 서버로 (python manage.py fake_kcisa_server)
+# 응답: {'response': {'header': {'resultCode', 'resultMsg'}, 'body': {'items': {'item': [...]} 또는 '', 'totalCount': ...}}}
+#   HTTP 200 이어도 header.resultCode 가 OK 가 아니면 오류 (키 오류, 트래픽 초과 등) -> KCISAError
+
+KCISA_API_URL = os.getenv('KCISA_API_URL', 'http://api.kcisa.kr/openapi/service/rest/meta13/getCTE01701')
+KCISA_TIMEOUT = float(os.getenv('KCISA_TIMEOUT', 30))
+KCISA_PAGE_SIZE = int(os.getenv('KCISA_PAGE_SIZE', 500))
+
+# 연결 풀 / 재시도 / 서킷 브레이커 (signwords/upstreams.py, ECOLINK_KCISA_*), KCISA_TIMEOUT 은 읽기 timeout
+upstream = get_upstream('kcisa', read_timeout=KCISA_TIMEOUT)
+
+RESULT_OK = ('00', '0000')
+
+
+class KCISAError(ValueError):
+    # ValueError 라 검색 쪽 기존 except (응답 형식 오류, 502) 에서 그대로 잡힘
+    pass
+
+
+def check_result(data):
+    header = data.get("response", {}).get("header") or {}
+    code = str(header.get("resultCode", ''))
+    if code not in RESULT_OK:
+        raise KCISAError(f'KCISA 오류 응답: resultCode={code or "없음"} {header.get("resultMsg", "")}'.strip())
+    return data
+
+
+def parse_items(data):
+    # 결과가 없으면 items 가 빈 문자열, 하나면 dict 로 옴 -> 항상 리스트
+    items = data.get("response", {}).get("body", {}).get("items") or {}
+    items = items.get("item", []) if isinstance(items, dict) else []
+    if isinstance(items, dict):
+        items = [items]
+    return items
+
+
+def total_count(data):
+    try:
+        return int(data.get("response", {}).get("body", {}).get("totalCount") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def fetch(service_key, page=1, rows=KCISA_PAGE_SIZE, keyword=None, timeout=None):
+    # 한 페이지 -> 응답 JSON (HTTP / JSON 오류는 requests 예외 / ValueError 그대로, 서킷이 열려 있으면 CircuitOpenError)
+    # resultCode 가 OK 가 아니면 KCISAError
+    # timeout: 비우면 업스트림 기본값 (연결, 읽기)
+    params = {
+        'serviceKey': service_key,
+        'numOfRows': rows,
+        'pageNo': page,
+        '_type': 'json',
+    }
+    if keyword is not None:
+        params['keyword'] = keyword
+    kwargs = {} if timeout is None else {'timeout': timeout}
+    response = upstream.get(KCISA_API_URL, params=params, headers={"accept": "application/json"}, **kwargs)
+    response.raise_for_status()
+    return check_result(response.json())
+
+
+def iter_catalog(service_key, page_size=KCISA_PAGE_SIZE, timeout=None):
+    # keyword 없이 사전 전체를 페이지 단위로 -> (페이지 번호, 항목 리스트, 전체 개수)
+    # totalCount 전에 빈 페이지가 오면 KCISAError (조용히 끝내면 일부만 받은 걸 다 받은 걸로 앎)
+    page = 1
+    while True:
+        data = fetch(service_key, page, page_size, timeout=timeout)
+        items = parse_items(data)
+        total = total_count(data)
+        if not items and (page - 1) * page_size < total:
+            raise KCISAError(f'{page} 페이지가 비어 있음 (전체 {total}건)')
+        yield page, items, total
+        if not items or page * page_size >= total:
+            return
+        page += 1
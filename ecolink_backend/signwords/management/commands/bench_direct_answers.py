@@ -0,0 +1,69 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from signwords.direct_answers import PatternMatcher
+from signwords.views import ChatAIProxy
+
+
+# 고정 답변 매칭: 예전 이중 루프 vs Aho-Corasick (signwords/direct_answers.py)
+#   python manage.py bench_direct_answers [--entries 1000 --patterns-per-entry 5 --messages 2000]
+# 실제 표(ChatAIProxy.DIRECT_ANSWERS) 뒤에 무작위 한글 pattern 항목을 붙여서, 결과가 같은지 먼저 확인
+
+SYLLABLES = '가나다라마바사아자차카타파하수어경찰병원응급전화도움학교사고'
+
+
+def legacy_find(entries, message):
+    # 예전 ChatAIProxy.find_direct_answer
+    for item in entries:
+        for pattern in item["patterns"]:
+            if pattern in message:
+                return item["answer"]
+    return None
+
+
+def random_word(rng, low, high):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(low, high)))
+
+
+class Command(BaseCommand):
+    help = 'ChatAIProxy 고정 답변 매칭 벤치마크 (이중 루프 vs Aho-Corasick)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entries', type=int, default=1000, help='붙일 무작위 항목 수')
+        parser.add_argument('--patterns-per-entry', type=int, default=5)
+        parser.add_argument('--messages', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        entries = list(ChatAIProxy.DIRECT_ANSWERS) + [
+            {'patterns': [random_word(rng, 3, 6) for _ in range(options['patterns_per_entry'])], 'answer': f'답변 {i}'}
+            for i in range(options['entries'])
+        ]
+        messages = [random_word(rng, 10, 60) for _ in range(options['messages'])]
+        messages += ['수어 자격증 시험은 어떻게 보나요?', '전화번호 알려줘', '안녕하세요', '응급 상황이에요']
+
+        start = time.perf_counter()
+        matcher = PatternMatcher([(p, i) for i, entry in enumerate(entries) for p in entry['patterns']])
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def find(message):
+            index = matcher.first_match(message)
+            return None if index is None else entries[index]['answer']
+
+        mismatches = sum(legacy_find(entries, m) != find(m) for m in messages)
+        hits = sum(find(m) is not None for m in messages)
+        n_patterns = sum(len(entry['patterns']) for entry in entries)
+        self.stdout.write(f'{len(entries)}개 항목 / {n_patterns}개 pattern, 메시지 {len(messages)}개 '
+                          f'(답변 있음 {hits}), 오토마톤 생성 {build_ms:.1f} ms, 결과 다름 {mismatches}')
+
+        for name, fn in (('legacy', lambda m: legacy_find(entries, m)), ('automaton', find)):
+            start = time.perf_counter()
+            for message in messages:
+                fn(message)
+            us = (time.perf_counter() - start) * 1e6 / len(messages)
+            self.stdout.write(f'{name:<10} {us:8.1f} us/메시지')
+        if mismatches:
+            self.stderr.write('결과 다름: 오토마톤이 이중 루프와 다른 답변을 골랐음')
@@ -0,0 +1,96 @@
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from signwords import kcisa
+from signwords.models import SignWord
+from signwords.search_cache import search_cache
+from signwords.views import SignWordProxy
+from .fake_kcisa_server import make_server
+
+
+# 캐시/DB 에 없는 keyword 검색 (KCISA 조회 + SignWord 저장) 한 번의 시간과 쿼리 수
+# 로컬 가짜 KCISA 서버를 스레드로 띄워서, keyword 하나가 --rows 개 항목을 돌려주게 함
+#   python manage.py bench_kcisa_cold_search [--rows 300] [--repeat 5]
+# legacy: 예전처럼 항목마다 get_or_create / bulk: SignWordProxy.save_items
+# 벤치 keyword 의 SignWord 행은 매번 지우고 끝나면 정리함
+
+BENCH_KEYWORD = '__bench__수어'
+
+
+def legacy_save_items(keyword, items):
+    # 예전 SignWordProxy: 항목마다 get_or_create (조회 + insert)
+    results = []
+    for item in items:
+        obj, created = SignWord.objects.get_or_create(
+            keyword=keyword,
+            title=item.get("title", "제목없음"),
+            defaults={
+                "subDescription": item.get("subDescription", ""),
+                "signDescription": item.get("signDescription", ""),
+            }
+        )
+        results.append({
+            "title": obj.title,
+            "subDescription": obj.subDescription,
+            "signDescription": obj.signDescription,
+        })
+    return results
+
+
+class Command(BaseCommand):
+    help = 'KCISA 콜드 검색(조회 + 저장) 벤치마크, 로컬 가짜 KCISA 서버 사용'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=300, help='keyword 하나가 돌려줄 항목 수')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        catalog = [
+            {'title': f'{BENCH_KEYWORD}{i}', 'url': f'bench-{i}',
+             'subDescription': f'http://example.com/{i}.mp4', 'signDescription': f'설명 {i}'}
+            for i in range(options['rows'])
+        ]
+        server = make_server(lambda: catalog, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        api_url = kcisa.KCISA_API_URL
+        kcisa.KCISA_API_URL = f'http://{host}:{port}/getCTE01701'
+
+        proxy = SignWordProxy()
+        try:
+            # 바뀐 저장 방식이 같은 결과를 내는지 먼저 확인
+            items = kcisa.parse_items(kcisa.fetch('bench', 1, 3616, keyword=BENCH_KEYWORD))
+            SignWord.objects.filter(keyword=BENCH_KEYWORD).delete()
+            expected = legacy_save_items(BENCH_KEYWORD, items)
+            SignWord.objects.filter(keyword=BENCH_KEYWORD).delete()
+            if proxy.save_items(BENCH_KEYWORD, items) != expected:
+                self.stderr.write('결과 다름: bulk 저장 결과가 get_or_create 와 다름')
+
+            modes = {
+                'legacy': lambda: legacy_save_items(
+                    BENCH_KEYWORD, kcisa.parse_items(kcisa.fetch('bench', 1, 3616, keyword=BENCH_KEYWORD))),
+                'bulk': lambda: proxy.fetch_kcisa(BENCH_KEYWORD, 'bench'),
+            }
+            self.stdout.write(f'keyword 하나 = {len(items)}개 항목, {options["repeat"]}번 반복 (DB: {connection.vendor})')
+            for name, run in modes.items():
+                times, queries = [], 0
+                for _ in range(options['repeat']):
+                    SignWord.objects.filter(keyword=BENCH_KEYWORD).delete()
+                    search_cache.invalidate(BENCH_KEYWORD)
+                    with CaptureQueriesContext(connection) as captured:
+                        start = time.perf_counter()
+                        run()
+                        times.append((time.perf_counter() - start) * 1000)
+                    queries = len(captured.captured_queries)
+                self.stdout.write(f'{name:<7} {statistics.median(times):8.1f} ms (중앙값)   쿼리 {queries}개')
+        finally:
+            SignWord.objects.filter(keyword=BENCH_KEYWORD).delete()
+            search_cache.invalidate(BENCH_KEYWORD)
+            kcisa.KCISA_API_URL = api_url
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ai_models.codes.landmark_profiles import LANDMARK_PROFILE, PROFILES
+from signwords.models import SignLanguageSession, SignLanguageKeypoint
+
+
+# 수어 영상 폴더 -> SignLanguageSession / SignLanguageKeypoint
+#   python manage.py extract_sign_keypoints <영상 폴더> [--workers 4] [--profile tracking]
+# 영상 하나가 세션 하나, 라벨(sign_word)은 폴더 아래 첫 번째 폴더 이름 (<단어>/<영상>.mp4)
+#
+# 키포인트 추출은 워커 프로세스 풀에서 (워커마다 mediapipe 를 따로 올림, 영상마다 새 Holistic -> 추적 상태가 안 섞임)
+# DB 쓰기는 메인 프로세스 하나에서만: 워커가 chunk 단위로 프레임을 큐에 넘기면
+# bulk_create + processed_frames 갱신을 한 트랜잭션으로 -> processed_frames 까지는 항상 저장돼 있음
+# 다시 돌리면 completed 세션은 건너뛰고, 끊긴 세션은 processed_frames 프레임부터 이어서 (--force 면 처음부터)
+# 추출 결과는 영상 내용 + 설정 해시로 캐시 (ai_models/codes/keypoint_cache.py) -> 같은 영상을 다시 넣으면 MediaPipe 를 안 돌림
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+CHUNK_SIZE = int(os.getenv('ECOLINK_KEYPOINT_CHUNK', 500))
+
+_queue = None   # 워커 -> 메인 메시지 큐 (워커 프로세스 안에서만 씀)
+_abort = None   # 메인이 중단하면 set -> 큐가 차서 기다리던 워커도 빠져나옴
+
+
+def list_videos(video_dir):
+    # [(상대경로, 라벨)], 라벨은 첫 번째 폴더 이름 (없으면 None)
+    videos = []
+    for root, _, files in os.walk(video_dir):
+        for file in files:
+            if file.lower().endswith(VIDEO_EXTENSIONS):
+                rel_path = os.path.relpath(os.path.join(root, file), video_dir).replace('\\', '/')
+                videos.append((rel_path, rel_path.split('/')[0] if '/' in rel_path else None))
+    return sorted(videos)
+
+
+def video_session_id(rel_path):
+    # 경로가 길어도 vector_id(세션 ID:프레임) 가 255자를 넘지 않게 해시로
+    return 'video-' + hashlib.sha1(rel_path.encode('utf-8')).hexdigest()[:20]
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _init_worker(message_queue, abort):
+    global _queue, _abort
+    _queue = message_queue
+    _abort = abort
+
+
+def _put(message):
+    # 큐가 차 있으면 기다리되, 메인이 중단했으면 그만둠 (put 에서 영원히 막히지 않게)
+    while True:
+        try:
+            _queue.put(message, timeout=1)
+            return
+        except queue.Full:
+            if _abort.is_set():
+                raise _Aborted()
+
+
+def _extract_video(session_id, path, skip, profile, chunk_size, use_cache=True):
+    # 워커: 영상 하나를 처음부터 끝까지 (움직임 게이트 없이 모든 프레임)
+    # 메시지: ('start', 세션, 총 프레임, 길이(초)) -> ('frames', 세션, [프레임 dict]) ...
+    #         -> ('done', 세션, 캐시 적중 여부) / ('failed', 세션, 에러)
+    # 같은 워커의 메시지는 큐에서 순서가 유지되므로 done 은 항상 마지막 frames 뒤에 옴
+    if _abort.is_set():
+        return
+    try:
+        import cv2
+        from ai_models.codes.keypoint_cache import KeypointCache, cache_key, video_sha1
+        from ai_models.codes.videoTest_mediapipe_cam_json import iter_keypoints
+
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise RuntimeError(f'영상 열기 실패: {path}')
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        _put(('start', session_id, total, total / fps if fps else 0.0))
+
+        cache = KeypointCache() if use_cache else None
+        key = cache_key(video_sha1(path), profile) if use_cache else None
+        cached = cache.get(key) if use_cache else None
+        if cached is not None:
+            cap.release()
+            frames = cached[skip:]   # 캐시의 frame 번호는 영상 처음부터
+        else:
+            # 이어 하기: 이미 저장된 프레임은 디코딩만 (grab 은 Holistic 보다 훨씬 쌈)
+            for _ in range(skip):
+                if not cap.grab():
+                    break
+            frames = iter_keypoints(cap, profile)
+        # 처음부터 끝까지 새로 뽑은 영상만 캐시에 넣음
+        collected = [] if use_cache and cached is None and skip == 0 else None
+
+        chunk = []
+        for frame in frames:
+            if cached is None:
+                frame['frame'] += skip
+            if collected is not None:
+                collected.append(frame)
+            chunk.append(frame)
+            if len(chunk) >= chunk_size:
+                _put(('frames', session_id, chunk))
+                chunk = []
+        if chunk:
+            _put(('frames', session_id, chunk))
+        if collected is not None:
+            cache.put(key, collected)
+        _put(('done', session_id, cached is not None))
+    except _Aborted:
+        return
+    except Exception as e:
+        try:
+            _put(('failed', session_id, f'{type(e).__name__}: {e}'))
+        except _Aborted:
+            return
+
+
+class Command(BaseCommand):
+    help = '수어 영상 폴더에서 키포인트를 뽑아 SignLanguageSession / SignLanguageKeypoint 에 저장 (중단되면 이어서)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('video_dir', help='<단어>/<영상> 구조의 영상 폴더')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='추출 워커 프로세스 수 (기본: CPU 수)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='bulk_create 한 번에 넣을 프레임 수')
+        parser.add_argument('--profile', choices=sorted(PROFILES), default=LANDMARK_PROFILE, help='랜드마크 추출 프로파일')
+        parser.add_argument('--user-id', default=None, help='세션/키포인트에 기록할 사용자 ID')
+        parser.add_argument('--force', action='store_true', help='완료된 세션도 지우고 처음부터')
+        parser.add_argument('--no-cache', action='store_true', help='키포인트 캐시를 읽지도 쓰지도 않음')
+
+    def handle(self, *args, **options):
+        video_dir = options['video_dir']
+        if not os.path.isdir(video_dir):
+            raise CommandError(f'영상 폴더 없음: {video_dir}')
+        self.profile = options['profile']
+        self.user_id = options['user_id']
+        self.use_cache = not options['no_cache']
+        self.labels = {}
+
+        tasks = self._prepare(video_dir, list_videos(video_dir), options['force'])
+        if not tasks:
+            self.stdout.write('새로 처리할 영상 없음')
+            return
+
+        start = time.perf_counter()
+        frames, failed = self._run(tasks, options['workers'], options['chunk_size'])
+        seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(tasks)}개 영상: 완료 {len(tasks) - failed}, 실패 {failed}, '
+            f'{frames} 프레임 저장 ({seconds:.1f}s, {frames / seconds if seconds else 0:.1f} frames/s)'))
+
+    def _prepare(self, video_dir, videos, force):
+        # 세션 행을 만들거나 찾아서 [(세션, 영상 경로)], 건너뛸 프레임 수는 세션의 processed_frames
+        tasks = []
+        for rel_path, label in videos:
+            session, created = SignLanguageSession.objects.get_or_create(
+                session_id=video_session_id(rel_path),
+                defaults={'session_name': rel_path[:200], 'description': rel_path, 'user_id': self.user_id},
+            )
+            if force and not created:
+                SignLanguageKeypoint.objects.filter(session_id=session.session_id).delete()
+                session.processed_frames = 0
+                session.keypoints_detected_frames = 0
+                session.processing_status = 'pending'
+                session.save(update_fields=['processed_frames', 'keypoints_detected_frames', 'processing_status'])
+            elif session.processing_status == 'completed':
+                continue
+            self.labels[session.session_id] = label   # 세션 테이블엔 단어 칸이 없어서 키포인트 행에만 씀
+            tasks.append((session, os.path.join(video_dir, rel_path)))
+
+        resumed = sum(1 for session, _ in tasks if session.processed_frames)
+        self.stdout.write(f'영상 {len(videos)}개 중 {len(tasks)}개 처리 (이어서 {resumed}개)')
+        return tasks
+
+    def _run(self, tasks, workers, chunk_size):
+        sessions = {session.session_id: session for session, _ in tasks}
+        message_queue = multiprocessing.Queue(maxsize=max(1, workers) * 4)   # DB 가 밀리면 워커가 기다림
+        abort = multiprocessing.Event()
+        frames = failed = 0
+        remaining = len(tasks)
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(message_queue, abort)) as pool:
+            futures = [
+                pool.submit(_extract_video, session.session_id, path, session.processed_frames,
+                            self.profile, chunk_size, self.use_cache)
+                for session, path in tasks
+            ]
+            try:
+                while remaining:
+                    try:
+                        message = message_queue.get(timeout=1)
+                    except queue.Empty:
+                        # 워커가 죽으면 (BrokenProcessPool) 메시지가 더 안 옴
+                        for future in futures:
+                            if future.done() and future.exception() is not None:
+                                raise CommandError(f'추출 워커 중단: {future.exception()} (다시 실행하면 이어서)')
+                        continue
+
+                    kind, session = message[0], sessions[message[1]]
+                    if kind == 'start':
+                        self._start(session, *message[2:])
+                    elif kind == 'frames':
+                        frames += self._write_frames(session, message[2])
+                    else:
+                        remaining -= 1
+                        if kind == 'done':
+                            self._finish(session, 'completed')
+                            self.stdout.write(f'완료 {session.session_name}: {session.processed_frames} 프레임 '
+                                              f'(키포인트 {session.keypoints_detected_frames})'
+                                              + (' [캐시]' if message[2] else ''))
+                        else:
+                            failed += 1
+                            self._finish(session, 'failed')
+                            self.stderr.write(f'실패 {session.session_name}: {message[2]}')
+            except BaseException:
+                # DB 오류 / Ctrl+C 등으로 메인이 멈추면 풀 종료(shutdown wait)가 꽉 찬 큐에서 막히지 않게
+                # 남은 작업은 취소, 도는 워커는 abort 로 멈추고, 끝날 때까지 큐를 비움
+                abort.set()
+                for future in futures:
+                    future.cancel()
+                self._drain(message_queue, futures)
+                raise
+        return frames, failed
+
+    def _drain(self, message_queue, futures):
+        # 워커가 다 끝나고 큐(파이프)에 남은 메시지도 없을 때까지 버림
+        while True:
+            try:
+                message_queue.get(timeout=0.5)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    return
+
+    def _start(self, session, total_frames, duration_seconds):
+        session.total_frames = total_frames
+        session.duration_seconds = duration_seconds
+        session.processing_status = 'processing'
+        session.is_active = True
+        session.save(update_fields=['total_frames', 'duration_seconds', 'processing_status', 'is_active'])
+
+    def _write_frames(self, session, chunk):
+        rows = []
+        detected = 0
+        for frame in chunk:
+            pose = frame['pose_landmarks'] is not None
+            left = frame['left_hand_landmarks'] is not None
+            right = frame['right_hand_landmarks'] is not None
+            detected += pose or left or right
+            rows.append(SignLanguageKeypoint(
+                session_id=session.session_id,
+                frame_number=frame['frame'],
+                vector_id=f'{session.session_id}:{frame["frame"]}',
+                keypoints_json=json.dumps(frame),
+                metadata_json=json.dumps({'profile': self.profile}),
+                user_id=self.user_id,
+                sign_word=self.labels[session.session_id],
+                pose_detected=pose,
+                left_hand_detected=left,
+                right_hand_detected=right,
+            ))
+
+        # 키포인트와 진행 상황을 같이 커밋 -> 중간에 끊겨도 processed_frames 가 저장된 프레임 수와 맞음
+        # (ignore_conflicts: 같은 vector_id 가 이미 있으면 건너뜀)
+        session.processed_frames = chunk[-1]['frame'] + 1
+        session.keypoints_detected_frames += detected
+        with transaction.atomic():
+            SignLanguageKeypoint.objects.bulk_create(rows, ignore_conflicts=True)
+            session.save(update_fields=['processed_frames', 'keypoints_detected_frames'])
+        return len(rows)
+
+    def _finish(self, session, status):
+        session.processing_status = status
+        session.is_active = False
+        session.ended_at = timezone.now()
+        session.total_frames = max(session.total_frames, session.processed_frames)
+        session.save(update_fields=['processing_status', 'is_active', 'ended_at', 'total_frames'])
@@ -0,0 +1,101 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+
+
+# 로컬 테스트용 KCISA getCTE01701 흉내 서버 (keyword 부분 일치, numOfRows / pageNo 페이지)
+#   python manage.py fake_kcisa_server [--port 8765] [--entries 3616] [--catalog 항목.json]
+#   KCISA_API_URL=http://127.0.0.1:8765/getCTE01701 python manage.py sync_kcisa_catalog
+# --catalog: [{'title', 'url', 'subDescription', 'signDescription'}] JSON 파일, 요청마다 다시 읽음 (바꿔 가며 증분 동기화 테스트)
+
+WORDS = ['사과', '사과나무', '경찰', '교통사고', '깔리다', '병원', '불나다', '숨을안쉬다', '쓰러지다',
+         '연락해주세요', '학교', '학교생활', '수어', '수어통역', '감사합니다', '안녕하세요']
+
+
+def make_catalog(count):
+    catalog = []
+    for i in range(count):
+        word = WORDS[i % len(WORDS)]
+        title = word if i < len(WORDS) else f'{word}{i // len(WORDS)}'
+        catalog.append({
+            'title': title,
+            'url': f'http://sldict.korean.go.kr/front/sign/signContentsView.do?origin_no={i}',
+            'subDescription': f'http://sldict.korean.go.kr/multimedia/multimedia_files/convert/{i}.mp4',
+            'signDescription': f'{title} 수어 설명',
+        })
+    return catalog
+
+
+def make_response(items, total, rows, page):
+    return {'response': {
+        'header': {'resultCode': '0000', 'resultMsg': 'OK'},
+        'body': {
+            # 실제 API 처럼 결과가 없으면 빈 문자열, 하나면 dict
+            'items': {'item': items[0] if len(items) == 1 else items} if items else '',
+            'numOfRows': str(rows), 'pageNo': str(page), 'totalCount': str(total),
+        },
+    }}
+
+
+def make_server(load_catalog, host='127.0.0.1', port=8765):
+    # load_catalog() -> 항목 리스트 (요청마다 부름), port=0 이면 빈 포트 (server.server_address 로 확인)
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'   # keep-alive (연결 재사용 확인용)
+        disable_nagle_algorithm = True   # 헤더와 본문을 따로 써서 keep-alive 에서 지연 ACK 에 걸리지 않게
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            if not query.get('serviceKey'):
+                self.send_error(401)
+                return
+            rows = int(query.get('numOfRows', ['10'])[0])
+            page = int(query.get('pageNo', ['1'])[0])
+            catalog = load_catalog()
+            keyword = query.get('keyword', [None])[0]
+            if keyword:
+                catalog = [item for item in catalog if keyword in item['title']]
+            items = catalog[(page - 1) * rows:page * rows]
+
+            body = json.dumps(make_response(items, len(catalog), rows, page), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+class Command(BaseCommand):
+    help = '로컬 테스트용 가짜 KCISA 수어 사전 API 서버'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--entries', type=int, default=3616, help='--catalog 가 없을 때 만들 항목 수')
+        parser.add_argument('--catalog', default=None)
+
+    def handle(self, *args, **options):
+        generated = make_catalog(options['entries'])
+        catalog_path = options['catalog']
+
+        def load_catalog():
+            if catalog_path is None:
+                return generated
+            with open(catalog_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        server = make_server(load_catalog, options['host'], options['port'])
+        self.stdout.write(f'가짜 KCISA 서버: http://{options["host"]}:{options["port"]}/getCTE01701 '
+                          f'({"파일 " + catalog_path if catalog_path else str(len(generated)) + "건"})')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from signwords import kcisa
+from signwords.catalog import sync_catalog
+
+
+# KCISA 수어 사전 전체를 로컬 SignCatalogEntry 로 (검색은 로컬 인덱스, Open API 는 fallback)
+#   python manage.py sync_kcisa_catalog [--page-size 500] [--prune]
+# 다시 돌리면 내용이 바뀐 항목만 갱신, 로컬 테스트는 KCISA_API_URL=http://127.0.0.1:8765/getCTE01701 (fake_kcisa_server)
+
+
+class Command(BaseCommand):
+    help = 'KCISA 수어 사전 전체를 로컬 검색 인덱스로 동기화 (바뀐 항목만 갱신)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=kcisa.KCISA_PAGE_SIZE, help='한 번에 받을 항목 수 (numOfRows)')
+        parser.add_argument('--prune', action='store_true', help='사전에서 사라진 항목 삭제')
+
+    def handle(self, *args, **options):
+        service_key = os.getenv('KCISA_SERVICE_KEY')
+        if not service_key:
+            raise CommandError('KCISA_SERVICE_KEY 환경변수가 설정되지 않음')
+
+        start = time.perf_counter()
+        try:
+            stats = sync_catalog(service_key, options['page_size'], options['prune'], log=self.stdout.write)
+        except Exception as e:
+            raise CommandError(f'동기화 실패 ({type(e).__name__}: {e}), 받은 페이지까지는 저장됨')
+        self.stdout.write(self.style.SUCCESS(
+            f'{stats["pages"]} 페이지 {stats["fetched"]}건: 새로 {stats["created"]}, 바뀜 {stats["updated"]}, '
+            f'그대로 {stats["unchanged"]}, 삭제 {stats["deleted"]} ({time.perf_counter() - start:.1f}s)'))
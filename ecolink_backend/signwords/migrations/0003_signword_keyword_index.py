@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signwords", "0002_signlanguagesession_signlanguagekeypoint"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="signword",
+            name="keyword",
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+# title 의 FTS5 trigram 인덱스 (부분/접두 검색), SQLite 에서만
+# external content 테이블이라 본문은 sign_catalog_entries 에만 있고 트리거로 인덱스만 맞춤
+FTS_SQL = [
+    "CREATE VIRTUAL TABLE sign_catalog_fts USING fts5("
+    "title, content='sign_catalog_entries', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER sign_catalog_fts_ai AFTER INSERT ON sign_catalog_entries BEGIN "
+    "INSERT INTO sign_catalog_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER sign_catalog_fts_ad AFTER DELETE ON sign_catalog_entries BEGIN "
+    "INSERT INTO sign_catalog_fts(sign_catalog_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER sign_catalog_fts_au AFTER UPDATE OF title ON sign_catalog_entries BEGIN "
+    "INSERT INTO sign_catalog_fts(sign_catalog_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO sign_catalog_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS sign_catalog_fts_au",
+    "DROP TRIGGER IF EXISTS sign_catalog_fts_ad",
+    "DROP TRIGGER IF EXISTS sign_catalog_fts_ai",
+    "DROP TABLE IF EXISTS sign_catalog_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    # trigram 토크나이저가 없는 DB 면 건너뜀 -> 검색은 title LIKE 로
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+            cursor.execute("DROP TABLE temp.fts_probe")
+        except Exception:
+            return
+        for sql in FTS_SQL:
+            cursor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_FTS_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signwords", "0003_signword_keyword_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SignCatalogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entry_key", models.CharField(max_length=255, unique=True)),
+                ("title", models.CharField(db_index=True, max_length=200)),
+                ("subDescription", models.URLField(max_length=500, null=True)),
+                ("signDescription", models.TextField(null=True)),
+                ("content_hash", models.CharField(max_length=40)),
+                ("synced_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "sign_catalog_entries",
+            },
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
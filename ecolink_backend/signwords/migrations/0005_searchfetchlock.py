@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signwords", "0004_signcatalogentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchFetchLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=255, unique=True)),
+                ("owner", models.CharField(max_length=200)),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "search_fetch_locks",
+            },
+        ),
+    ]
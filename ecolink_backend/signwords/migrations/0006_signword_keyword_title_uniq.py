@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def dedupe_signwords(apps, schema_editor):
+    # 제약을 걸기 전에 (keyword, title) 중복 행은 가장 먼저 저장된 것만 남김
+    SignWord = apps.get_model("signwords", "SignWord")
+    duplicates = (
+        SignWord.objects.values("keyword", "title")
+        .annotate(first_id=Min("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for row in duplicates:
+        SignWord.objects.filter(keyword=row["keyword"], title=row["title"]).exclude(
+            id=row["first_id"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("signwords", "0005_searchfetchlock"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_signwords, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="signword",
+            constraint=models.UniqueConstraint(
+                fields=("keyword", "title"), name="signword_keyword_title_uniq"
+            ),
+        ),
+    ]
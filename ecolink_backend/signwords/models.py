@@ -3,15 +3,115 @@ from django.db import models
 # Create your models here.
 
 class SignWord(models.Model):
-    keyword = models.CharField(max_length=100)  # 수어 단어 키워드
+    keyword = models.CharField(max_length=100, db_index=True)  # 수어 단어 키워드 (검색은 keyword 일치 조회)
     title = models.CharField(max_length=200, default="제목없음") # 수어 단어
     subDescription = models.URLField(null=True) #수어 영상
     signDescription = models.TextField(null=True) #수어 설명
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # 같은 keyword 로 받은 같은 단어는 한 번만 (KCISA 결과는 bulk_create(ignore_conflicts=True) 로 저장)
+        constraints = [
+            models.UniqueConstraint(fields=["keyword", "title"], name="signword_keyword_title_uniq"),
+        ]
+
     def __str__(self):
         return self.title #모델 객체를 문자열로 표현할 때 사용
 
+
+class SearchFetchLock(models.Model):
+    # 워커 프로세스 사이 keyword 별 KCISA 조회 잠금 (signwords/single_flight.py, ECOLINK_SEARCH_DB_LOCK=1)
+    key = models.CharField(max_length=255, unique=True)
+    owner = models.CharField(max_length=200)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'search_fetch_locks'
+
+    def __str__(self):
+        return self.key
+
+
+class SignCatalogEntry(models.Model):
+    # KCISA 수어 사전 전체 사본 (sync_kcisa_catalog 명령이 채움), 검색은 title 의 FTS5 trigram 인덱스 (signwords/catalog.py)
+    entry_key = models.CharField(max_length=255, unique=True)  # 항목 url (없으면 title)
+    title = models.CharField(max_length=200, db_index=True)
+    subDescription = models.URLField(max_length=500, null=True)
+    signDescription = models.TextField(null=True)
+    content_hash = models.CharField(max_length=40)  # 바뀐 항목만 갱신할 때 비교
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sign_catalog_entries'
+
+    def __str__(self):
+        return self.title
+
+
+class SignLanguageSession(models.Model):
+    # 영상 하나(또는 카메라 녹화 하나)에서 키포인트를 뽑는 단위, extract_sign_keypoints 명령이 씀
+    STATUS_CHOICES = [
+        ('pending', '대기중'),
+        ('processing', '처리중'),
+        ('completed', '완료'),
+        ('failed', '실패'),
+    ]
+
+    session_id = models.CharField(max_length=255, unique=True, help_text="세션 ID")
+    user_id = models.CharField(max_length=100, null=True, blank=True, help_text="사용자 ID")
+    session_name = models.CharField(max_length=200, null=True, blank=True, help_text="세션 이름")
+    description = models.TextField(null=True, blank=True, help_text="세션 설명")
+    total_frames = models.IntegerField(default=0, help_text="총 프레임 수")
+    processed_frames = models.IntegerField(default=0, help_text="처리된 프레임 수")
+    keypoints_detected_frames = models.IntegerField(default=0, help_text="키포인트가 감지된 프레임 수")
+    started_at = models.DateTimeField(auto_now_add=True, help_text="세션 시작 시간")
+    ended_at = models.DateTimeField(null=True, blank=True, help_text="세션 종료 시간")
+    duration_seconds = models.FloatField(default=0.0, help_text="세션 지속 시간 (초)")
+    is_active = models.BooleanField(default=True, help_text="세션 활성 상태")
+    processing_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="처리 상태")
+
+    class Meta:
+        db_table = 'sign_language_sessions'
+        ordering = ['-started_at']
+        verbose_name = '수어 세션'
+        verbose_name_plural = '수어 세션들'
+
+    def __str__(self):
+        return self.session_name or self.session_id
+
+
+class SignLanguageKeypoint(models.Model):
+    # 프레임 하나의 키포인트 (keypoints_json 은 videoTest_mediapipe_cam_json 의 프레임 dict)
+    session_id = models.CharField(max_length=255, db_index=True, help_text="세션 ID")
+    frame_number = models.IntegerField(help_text="프레임 번호")
+    vector_id = models.CharField(max_length=255, unique=True, help_text="Pinecone 벡터 ID")
+    keypoints_json = models.TextField(help_text="키포인트 데이터 (JSON)")
+    metadata_json = models.TextField(null=True, blank=True, help_text="메타데이터 (JSON)")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="생성 시간")
+    updated_at = models.DateTimeField(auto_now=True, help_text="수정 시간")
+    user_id = models.CharField(max_length=100, null=True, blank=True, help_text="사용자 ID")
+    sign_word = models.CharField(max_length=200, null=True, blank=True, help_text="수어 단어")
+    confidence_score = models.FloatField(default=0.0, help_text="신뢰도 점수")
+    pose_detected = models.BooleanField(default=False, help_text="포즈 감지 여부")
+    left_hand_detected = models.BooleanField(default=False, help_text="왼손 감지 여부")
+    right_hand_detected = models.BooleanField(default=False, help_text="오른손 감지 여부")
+    face_detected = models.BooleanField(default=False, help_text="얼굴 감지 여부")
+
+    class Meta:
+        db_table = 'sign_language_keypoints'
+        ordering = ['-created_at']
+        verbose_name = '수어 키포인트'
+        verbose_name_plural = '수어 키포인트들'
+        indexes = [
+            models.Index(fields=['session_id', 'frame_number'], name='sign_langua_session_5a98e5_idx'),
+            models.Index(fields=['user_id'], name='sign_langua_user_id_1f9aa3_idx'),
+            models.Index(fields=['sign_word'], name='sign_langua_sign_wo_e35da8_idx'),
+            models.Index(fields=['created_at'], name='sign_langua_created_b8d802_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.session_id}#{self.frame_number}'
+
     
 
 
@@ -0,0 +1,17 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from ai_models.codes.keypoints_binary import MEDIA_TYPE, decode_keypoints
+
+
+class KeypointsBinaryParser(BaseParser):
+    # Content-Type: application/x-ecolink-keypoints
+    # 헤더 + (4, T, 54) 배열 (포맷은 ai_models/codes/keypoints_binary.py 참고)
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            arr, mask = decode_keypoints(stream.read())
+        except ValueError as e:
+            raise ParseError(f'Keypoints binary parse error - {e}')
+        return {'keypoints': (arr, mask), 'total_frames': arr.shape[1]}
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# SignWordProxy 검색 결과 캐시 (프로세스 메모리, TTL + LRU)
+# keyword -> 결과 리스트, 빈 리스트는 "결과 없음"(KCISA 404)을 기억하는 negative 캐시로 더 짧은 TTL
+# 워커 프로세스마다 따로 있음 -> 통계도 워커별 (search/stats/)
+# SignWord 가 저장/삭제되면 그 keyword 는 지움 (apps.ready 에서 signal 연결)
+
+SEARCH_CACHE_SIZE = int(os.getenv('ECOLINK_SEARCH_CACHE_SIZE', 1024))
+SEARCH_CACHE_TTL = float(os.getenv('ECOLINK_SEARCH_CACHE_TTL', 300))
+SEARCH_NEGATIVE_TTL = float(os.getenv('ECOLINK_SEARCH_NEGATIVE_TTL', 30))
+
+
+class SearchCache:
+    def __init__(self, max_size=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL, negative_ttl=SEARCH_NEGATIVE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._items = OrderedDict()   # keyword -> (만료 시각, 결과)
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'negative_hits': 0, 'misses': 0, 'expired': 0, 'evicted': 0,
+                       'db_hits': 0, 'api_calls': 0}
+
+    def get(self, keyword):
+        # 결과 리스트 (negative 면 []) 또는 None(없음/만료)
+        with self._lock:
+            item = self._items.get(keyword)
+            if item is not None and item[0] <= time.monotonic():
+                del self._items[keyword]
+                self.counts['expired'] += 1
+                item = None
+            if item is None:
+                self.counts['misses'] += 1
+                return None
+            self._items.move_to_end(keyword)
+            self.counts['hits' if item[1] else 'negative_hits'] += 1
+            return item[1]
+
+    def set(self, keyword, results):
+        ttl = self.ttl if results else self.negative_ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[keyword] = (time.monotonic() + ttl, results)
+            self._items.move_to_end(keyword)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.counts['evicted'] += 1
+
+    def invalidate(self, keyword):
+        with self._lock:
+            self._items.pop(keyword, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def record(self, event):
+        # 캐시 밖에서 일어난 일 (db_hits, api_calls)
+        with self._lock:
+            self.counts[event] = self.counts.get(event, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+            stats['size'] = len(self._items)
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0.0
+        stats['negative_hit_rate'] = stats['negative_hits'] / lookups if lookups else 0.0
+        stats['max_size'] = self.max_size
+        stats['ttl'] = self.ttl
+        stats['negative_ttl'] = self.negative_ttl
+        return stats
+
+
+search_cache = SearchCache()
+
+
+def invalidate_signword(sender, instance, **kwargs):
+    search_cache.invalidate(instance.keyword)
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import kcisa
+from .models import SearchFetchLock
+
+
+# 같은 keyword 의 외부 조회(KCISA)는 한 번에 하나만: 먼저 온 요청(leader)이 부르고 나머지는 그 결과를 기다림
+#   스레드: 프로세스 안 in-flight 목록 (key -> _Call)
+#   프로세스: ECOLINK_SEARCH_DB_LOCK=1 이면 SearchFetchLock 행으로 잠금 (행 insert 가 성공한 쪽이 leader)
+#     다른 프로세스가 잡고 있으면 풀릴 때까지 기다렸다가 recheck() (예: DB 에 저장된 결과) 로 먼저 확인
+#     leader 가 죽어도 expires_at 이 지나면 다른 쪽이 잡음
+#     TTL 은 KCISA 요청 한 번의 최대 시간(연결 + 읽기 timeout x 시도 횟수 + backoff)보다 길게: 살아 있는 leader 의 잠금을 뺏지 않게
+
+SEARCH_DB_LOCK = os.getenv('ECOLINK_SEARCH_DB_LOCK', '0') == '1'
+LOCK_TTL = float(os.getenv('ECOLINK_SEARCH_LOCK_TTL', kcisa.upstream.max_seconds() + 10))
+LOCK_POLL = 0.1
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, db_lock=SEARCH_DB_LOCK, lock_ttl=LOCK_TTL):
+        self.db_lock = db_lock
+        self.lock_ttl = lock_ttl
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counts = {'leaders': 0, 'followers': 0, 'db_waits': 0, 'db_rechecks': 0}
+
+    def do(self, key, fn, recheck=None):
+        # fn() 결과를 같은 key 의 동시 호출자 모두에게 (예외도 같이)
+        # recheck: 다른 프로세스가 끝낸 뒤 결과를 찾아보는 함수 (없으면 None 반환)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self.counts['leaders' if leader else 'followers'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, recheck) if self.db_lock else fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _run(self, key, fn, recheck):
+        owner = f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        waited = False
+        while not acquire_db_lock(key, owner, self.lock_ttl):
+            if not waited:
+                waited = True
+                with self._lock:
+                    self.counts['db_waits'] += 1
+            time.sleep(LOCK_POLL)
+        try:
+            if waited and recheck is not None:
+                result = recheck()
+                if result is not None:
+                    with self._lock:
+                        self.counts['db_rechecks'] += 1
+                    return result
+            return fn()
+        finally:
+            release_db_lock(key, owner)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+
+def _db_key(key):
+    # 잠금 행의 key 칸은 255자, 긴 key 는 해시로 (잘라 쓰면 다른 keyword 끼리 겹침)
+    key = str(key)
+    return key if len(key) <= 255 else 'sha1:' + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def acquire_db_lock(key, owner, ttl=LOCK_TTL):
+    key = _db_key(key)
+    now = timezone.now()
+    SearchFetchLock.objects.filter(key=key, expires_at__lt=now).delete()
+    try:
+        with transaction.atomic():
+            SearchFetchLock.objects.create(key=key, owner=owner, expires_at=now + timedelta(seconds=ttl))
+        return True
+    except IntegrityError:
+        return False
+
+
+def release_db_lock(key, owner):
+    SearchFetchLock.objects.filter(key=_db_key(key), owner=owner).delete()
+
+
+search_flight = SingleFlight()
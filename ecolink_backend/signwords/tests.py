@@ -1,3 +1,431 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
 from django.test import TestCase
+from django.urls import reverse
+
+from . import kcisa, views
+from .direct_answers import DirectAnswers, PatternMatcher
+from .catalog import search_catalog, sync_catalog
+from .management.commands.fake_kcisa_server import make_catalog, make_server
+from .models import SearchFetchLock, SignCatalogEntry, SignWord
+from .search_cache import SearchCache, search_cache
+from .upstreams import Upstream
+from .single_flight import SingleFlight, acquire_db_lock, release_db_lock
+
+
+def make_frame(i):
+    point = {'x': 0.5, 'y': 0.5, 'z': 0.0, 'visibility': 1.0}
+    return {'frame': i, 'pose_landmarks': [point] * 12, 'left_hand_landmarks': [point] * 21,
+            'right_hand_landmarks': None}
+
+
+class StreamUploadLimitTests(TestCase):
+    # upload-keypoints/stream/ 세션 수 / 세션당 프레임 수 상한
+    def setUp(self):
+        views._stream_sessions.clear()
+        self.addCleanup(views._stream_sessions.clear)
+
+    def post(self, session_id, frames):
+        return self.client.post(reverse('upload-keypoints-stream'),
+                                {'session_id': session_id, 'sign_language_data': frames}, content_type='application/json')
+
+    def test_frames_over_limit_drops_session(self):
+        with mock.patch.object(views, 'STREAM_MAX_FRAMES', 5):
+            response = self.post('a', [make_frame(i) for i in range(3)])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['total_frames'], 3)
+
+            response = self.post('a', [make_frame(i) for i in range(3, 6)])
+            self.assertEqual(response.status_code, 413)
+            self.assertNotIn('a', views._stream_sessions)
+
+    def test_too_many_sessions(self):
+        with mock.patch.object(views, 'STREAM_MAX_SESSIONS', 2):
+            self.assertEqual(self.post('a', [make_frame(0)]).status_code, 200)
+            self.assertEqual(self.post('b', [make_frame(0)]).status_code, 200)
+            response = self.post('c', [make_frame(0)])
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+            # 이미 열린 세션은 계속 받음
+            self.assertEqual(self.post('a', [make_frame(1)]).json()['total_frames'], 2)
+
+    def test_expired_sessions_free_slots(self):
+        with mock.patch.object(views, 'STREAM_MAX_SESSIONS', 1):
+            self.assertEqual(self.post('a', [make_frame(0)]).status_code, 200)
+            views._stream_sessions['a'][2] -= views.STREAM_SESSION_TTL + 1
+            self.assertEqual(self.post('b', [make_frame(0)]).status_code, 200)
+            self.assertNotIn('a', views._stream_sessions)
+
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('signwords.search_cache.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ttl_and_negative_ttl(self):
+        cache = SearchCache(max_size=8, ttl=10, negative_ttl=2)
+        cache.set('a', [{'title': 'a'}])
+        cache.set('b', [])
+        self.assertEqual(cache.get('a'), [{'title': 'a'}])
+        self.assertEqual(cache.get('b'), [])
+
+        self.now += 3   # negative 만 만료
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), [{'title': 'a'}])
+        self.now += 10
+        self.assertIsNone(cache.get('a'))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['negative_hits'], stats['misses'], stats['expired']), (2, 1, 2, 2))
+        self.assertEqual(stats['size'], 0)
+
+    def test_lru_eviction(self):
+        cache = SearchCache(max_size=2, ttl=10, negative_ttl=10)
+        cache.set('a', [1])
+        cache.set('b', [2])
+        cache.get('a')   # a 가 최근 -> b 가 밀려남
+        cache.set('c', [3])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), [1])
+        self.assertEqual(cache.get('c'), [3])
+        self.assertEqual(cache.stats()['evicted'], 1)
+
+    def test_disabled(self):
+        cache = SearchCache(max_size=8, ttl=10, negative_ttl=0)
+        cache.set('a', [])
+        self.assertIsNone(cache.get('a'))
+        cache = SearchCache(max_size=0, ttl=10, negative_ttl=10)
+        cache.set('a', [1])
+        self.assertIsNone(cache.get('a'))
+
+
+class SearchCacheViewTests(TestCase):
+    def setUp(self):
+        search_cache.clear()
+        self.addCleanup(search_cache.clear)
+
+    def search(self, keyword):
+        return self.client.get(reverse('signword-search'), {'keyword': keyword})
+
+    def test_db_hit_is_cached_and_invalidated_on_save(self):
+        SignWord.objects.create(keyword='물', title='물')
+        self.assertEqual([row['title'] for row in self.search('물').json()], ['물'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search('물').status_code, 200)
+
+        # 저장 signal -> keyword 캐시 지움 -> 새 행이 보임
+        SignWord.objects.create(keyword='물', title='물병')
+        self.assertEqual(sorted(row['title'] for row in self.search('물').json()), ['물', '물병'])
+
+    def test_negative_cache(self):
+        with mock.patch.object(views, 'KCISA_LIVE_FALLBACK', 'never'):
+            self.assertEqual(self.search('없음').status_code, 404)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.search('없음').status_code, 404)
+            SignWord.objects.create(keyword='없음', title='없음')
+            self.assertEqual(self.search('없음').status_code, 200)
+
+
+class FakeKCISATestCase(TestCase):
+    # fake_kcisa_server 를 빈 포트로 띄우고 kcisa.KCISA_API_URL 을 거기로, self.catalog 를 바꾸면 다음 요청부터 반영
+    def setUp(self):
+        self.catalog = make_catalog(40)
+        server = make_server(lambda: self.catalog, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address
+        patcher = mock.patch.object(kcisa, 'KCISA_API_URL', f'http://{host}:{port}/getCTE01701')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        search_cache.clear()
+        self.addCleanup(search_cache.clear)
+
+    def sync(self, **kwargs):
+        return sync_catalog('test', log=lambda message: None, **kwargs)
+
+
+class CatalogSyncTests(FakeKCISATestCase):
+    def test_sync_and_resync(self):
+        stats = self.sync(page_size=15)
+        self.assertEqual((stats['pages'], stats['fetched'], stats['created']), (3, 40, 40))
+        self.assertEqual(SignCatalogEntry.objects.count(), 40)
+
+        # 바뀐 항목만 갱신, 사라진 항목은 prune 일 때만 삭제
+        self.catalog[0] = dict(self.catalog[0], signDescription='바뀐 설명')
+        del self.catalog[-1]
+        stats = self.sync(page_size=15)
+        self.assertEqual((stats['created'], stats['updated'], stats['unchanged'], stats['deleted']), (0, 1, 38, 0))
+        self.assertEqual(SignCatalogEntry.objects.count(), 40)
+        stats = self.sync(page_size=15, prune=True)
+        self.assertEqual((stats['updated'], stats['deleted']), (0, 1))
+        self.assertEqual(SignCatalogEntry.objects.get(title='사과').signDescription, '바뀐 설명')
+
+    def test_search_uses_catalog(self):
+        self.sync()
+        titles = [row['title'] for row in search_catalog('사과')]
+        self.assertEqual(titles, ['사과', '사과1', '사과2', '사과나무', '사과나무1', '사과나무2'])
+        self.assertEqual([row['title'] for row in search_catalog('수어통')], ['수어통역', '수어통역1'])
+
+        with mock.patch.object(kcisa, 'fetch') as fetch:
+            response = self.client.get(reverse('signword-search'), {'keyword': '교통'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()[0]['title'], '교통사고')
+            self.assertEqual(self.client.get(reverse('signword-search'), {'keyword': '없는단어'}).status_code, 404)
+            fetch.assert_not_called()
+
+    def test_short_sync_does_not_prune(self):
+        self.sync()
+        # totalCount 보다 적게 오는 서버 (마지막 페이지 전에 끝남)
+        self.catalog = self.catalog[:10]
+        with mock.patch.object(kcisa, 'total_count', lambda data: 40):
+            with self.assertRaises(kcisa.KCISAError):
+                self.sync(page_size=15, prune=True)
+        self.assertEqual(SignCatalogEntry.objects.count(), 40)
+
+        # 빈 사전(0건)으로 전부 지우지 않음
+        self.catalog = []
+        self.assertEqual(self.sync(prune=True)['deleted'], 0)
+        self.assertEqual(SignCatalogEntry.objects.count(), 40)
+
+    def test_error_result_code(self):
+        self.sync()
+        error = {'response': {'header': {'resultCode': '30', 'resultMsg': 'SERVICE KEY IS NOT REGISTERED ERROR.'}}}
+        response = mock.Mock(status_code=200, **{'json.return_value': error})
+        with mock.patch.object(kcisa.upstream, 'get', return_value=response):
+            with self.assertRaises(kcisa.KCISAError):
+                self.sync(prune=True)
+        self.assertEqual(SignCatalogEntry.objects.count(), 40)
+
+
+class SingleFlightTests(TestCase):
+    def run_concurrently(self, flight, fn, n=8):
+        # 같은 key 로 n 개 스레드 -> [(결과, 예외)]
+        results = [None] * n
+
+        def call(i):
+            try:
+                results[i] = (flight.do('물', fn), None)
+            except Exception as e:
+                results[i] = (None, e)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_one_call_per_key(self):
+        flight = SingleFlight(db_lock=False)
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return ['물']
+
+        threads, results = self.run_concurrently(flight, fn)
+        while flight.stats()['leaders'] + flight.stats()['followers'] < len(threads):
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [(['물'], None)] * len(threads))
+        self.assertEqual(flight.stats(), {'leaders': 1, 'followers': len(threads) - 1, 'db_waits': 0,
+                                          'db_rechecks': 0, 'in_flight': 0})
+
+        # 끝난 key 는 다시 부름
+        self.assertEqual(flight.do('물', lambda: ['새 결과']), ['새 결과'])
+
+    def test_error_shared_with_followers(self):
+        flight = SingleFlight(db_lock=False)
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError('실패')
+
+        threads, results = self.run_concurrently(flight, fn, n=4)
+        while flight.stats()['leaders'] + flight.stats()['followers'] < len(threads):
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(result is None and isinstance(error, ValueError) for result, error in results))
+        self.assertEqual(flight.stats()['in_flight'], 0)
+
+    def test_db_lock_waits_then_rechecks(self):
+        # 다른 프로세스가 잡은 잠금 -> 만료될 때까지 기다렸다가 recheck 결과 (fn 은 안 부름)
+        self.assertTrue(acquire_db_lock('물', 'other', ttl=0.3))
+        self.assertFalse(acquire_db_lock('물', 'me', ttl=0.3))
+        flight = SingleFlight(db_lock=True, lock_ttl=5)
+        fn = mock.Mock(return_value='fetched')
+        self.assertEqual(flight.do('물', fn, recheck=lambda: 'saved'), 'saved')
+        fn.assert_not_called()
+        self.assertEqual((flight.stats()['db_waits'], flight.stats()['db_rechecks']), (1, 1))
+        self.assertFalse(SearchFetchLock.objects.exists())
+
+        # 잠금이 비어 있으면 바로 fn, 끝나면 풀림
+        self.assertEqual(flight.do('물', fn, recheck=lambda: 'saved'), 'fetched')
+        self.assertFalse(SearchFetchLock.objects.exists())
+
+    def test_db_lock_long_key(self):
+        key = '물' * 300
+        self.assertTrue(acquire_db_lock(key, 'a'))
+        self.assertTrue(acquire_db_lock(key[:-1] + '불', 'a'))   # 앞 255자가 같아도 다른 잠금
+        self.assertFalse(acquire_db_lock(key, 'b'))
+        release_db_lock(key, 'b')   # 주인이 아니면 안 풀림
+        self.assertFalse(acquire_db_lock(key, 'b'))
+        release_db_lock(key, 'a')
+        self.assertTrue(acquire_db_lock(key, 'b'))
+
+
+class SaveItemsTests(FakeKCISATestCase):
+    def test_bulk_save_dedupes_in_response_order(self):
+        SignWord.objects.create(keyword='물', title='물병', signDescription='예전 설명')
+        items = [{'title': '물'}, {'title': '물병', 'signDescription': '새 설명'}, {'title': '물'}, {}]
+        with self.assertNumQueries(2):
+            saved = views.SignWordProxy().save_items('물', items)
+        self.assertEqual([row['title'] for row in saved], ['물', '물병', '제목없음'])
+        self.assertEqual(saved[1]['signDescription'], '예전 설명')   # 이미 있던 행은 그대로
+        self.assertEqual(SignWord.objects.filter(keyword='물').count(), 3)
+
+    def test_kcisa_fallback_saves_once(self):
+        with mock.patch.dict(os.environ, {'KCISA_SERVICE_KEY': 'test'}):
+            response = self.client.get(reverse('signword-search'), {'keyword': '학교'})
+            self.assertEqual([row['title'] for row in response.json()], ['학교', '학교생활', '학교1', '학교생활1'])
+            self.assertEqual(SignWord.objects.filter(keyword='학교').count(), 4)
+
+            search_cache.clear()   # 두 번째는 DB 에서, KCISA 는 안 부름
+            with mock.patch.object(kcisa, 'fetch') as fetch:
+                self.assertEqual(len(self.client.get(reverse('signword-search'), {'keyword': '학교'}).json()), 4)
+                fetch.assert_not_called()
+
+
+class UpstreamRetryTests(TestCase):
+    def setUp(self):
+        self.requests = []
+        test = self
+
+        class SlowHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                test.requests.append(self.path)
+                time.sleep(0.5)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = 'http://%s:%d/' % server.server_address
+
+    def test_read_timeout_not_retried(self):
+        upstream = Upstream('test', read_timeout=0.1, retries=2, backoff=0)
+        start = time.monotonic()
+        with self.assertRaises(requests.exceptions.RequestException):
+            upstream.get(self.url)
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_lock_ttl_covers_worst_case(self):
+        upstream = Upstream('test', read_timeout=30, connect_timeout=3, retries=2, backoff=0.5)
+        self.assertEqual(upstream.max_seconds(), 3 * 33 + 0.5 + 1.0)
+        from .single_flight import LOCK_TTL
+        self.assertGreater(LOCK_TTL, kcisa.upstream.max_seconds())
+
+
+def naive_answer(entries, message):
+    # 예전 ChatAIProxy 이중 루프
+    for entry in entries:
+        for pattern in entry["patterns"]:
+            if pattern in message:
+                return entry["answer"]
+    return None
+
+
+class DirectAnswersTests(TestCase):
+    def test_matches_naive_loop(self):
+        rng = random.Random(0)
+        alphabet = '수어자격증abc '
+        word = lambda low, high: ''.join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+        for _ in range(200):
+            entries = [{'patterns': [word(0 if rng.random() < 0.02 else 1, 4) for _ in range(rng.randint(0, 4))],
+                        'answer': i} for i in range(rng.randint(1, 8))]
+            answers = DirectAnswers(entries, path=None)
+            for _ in range(20):
+                message = word(0, 12)
+                self.assertEqual(answers.find(message), naive_answer(entries, message), (entries, message))
+
+    def test_chat_table(self):
+        answers = DirectAnswers(views.ChatAIProxy.DIRECT_ANSWERS, path=None)
+        for message in ['수어 자격증 시험 알려줘', '사이트 추천', '오늘 날씨', '']:
+            self.assertEqual(answers.find(message), naive_answer(views.ChatAIProxy.DIRECT_ANSWERS, message))
+
+    def test_first_match_prefers_earlier_entry(self):
+        matcher = PatternMatcher([('bcd', 1), ('abcde', 0), ('c', 2)])
+        self.assertEqual(matcher.first_match('xabcdex'), 0)
+        self.assertEqual(matcher.first_match('xbcdx'), 1)
+        self.assertEqual(matcher.first_match('c'), 2)
+        self.assertIsNone(matcher.first_match('xyz'))
+
+    def test_hot_reload(self):
+        default = [{'patterns': ['기본'], 'answer': '기본 답변'}]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'answers.json')
+            mtime = [1000]
+
+            def write(text):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                mtime[0] += 1
+                os.utime(path, (mtime[0], mtime[0]))
+
+            write(json.dumps([{'patterns': ['안녕'], 'answer': '반가워요'}], ensure_ascii=False))
+            answers = DirectAnswers(default, path=path, reload_check=0)
+            self.assertEqual(answers.find('안녕하세요'), '반가워요')
+            self.assertIsNone(answers.find('기본'))
+
+            write(json.dumps([{'patterns': ['잘가'], 'answer': '또 봐요'}], ensure_ascii=False))
+            self.assertEqual(answers.find('잘가요'), '또 봐요')
+            self.assertIsNone(answers.find('안녕'))
+
+            # 잘못된 파일 -> 이전 표 유지
+            with self.assertLogs('signwords.direct_answers', 'ERROR'):
+                write('[{"patterns": ["x"]}]')
+                self.assertEqual(answers.find('잘가요'), '또 봐요')
+            with self.assertLogs('signwords.direct_answers', 'ERROR'):
+                write('{not json')
+                self.assertEqual(answers.find('잘가요'), '또 봐요')
+
+            # 파일 삭제 -> 기본 표
+            os.remove(path)
+            with self.assertLogs('signwords.direct_answers', 'WARNING'):
+                self.assertEqual(answers.find('기본'), '기본 답변')
+            self.assertIsNone(answers.find('잘가요'))
 
-# Create your tests here.
+    def test_reload_interval(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'answers.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([{'patterns': ['a'], 'answer': 1}], f)
+            answers = DirectAnswers([], path=path, reload_check=3600)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([{'patterns': ['a'], 'answer': 2}], f)
+            os.utime(path, (1, 1))
+            self.assertEqual(answers.find('a'), 1)   # 다음 확인 시각 전에는 파일을 보지 않음
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 외부 API(업스트림)별 공유 HTTP 세션: keep-alive 연결 풀 + 재시도 + 서킷 브레이커 + 지연/에러 카운터
+#   kcisa  KCISA 수어 사전 Open API (signwords/kcisa.py)
+#   llm    HuggingFace chat completions (ChatAIProxy)
+# 설정은 업스트림마다 환경변수 ECOLINK_<이름>_<항목> (예: ECOLINK_KCISA_POOL_SIZE=8)
+#   POOL_SIZE        연결 풀 크기, 다 쓰고 있으면 반납될 때까지 기다림
+#   CONNECT_TIMEOUT  연결 timeout (초), 읽기 timeout 은 업스트림마다 기본값 (READ_TIMEOUT)
+#   RETRIES          재시도 횟수: 연결 실패는 모든 메서드, 502·503·504 는 GET 만 (POST 는 다시 안 보냄)
+#   READ_RETRIES     읽기 timeout/끊김 재시도 횟수 (기본 0, GET 만): 읽기 timeout 은 이미 READ_TIMEOUT 만큼 기다린 뒤라
+#                    다시 보내면 검색 한 번이 (재시도 + 1) x READ_TIMEOUT 까지 막힘
+#   BACKOFF          재시도 간격 배율 (BACKOFF * 2^n 초)
+#   FAILURES         연속 실패가 이만큼이면 서킷 열림 -> RESET_AFTER 초 동안 바로 CircuitOpenError
+#   RESET_AFTER      열린 뒤 이 시간이 지나면 한 요청만 시험으로 보냄 (성공하면 닫힘)
+# 통계: upstreams/stats/ (워커 프로세스별)
+# 요청 한 번이 걸릴 수 있는 최대 시간: Upstream.max_seconds() (single_flight 잠금 TTL 계산에 씀)
+
+RETRY_STATUS = (502, 503, 504)
+
+
+def _setting(name, key, default):
+    return type(default)(os.getenv(f'ECOLINK_{name.upper()}_{key}', default))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    # RequestException 이라 기존 except 에서 그대로 잡힘 (503 등)
+    pass
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        # 열려 있으면 False, reset_timeout 이 지났으면 요청 하나만 통과 (half open)
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class Upstream:
+    def __init__(self, name, read_timeout=30.0, pool_size=10, connect_timeout=3.05, retries=2, read_retries=0,
+                 backoff=0.3, failures=5, reset_after=30.0):
+        self.name = name
+        self.timeout = (_setting(name, 'CONNECT_TIMEOUT', float(connect_timeout)),
+                        _setting(name, 'READ_TIMEOUT', float(read_timeout)))
+        self.retries = _setting(name, 'RETRIES', int(retries))
+        self.backoff = _setting(name, 'BACKOFF', float(backoff))
+        retry = Retry(
+            total=self.retries, connect=self.retries, status=self.retries,
+            read=min(self.retries, _setting(name, 'READ_RETRIES', int(read_retries))),
+            backoff_factor=self.backoff,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,   # 재시도를 다 써도 마지막 응답은 그대로 돌려줌
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_setting(name, 'POOL_SIZE', int(pool_size)),
+                              max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.breaker = CircuitBreaker(_setting(name, 'FAILURES', int(failures)),
+                                      _setting(name, 'RESET_AFTER', float(reset_after)))
+
+        self._lock = threading.Lock()
+        self.counts = {'requests': 0, 'errors': 0, 'http_errors': 0, 'retries': 0, 'short_circuited': 0}
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def max_seconds(self):
+        # 기본 timeout 으로 요청 한 번(재시도 포함)이 걸릴 수 있는 최대 시간
+        # 시도마다 연결 + 읽기 timeout 을 다 쓰고, 재시도 사이 backoff (BACKOFF * 2^n, urllib3 상한 120초)
+        connect, read = self.timeout
+        backoff = sum(min(self.backoff * 2 ** n, Retry.DEFAULT_BACKOFF_MAX) for n in range(self.retries))
+        return (self.retries + 1) * (connect + read) + backoff
+
+    def request(self, method, url, **kwargs):
+        # requests.request 와 같음, timeout 을 안 주면 (연결, 읽기) 기본값
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError(f'{self.name} 업스트림 서킷 열림 (연속 실패 {self.breaker.failures}회)')
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._finish(start, ok=False, error='errors')
+            raise
+        retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+        if retries:
+            self._count('retries', len(retries))
+        server_error = response.status_code >= 500
+        self._finish(start, ok=not server_error, error='http_errors' if server_error else None)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counts[key] += n
+
+    def _finish(self, start, ok, error=None):
+        ms = (time.perf_counter() - start) * 1000
+        self.breaker.record(ok)
+        with self._lock:
+            self.counts['requests'] += 1
+            if error is not None:
+                self.counts[error] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+            stats['mean_ms'] = self.total_ms / stats['requests'] if stats['requests'] else 0.0
+            stats['max_ms'] = self.max_ms
+        stats['circuit'] = self.breaker.state
+        stats['consecutive_failures'] = self.breaker.failures
+        return stats
+
+
+UPSTREAMS = {}
+
+
+def get_upstream(name, **defaults):
+    # 이름별로 하나만 (프로세스 안에서 공유)
+    if name not in UPSTREAMS:
+        UPSTREAMS[name] = Upstream(name, **defaults)
+    return UPSTREAMS[name]
+
+
+def upstream_stats():
+    return {name: upstream.stats() for name, upstream in UPSTREAMS.items()}
@@ -1,11 +1,17 @@
 from django.urls import path
 from .views import SignWordProxy
+from .views import SignWordSearchStatsView
 from .views import ChatAIProxy
+from .views import UpstreamStatsView
 from .views import UploadKeypointsAPIView
+from .views import UploadKeypointsStreamAPIView
 
 
 urlpatterns = [
     path('search/', SignWordProxy.as_view(), name='signword-search'),
+    path('search/stats/', SignWordSearchStatsView.as_view(), name='signword-search-stats'),
     path('ai-chat/', ChatAIProxy.as_view(), name='ai-chat'),
+    path('upstreams/stats/', UpstreamStatsView.as_view(), name='upstream-stats'),
     path('upload-keypoints/', UploadKeypointsAPIView.as_view(), name='upload-keypoints'),
+    path('upload-keypoints/stream/', UploadKeypointsStreamAPIView.as_view(), name='upload-keypoints-stream'),
 ]
\ No newline at end of file
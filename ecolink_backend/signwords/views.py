@@ -1,19 +1,50 @@
 import os
+import threading
+import time
 import requests
 import logging
 from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
 from .models import SignWord
+from .parsers import KeypointsBinaryParser
+from .search_cache import search_cache
+from .single_flight import search_flight
+from .upstreams import get_upstream, upstream_stats
+from .direct_answers import DirectAnswers
+from .catalog import catalog_ready, search_catalog
+from . import kcisa
 
-from ai_models.codes.normalization_cam import normalization
+from ai_models.codes.normalization_cam import StreamingNormalizer, normalization
 from ai_models.codes.emedding_test_n_return_54node import classify
 from ai_models.codes.emedding_test_8emer_return_54node import classify8
 
 
 logger = logging.getLogger(__name__)
 
+checkpoint_path8Police='ai_models/datas/checkpoint_8wordsPolice_54node_trynor_gaussi_addcam.pth'
+label_list_Police=['경찰','교통사고','깔리다','병원',
+                   '불나다','숨을안쉬다','쓰러지다','연락해주세요']
+
+# 조각 업로드 세션: session_id -> [StreamingNormalizer, 세션 lock, 마지막 요청 시각]
+# 프로세스 메모리에 있으므로 워커가 여러 개면 같은 세션은 같은 워커로 가야 함
+# 워커 메모리 상한 = 최대 세션 수 x 세션당 최대 프레임 수
+#   세션이 MAX_FRAMES 를 넘으면 413 + 세션 버림, 열린 세션이 MAX_SESSIONS 개면 새 세션은 429
+STREAM_SESSION_TTL = float(os.getenv('ECOLINK_STREAM_SESSION_TTL', 60))
+STREAM_MAX_FRAMES = int(os.getenv('ECOLINK_STREAM_MAX_FRAMES', 1800))     # 30fps 로 1분
+STREAM_MAX_SESSIONS = int(os.getenv('ECOLINK_STREAM_MAX_SESSIONS', 256))
+_stream_sessions = {}
+_stream_sessions_lock = threading.Lock()
+
+# 검색에서 KCISA Open API 를 부르는 경우 (로컬 사전 사본은 sync_kcisa_catalog 로 채움)
+#   empty  사본이 비어 있을 때만 (기본)  /  always  사본에도 DB 에도 없으면  /  never  안 부름
+KCISA_LIVE_FALLBACK = os.getenv('ECOLINK_KCISA_LIVE_FALLBACK', 'empty')
+
+# ChatAIProxy 의 HuggingFace 호출: 연결 풀 / 재시도(연결 실패만, POST) / 서킷 브레이커 (ECOLINK_LLM_*)
+llm_upstream = get_upstream('llm', read_timeout=30)
+
 class SignWordProxy(APIView):
 
     def get(self, request):
@@ -32,91 +63,133 @@ class SignWordProxy(APIView):
         #     ]
         #     return JsonResponse(results, safe=False)
         
-        # 1. DB에서 먼저 조회 
-        cache = SignWord.objects.filter(keyword=keyword)
-        if cache.exists():
-            results = [
-                {
-                    "title": obj.title,
-                    "subDescription": obj.subDescription,
-                    "signDescription": obj.signDescription, 
-                }
-                for obj in cache
-            ]
+        # 0. 프로세스 메모리 캐시 (signwords/search_cache.py), [] 는 최근에 결과 없음이었던 keyword
+        results = search_cache.get(keyword)
+        if results is not None:
+            if not results:
+                return JsonResponse({'error': 'No results found'}, status=404)
             return JsonResponse(results, safe=False)
-        
-        # 2. DB에 없으면 Open API에서 가져오기
+
+        # 1. 로컬 사전 사본 (sync_kcisa_catalog), 부분/접두 검색
+        catalog_synced = catalog_ready()
+        if catalog_synced:
+            results = search_catalog(keyword or '')
+            if results:
+                search_cache.record('catalog_hits')
+                search_cache.set(keyword, results)
+                return JsonResponse(results, safe=False)
+
+        # 2. DB에서 조회 (예전에 Open API 로 받아 둔 keyword, keyword 인덱스, 쿼리 한 번)
+        results = list(SignWord.objects.filter(keyword=keyword).values("title", "subDescription", "signDescription"))
+        if results:
+            search_cache.record('db_hits')
+            search_cache.set(keyword, results)
+            return JsonResponse(results, safe=False)
+
+        # 3. Open API 는 fallback 으로만 (KCISA_LIVE_FALLBACK)
+        if KCISA_LIVE_FALLBACK == 'never' or (catalog_synced and KCISA_LIVE_FALLBACK != 'always'):
+            search_cache.set(keyword, [])
+            return JsonResponse({'error': 'No results found'}, status=404)
+
         service_key = os.getenv('KCISA_SERVICE_KEY')
         if not service_key:
             logger.error("KCISA_SERVICE_KEY 환경변수가 설정되지 않음")
             return JsonResponse({'error': 'Service key not configured'}, status=500)
-            
-        api_url = "http://api.kcisa.kr/openapi/service/rest/meta13/getCTE01701"
-        params = {
-            'serviceKey': service_key,
-            'numOfRows': 3616,
-            'pageNo': 1,
-            "_type": "json",
-            'keyword': keyword,
-        }
 
-        headers = {"accept": "application/json"}
-        
+        # 같은 keyword 동시 요청은 KCISA 조회 한 번만, 나머지는 그 결과를 기다림 (signwords/single_flight.py)
+        body, status_code = search_flight.do(
+            keyword,
+            lambda: self.fetch_kcisa(keyword, service_key),
+            recheck=lambda: self.find_saved(keyword),
+        )
+        return JsonResponse(body, status=status_code, safe=False)
+
+    def find_saved(self, keyword):
+        # 다른 워커 프로세스가 방금 조회/저장했으면 그 결과 (ECOLINK_SEARCH_DB_LOCK=1 일 때)
+        results = list(SignWord.objects.filter(keyword=keyword).values("title", "subDescription", "signDescription"))
+        if not results:
+            return None
+        search_cache.set(keyword, results)
+        return results, 200
+
+    def save_items(self, keyword, items):
+        # KCISA 항목 -> SignWord, insert 한 번 + 읽기 한 번 (이미 있는 (keyword, title) 은 유니크 제약으로 건너뜀)
+        # 반환: 응답 순서대로 저장된 행 (같은 title 은 한 번)
+        words = {}
+        for item in items:
+            title = item.get("title", "제목없음")
+            if title not in words:
+                words[title] = SignWord(
+                    keyword=keyword,
+                    title=title,
+                    subDescription=item.get("subDescription", ""),
+                    signDescription=item.get("signDescription", ""),
+                )
         try:
-            response = requests.get(api_url, params=params, headers=headers, timeout=30)
-            response.raise_for_status()  # HTTP 에러 체크
-            
-            data = response.json()
-            logger.debug(f"API Response: {data}")
-            
-            items = data.get("response", {}).get("body", {}).get("items", {}).get("item", [])
+            SignWord.objects.bulk_create(words.values(), ignore_conflicts=True)
+            saved = {
+                row["title"]: row
+                for row in SignWord.objects.filter(keyword=keyword).values("title", "subDescription", "signDescription")
+            }
+        except Exception as db_error:
+            # 저장이 안 돼도 받은 결과는 돌려줌
+            logger.error(f"DB 저장 중 오류: {str(db_error)}")
+            saved = {}
+        return [
+            saved.get(title) or {
+                "title": word.title,
+                "subDescription": word.subDescription,
+                "signDescription": word.signDescription,
+            }
+            for title, word in words.items()
+        ]
 
-            # items가 dict(단일)일 수도 있으니 리스트로 변환
-            if isinstance(items, dict):
-                items = [items]
+    def fetch_kcisa(self, keyword, service_key):
+        # KCISA 조회 + SignWord 저장 -> (응답 본문, 상태 코드), single-flight leader 만 부름
+        try:
+            search_cache.record('api_calls')
+            data = kcisa.fetch(service_key, 1, 3616, keyword=keyword)
+            logger.debug(f"API Response: {data}")
+            items = kcisa.parse_items(data)
 
             if items:
-                results = []
-                for item in items:
-                    try:
-                        # keyword와 title을 모두 고려해서 저장 (중복 방지)
-                        obj, created = SignWord.objects.get_or_create(
-                            keyword=keyword,
-                            title=item.get("title", "제목없음"),
-                            defaults={
-                                "subDescription": item.get("subDescription", ""),
-                                "signDescription": item.get("signDescription", ""),
-                            }
-                        )
-                        results.append({
-                            "title": obj.title,
-                            "subDescription": obj.subDescription,
-                            "signDescription": obj.signDescription,
-                        })
-                    except Exception as db_error:
-                        logger.error(f"DB 저장 중 오류: {str(db_error)}")
-                        continue
-                        
-                return JsonResponse(results, safe=False)
+                results = self.save_items(keyword, items)
+                search_cache.set(keyword, results)
+                return results, 200
             else:
                 logger.info(f"OpenAPI에서 '{keyword}'에 대한 결과 없음")
-                return JsonResponse({'error': 'No results found'}, status=404)
+                search_cache.set(keyword, [])   # negative 캐시: 짧은 TTL 동안 외부 API 를 다시 부르지 않음
+                return {'error': 'No results found'}, 404
                 
         except requests.exceptions.RequestException as req_error:
             logger.error(f"API 요청 오류: {str(req_error)}")
-            return JsonResponse({'error': 'External API request failed'}, status=503)
+            return {'error': 'External API request failed'}, 503
         except ValueError as json_error:
             logger.error(f"JSON 파싱 오류: {str(json_error)}")
-            return JsonResponse({'error': 'Invalid API response format'}, status=502)
+            return {'error': 'Invalid API response format'}, 502
         except Exception as e:
             logger.error(f"예상치 못한 오류: {str(e)}")
-            return JsonResponse({
+            return {
                 "error": "Internal server error",
                 "details": str(e)
-            }, status=500)
+            }, 500
         
 
 
+class SignWordSearchStatsView(APIView):
+    # 검색 캐시 적중률 (이 워커 프로세스 기준)
+    def get(self, request):
+        stats = search_cache.stats()
+        stats['single_flight'] = search_flight.stats()
+        return JsonResponse(stats)
+
+
+class UpstreamStatsView(APIView):
+    # 외부 API 별 요청 수 / 에러 / 재시도 / 지연 / 서킷 상태 (이 워커 프로세스 기준)
+    def get(self, request):
+        return JsonResponse(upstream_stats())
+
+
 class ChatAIProxy(APIView):
     DIRECT_ANSWERS = [
         {
@@ -150,11 +223,8 @@ class ChatAIProxy(APIView):
     ]
 
     def find_direct_answer(self, message):
-        for item in self.DIRECT_ANSWERS:
-            for pattern in item["patterns"]:
-                if pattern in message:
-                    return item["answer"]
-        return None
+        # 표 순서상 가장 앞 항목 중 pattern 이 메시지에 들어 있는 것 (signwords/direct_answers.py, 파일로 교체 가능)
+        return direct_answers.find(message)
 
     def post(self, request):
         user_message = request.data.get("message")
@@ -194,7 +264,7 @@ class ChatAIProxy(APIView):
         }
 
         try:
-            response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+            response = llm_upstream.post(API_URL, headers=headers, json=payload)
             data = response.json()
             if "choices" in data:
                 answer = data["choices"][0]["message"]["content"]
@@ -205,10 +275,22 @@ class ChatAIProxy(APIView):
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# 고정 답변 매처: 기본 표는 ChatAIProxy.DIRECT_ANSWERS, ECOLINK_DIRECT_ANSWERS_FILE 이 있으면 그 파일 (바뀌면 다시 읽음)
+direct_answers = DirectAnswers(ChatAIProxy.DIRECT_ANSWERS)
+
+
 class UploadKeypointsAPIView(APIView):
+    # JSON(기존 클라이언트) + 키포인트 바이너리
+    parser_classes = [JSONParser, FormParser, MultiPartParser, KeypointsBinaryParser]
+
     def post(self, request):
         # 프론트에서 보낸 데이터 받기
-        all_vectors = request.data.get('sign_language_data')
+        keypoints = request.data.get('keypoints')
+        if keypoints is not None:
+            # 바이너리 업로드: (arr, mask) 를 dict 로 바꾸지 않고 그대로 정규화
+            all_vectors = keypoints if keypoints[0].shape[1] else None
+        else:
+            all_vectors = request.data.get('sign_language_data')
         total_frames = request.data.get('total_frames')
 
         if not all_vectors:
@@ -220,11 +302,63 @@ class UploadKeypointsAPIView(APIView):
         # normalized_data = normalization(all_vectors)
         # result = classify(checkpoint_path, normalized_data)
 
-        checkpoint_path8Police='ai_models/datas/checkpoint_8wordsPolice_54node_trynor_gaussi_addcam.pth'
-        label_list_Police=['경찰','교통사고','깔리다','병원',
-                           '불나다','숨을안쉬다','쓰러지다','연락해주세요']
         normalized_data = normalization(all_vectors)
         pred = classify8(checkpoint_path8Police, normalized_data)
         result = label_list_Police[pred]
 
         return Response({'result': result, 'total_frames': total_frames})
+
+
+class UploadKeypointsStreamAPIView(APIView):
+    # 녹화 중에 프레임을 조각으로 보내면 받는 대로 정규화 상태를 갱신해 두고, final 조각에서 바로 분류
+    # JSON: {'session_id', 'sign_language_data': [프레임 조각], 'final': true/false}
+    # 바이너리: 조각을 키포인트 바이너리로, ?session_id=...&final=1
+    parser_classes = [JSONParser, FormParser, MultiPartParser, KeypointsBinaryParser]
+
+    def post(self, request):
+        session_id = request.data.get('session_id') or request.query_params.get('session_id')
+        if not session_id:
+            return Response({'error': 'session_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        final = str(request.data.get('final', request.query_params.get('final', ''))).lower() in ('1', 'true')
+
+        now = time.monotonic()
+        with _stream_sessions_lock:
+            for key in [k for k, v in _stream_sessions.items() if now - v[2] > STREAM_SESSION_TTL]:
+                del _stream_sessions[key]
+            session = _stream_sessions.get(session_id)
+            if session is None:
+                if len(_stream_sessions) >= STREAM_MAX_SESSIONS:
+                    return Response({'error': 'Too many open stream sessions'},
+                                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                                    headers={'Retry-After': str(int(STREAM_SESSION_TTL))})
+                session = _stream_sessions[session_id] = [StreamingNormalizer(), threading.Lock(), now]
+            session[2] = now
+            if final:
+                del _stream_sessions[session_id]
+        normalizer, lock, _ = session
+
+        with lock:
+            keypoints = request.data.get('keypoints')
+            frames = None if keypoints is not None else request.data.get('sign_language_data') or []
+            incoming = keypoints[0].shape[1] if keypoints is not None else len(frames)
+            if len(normalizer) + incoming > STREAM_MAX_FRAMES:
+                with _stream_sessions_lock:
+                    if _stream_sessions.get(session_id) is session:
+                        del _stream_sessions[session_id]
+                return Response({'error': f'Stream session exceeds {STREAM_MAX_FRAMES} frames'},
+                                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+            if keypoints is not None:
+                normalizer.push_arrays(*keypoints)
+            else:
+                for frame in frames:
+                    normalizer.push_frame(frame)
+
+            if not final:
+                return Response({'session_id': session_id, 'total_frames': len(normalizer)})
+            if not len(normalizer):
+                return Response({'error': 'No sign_language_data provided'}, status=status.HTTP_400_BAD_REQUEST)
+            normalized_data = normalizer.close()
+
+        pred = classify8(checkpoint_path8Police, normalized_data)
+        return Response({'result': label_list_Police[pred], 'total_frames': len(normalizer)})
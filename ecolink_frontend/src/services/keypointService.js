@@ -73,6 +73,113 @@ export const sendAllFramesToServer = async (allVectors, apiUrl = null) => {
     }
     
     
+};
+/**
+ * 프레임 배열을 키포인트 바이너리 포맷(application/x-ecolink-keypoints)으로 인코딩합니다.
+ * 헤더 12바이트('EKPT', 버전, dtype, 관절 레이아웃, 채널 수, 프레임 수) 뒤에
+ * (4채널, 프레임수, 54관절) 순서의 Float32 배열이 붙습니다. 없는 랜드마크는 NaN.
+ * @param {Array} allVectors - createFrameData로 만든 프레임 객체 배열
+ * @returns {ArrayBuffer}
+ */
+export const encodeFramesBinary = (allVectors) => {
+    const NUM_NODES = 54;
+    const CHANNELS = ['x', 'y', 'z', 'visibility'];
+    const blocks = [
+        ['pose_landmarks', 0, 12],
+        ['left_hand_landmarks', 12, 21],
+        ['right_hand_landmarks', 33, 21],
+    ];
+    const T = allVectors.length;
+    const HEADER_SIZE = 12;
+
+    const buffer = new ArrayBuffer(HEADER_SIZE + CHANNELS.length * T * NUM_NODES * 4);
+    const header = new DataView(buffer, 0, HEADER_SIZE);
+    'EKPT'.split('').forEach((ch, i) => header.setUint8(i, ch.charCodeAt(0)));
+    header.setUint8(4, 1); // version
+    header.setUint8(5, 1); // dtype: float32
+    header.setUint8(6, 1); // layout: pose12 + 왼손21 + 오른손21
+    header.setUint8(7, CHANNELS.length);
+    header.setUint32(8, T, true);
+
+    const values = new Float32Array(buffer, HEADER_SIZE).fill(NaN);
+    allVectors.forEach((frame, t) => {
+        blocks.forEach(([key, start, count]) => {
+            const landmarks = frame[key];
+            if (!landmarks) return;
+            for (let i = 0; i < Math.min(count, landmarks.length); i++) {
+                CHANNELS.forEach((ch, c) => {
+                    const v = landmarks[i][ch];
+                    values[(c * T + t) * NUM_NODES + start + i] = v == null ? 0 : v;
+                });
+            }
+        });
+    });
+    return buffer;
+};
+
+/**
+ * 수집된 모든 벡터 데이터를 바이너리 포맷으로 서버에 한번에 전송 (JSON보다 작고 서버 파싱이 빠름)
+ * @param {Array} allVectors - VectorDataManager에서 수집한 벡터 객체 배열
+ * @param {string} apiUrl - API 엔드포인트 URL (선택적)
+ * @returns {Promise<Object>} 서버 응답
+ */
+export const sendAllFramesToServerBinary = async (allVectors, apiUrl = null) => {
+    const defaultUrl = 'http://localhost:8000/api/signwords/upload-keypoints/'; // Django 서버 주소
+    const url = apiUrl || defaultUrl;
+
+    try {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/x-ecolink-keypoints',
+            },
+            body: encodeFramesBinary(allVectors),
+        });
+
+        if (!response.ok) {
+            throw new Error(`서버 응답 오류: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('서버 전송 실패:', error);
+        throw error;
+    }
+};
+/**
+ * 녹화 중에 프레임을 조각으로 전송 (서버가 받는 대로 정규화해 두고, final 조각에서 바로 결과를 돌려줌)
+ * @param {string} sessionId - 한 번의 녹화를 구분하는 id (녹화마다 새로 생성)
+ * @param {Array} frames - 지난 전송 이후 createFrameData로 만든 프레임 객체 배열
+ * @param {boolean} final - 녹화가 끝났으면 true
+ * @param {string} apiUrl - API 엔드포인트 URL (선택적)
+ * @returns {Promise<Object>} 서버 응답 (final이면 {result, total_frames})
+ */
+export const sendFrameChunk = async (sessionId, frames, final = false, apiUrl = null) => {
+    const defaultUrl = 'http://localhost:8000/api/signwords/upload-keypoints/stream/'; // Django 서버 주소
+    const url = apiUrl || defaultUrl;
+
+    try {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                session_id: sessionId,
+                sign_language_data: frames,
+                final,
+            }),
+        });
+
+        if (!response.ok) {
+            throw new Error(`서버 응답 오류: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('서버 전송 실패:', error);
+        throw error;
+    }
 };
 /**
  * 데이터를 JSON 파일로 저장하여 다운로드하게 합니다. (웹 전용)